@@ -8,8 +8,13 @@ from dash import Dash, dcc, html
 from dash_bootstrap_components import themes
 from werkzeug.middleware.profiler import ProfilerMiddleware
 
+from breakpoints import HEIGHT_BREAKPOINTS_PX, WIDTH_BREAKPOINTS_PX
 from callbacks import get_callbacks
+from data_api import register_data_routes
+from data_store import GAMES
 from layout import get_app_html
+from metrics import register_metrics
+from sprites import register_sprite_routes
 
 GOOGLE_FONTS = (
     'https://fonts.googleapis.com/css2'
@@ -29,6 +34,11 @@ app = Dash(
 )
 app.title = 'Smash Charts'
 server = app.server
+register_data_routes(server)
+register_sprite_routes(server, GAMES)
+if os.getenv('METRICS'):
+    # Per-callback timings, payload sizes and cache hit rates on /metrics
+    register_metrics(app)
 
 # Specify which pages should use a drawer (instead of a sidebar)
 # All pages which don't use a drawer will use a sidebar
@@ -45,18 +55,9 @@ sidebar_pages = [
 # Window size breakpoints - used for dynamic layout updates based on screen size
 window_size_breakpoints = dash_breakpoints.WindowBreakpoints(
     id='breakpoints',
-    # width breakpoint every 50px, plus common bootstrap breakpoints
-    widthBreakpointThresholdsPx=[
-        *range(400, 576, 50),
-        576,
-        *range(600, 768, 50),
-        768,
-        *range(800, 992, 50),
-        992,
-        *range(1000, 2100, 50),
-    ],
-    # height breakpoint every 50px
-    heightBreakpointThresholdsPx=[*range(400, 1300, 50)],
+    # see breakpoints.py (the charts are sized per breakpoint bucket)
+    widthBreakpointThresholdsPx=WIDTH_BREAKPOINTS_PX,
+    heightBreakpointThresholdsPx=HEIGHT_BREAKPOINTS_PX,
 )
 
 app_html = get_app_html(pages, dash.page_container)
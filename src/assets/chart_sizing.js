@@ -0,0 +1,251 @@
+// Clientside chart sizing.
+// The server builds each scatter plot and correlation matrix spec once per data
+// change (variables, game, excluded fighters); resizing the window, dragging the
+// icon size slider or toggling the aspect ratio only re-sizes the last spec in
+// the browser.
+// The sizing functions mirror the ones in plots.py - keep them in sync.
+
+window.dash_clientside = window.dash_clientside || {};
+
+function clamp(value, min, max) {
+    return Math.min(Math.max(value, min), max);
+}
+
+function range(start, stop, step) {
+    var values = [];
+    for (var value = start; value < stop; value += step) {
+        values.push(value);
+    }
+    return values;
+}
+
+// Mirrors the breakpoints in breakpoints.py
+var WIDTH_BREAKPOINTS_PX = [].concat(
+    range(400, 576, 50),
+    [576],
+    range(600, 768, 50),
+    [768],
+    range(800, 992, 50),
+    [992],
+    range(1000, 2100, 50)
+);
+var HEIGHT_BREAKPOINTS_PX = range(400, 1300, 50);
+var OUT_OF_RANGE_BUCKET_PX = 50;
+
+// Mirrors get_size_bucket: the lower bound of the size's breakpoint bucket,
+// so the browser sizes the charts exactly like the server does
+function getSizeBucket(sizePx, breakpointsPx) {
+    var i = 0;
+    while (i < breakpointsPx.length && breakpointsPx[i] <= sizePx) {
+        i++;
+    }
+    if (i === 0 || i === breakpointsPx.length) {
+        return Math.max(sizePx - (sizePx % OUT_OF_RANGE_BUCKET_PX), OUT_OF_RANGE_BUCKET_PX);
+    }
+    return breakpointsPx[i - 1];
+}
+
+function parseScreenSize(displaySizeStr) {
+    // Looks like "Breakpoint name: <=1500px, width: 1440px"
+    if (typeof displaySizeStr !== 'string') {
+        return null;
+    }
+    var size = parseInt(displaySizeStr.split(' ')[4], 10);
+    return isNaN(size) ? null : size;
+}
+
+// Same curve as the slider's tooltip (tooltip.js): f(0) = 1/2; f(1) = 1; f(2) = 2
+function calcImageSizeMultiplier(x) {
+    if (typeof x !== 'number') {
+        return 1.0;
+    }
+    return (0.25 * x * x) + (0.25 * x) + 0.5;
+}
+
+// Mirrors get_scatter_plot_sizes
+function getScatterPlotSizes(screenWidth, screenHeight, maintainSquareAspect) {
+    screenWidth = getSizeBucket(screenWidth, WIDTH_BREAKPOINTS_PX);
+    screenHeight = getSizeBucket(screenHeight, HEIGHT_BREAKPOINTS_PX);
+
+    var availableWidth;
+    if (screenWidth >= 992) {
+        // On lg screens (>=992px), plot is in a column taking up ~75% of screen
+        availableWidth = Math.trunc(screenWidth * 0.74) - 150;
+    } else {
+        // On smaller screens, use full width minus padding
+        availableWidth = Math.trunc(screenWidth * 0.99) - 150;
+    }
+
+    // Account for header, footer, margins, card padding, plot title, etc.
+    var availableHeight = Math.trunc(screenHeight * 0.99) - 260;
+
+    var plotWidth = clamp(availableWidth, 300, 1400);
+    var plotHeight = clamp(availableHeight, 500, 800);
+
+    if (maintainSquareAspect) {
+        // maintain 1:1 aspect ratio
+        plotWidth = plotHeight = Math.min(plotWidth, plotHeight);
+    }
+
+    var imageSize = clamp(Math.trunc(Math.min(plotWidth, plotHeight) / 14), 15, 40);
+
+    return [plotHeight, plotWidth, imageSize];
+}
+
+// Mirrors get_scatter_plot_font_sizes
+function getScatterPlotFontSizes(plotWidth) {
+    return [
+        clamp(Math.trunc(plotWidth / 19), 12, 20),
+        clamp(Math.trunc(plotWidth / 24), 10, 16),
+    ];
+}
+
+// Mirrors get_corr_matrix_plot_sizes
+function getCorrMatrixPlotSizes(screenWidth, numAttributes) {
+    screenWidth = getSizeBucket(screenWidth, WIDTH_BREAKPOINTS_PX);
+
+    var availableWidth;
+    if (screenWidth >= 1950) {
+        // On very large screens, plot is in a column taking up ~25% of screen
+        // also need to account for x-axis labels
+        availableWidth = Math.trunc(screenWidth * 0.24) - 185;
+    } else if (screenWidth >= 992) {
+        // On lg screens (>=992px), plot is in a column taking up ~25% of screen
+        availableWidth = Math.trunc(screenWidth * 0.24) - 70;
+    } else {
+        // On smaller screens, columns stack vertically, so use full width minus padding
+        availableWidth = Math.trunc(screenWidth * 0.99) - 260;
+    }
+
+    var plotWidth = clamp(availableWidth, 180, 1000);
+    var circleRadius = plotWidth / numAttributes / 2;
+    var circleSize = Math.trunc(Math.PI * circleRadius * circleRadius);
+
+    return [plotWidth, plotWidth, circleSize];
+}
+
+// Mirrors get_corr_matrix_plot_font_sizes
+function getCorrMatrixPlotFontSize(plotWidth) {
+    return clamp(Math.trunc(plotWidth / 26), 10, 16);
+}
+
+// Mirrors get_corr_text_size
+function getCorrTextSize(circleSize) {
+    var thresholds = [[600, 11], [500, 10], [400, 9], [300, 8], [250, 7]];
+    for (var i = 0; i < thresholds.length; i++) {
+        if (circleSize > thresholds[i][0]) {
+            return thresholds[i][1];
+        }
+    }
+    // If the circle size is <= 250, don't display any text inside the circle
+    return 0;
+}
+
+// The correlation matrix layer with its axis labels and ticks hidden
+// (mirrors the axes get_corr_matrix_plot builds when show_labels is False)
+function hideCorrMatrixLabels(layer) {
+    var hiddenAxis = {labels: false, ticks: false, title: null};
+    return Object.assign({}, layer, {
+        encoding: Object.assign({}, layer.encoding, {
+            x: Object.assign({}, layer.encoding.x, {axis: hiddenAxis}),
+            y: Object.assign({}, layer.encoding.y, {axis: hiddenAxis}),
+        }),
+    });
+}
+
+window.dash_clientside.chartSizing = {
+    resizeScatterPlot: function (
+        spec,
+        displaySizeWidthStr,
+        displaySizeHeightStr,
+        imageSizeSliderVal,
+        maintainSquareAspect
+    ) {
+        if (!spec) {
+            return window.dash_clientside.no_update;
+        }
+
+        var screenWidth = parseScreenSize(displaySizeWidthStr) || 900;
+        var screenHeight = parseScreenSize(displaySizeHeightStr) || 600;
+        var sizes = getScatterPlotSizes(
+            screenWidth,
+            screenHeight,
+            maintainSquareAspect !== false
+        );
+        var plotHeight = sizes[0];
+        var plotWidth = sizes[1];
+        var imageSize = sizes[2] * calcImageSizeMultiplier(imageSizeSliderVal);
+        var fontSizes = getScatterPlotFontSizes(plotWidth);
+
+        // Copy only the parts of the spec that change, the data is shared
+        return Object.assign({}, spec, {
+            height: plotHeight,
+            width: plotWidth,
+            config: Object.assign({}, spec.config, {
+                axis: Object.assign({}, spec.config.axis, {
+                    titleFontSize: fontSizes[0],
+                    labelFontSize: fontSizes[1],
+                }),
+            }),
+            mark: Object.assign({}, spec.mark, {
+                height: imageSize,
+                width: imageSize,
+            }),
+        });
+    },
+
+    // The server builds the spec with the axis labels shown (see
+    // get_corr_matrix_spec), they're hidden here on medium sized screens
+    resizeCorrMatrixPlot: function (spec, displaySizeWidthStr) {
+        if (!spec) {
+            return window.dash_clientside.no_update;
+        }
+
+        var screenWidth = parseScreenSize(displaySizeWidthStr) || 900;
+        var numAttributes = Math.sqrt(spec.data.values.length);
+        var sizes = getCorrMatrixPlotSizes(screenWidth, numAttributes);
+        var plotHeight = sizes[0];
+        var plotWidth = sizes[1];
+        var circleSize = sizes[2];
+        var widthBucket = getSizeBucket(screenWidth, WIDTH_BREAKPOINTS_PX);
+        var showLabels = widthBucket >= 1950 || widthBucket < 992;
+
+        var circlesLayer = spec.layer[0];
+        var textLayer = spec.layer[1];
+        if (!showLabels) {
+            circlesLayer = hideCorrMatrixLabels(circlesLayer);
+            textLayer = hideCorrMatrixLabels(textLayer);
+        }
+
+        // If circle size is > 900, display each correlation with 2 decimals.
+        // Otherwise, only use 1 decimal for each correlation,
+        // so that the text fits in the circle.
+        var corrText = circleSize > 900 ? 'corr_2dec' : 'corr_1dec';
+
+        // Copy only the parts of the spec that change, the data is shared
+        return Object.assign({}, spec, {
+            height: plotHeight,
+            width: plotWidth,
+            config: Object.assign({}, spec.config, {
+                axis: Object.assign({}, spec.config.axis, {
+                    labelFontSize: getCorrMatrixPlotFontSize(plotWidth),
+                }),
+            }),
+            layer: [
+                Object.assign({}, circlesLayer, {
+                    mark: Object.assign({}, circlesLayer.mark, {size: circleSize}),
+                }),
+                Object.assign({}, textLayer, {
+                    mark: Object.assign({}, textLayer.mark, {
+                        fontSize: getCorrTextSize(circleSize),
+                    }),
+                    encoding: Object.assign({}, textLayer.encoding, {
+                        text: Object.assign({}, textLayer.encoding.text, {
+                            field: corrText,
+                        }),
+                    }),
+                }),
+            ],
+        });
+    },
+};
@@ -0,0 +1,54 @@
+// Clientside dropdown options.
+// Every game's dropdown options are in a store on the page (see
+// get_dropdown_options_store in utils.py), so a game switch only swaps the
+// dropdowns' options and checks that their values are still valid.
+
+window.dash_clientside = window.dash_clientside || {};
+
+window.dash_clientside.dropdownOptions = {
+    // Called with the selected game, the options store and each dropdown's value.
+    // Returns the options of each dropdown, then the value of each dropdown.
+    switchDropdownOptions: function (selectedGame, optionsStore) {
+        var values = Array.prototype.slice.call(arguments, 2);
+        var options = optionsStore.options[selectedGame] || [];
+        var validValues = new Set(options.map(function (option) {
+            return option.value;
+        }));
+
+        var newValues = values.map(function (value, i) {
+            if (Array.isArray(value)) {
+                // Multi-select dropdown: drop the fighters who aren't in the game
+                var validSelection = value.filter(function (item) {
+                    return validValues.has(item);
+                });
+                return validSelection.length === value.length
+                    ? window.dash_clientside.no_update
+                    : validSelection;
+            }
+            if (validValues.has(value)) {
+                return window.dash_clientside.no_update;
+            }
+            return optionsStore.default_values[i];
+        });
+
+        return values.map(function () {
+            return options;
+        }).concat(newValues);
+    },
+
+    // Called with a multi-select dropdown's value, the selected game, the options
+    // store and the maximum number of values. Returns the dropdown's options
+    // (once the maximum is reached, the other options are disabled), then the
+    // style of the message which tells the user about the maximum.
+    capMultiSelection: function (value, selectedGame, optionsStore, maxValues) {
+        var selection = new Set(value || []);
+        var isFull = selection.size >= maxValues;
+        var options = (optionsStore.options[selectedGame] || []).map(function (option) {
+            return Object.assign({}, option, {
+                disabled: isFull && !selection.has(option.value),
+            });
+        });
+
+        return [options, {display: isFull ? 'block' : 'none'}];
+    },
+};
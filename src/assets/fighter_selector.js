@@ -0,0 +1,64 @@
+// Clientside fighter selector.
+// The server builds the selector chart's spec once per game (see
+// get_fighter_selector_chart in plots.py); marking the excluded fighters and
+// resetting the chart's selection happens here.
+
+window.dash_clientside = window.dash_clientside || {};
+
+// Whether bit `position` of a hex bitmask string is set (see fighter_index.py)
+function isBitSet(bitmask, position) {
+    var digitIndex = bitmask.length - 1 - Math.floor(position / 4);
+    if (digitIndex < 0) {
+        return false;
+    }
+    var digit = parseInt(bitmask.charAt(digitIndex), 16);
+    return ((digit >> (position % 4)) & 1) === 1;
+}
+
+function getTriggeredIds() {
+    return window.dash_clientside.callback_context.triggered.map(function (trigger) {
+        return trigger.prop_id.split('.')[0];
+    });
+}
+
+window.dash_clientside.fighterSelector = {
+    renderFighterSelector: function (
+        spec,
+        isOpened,
+        selectAllClicks,
+        clearAllClicks,
+        excludedFighterIdsMem,
+        cacheBreaker
+    ) {
+        if (!spec) {
+            return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+        }
+
+        var triggeredIds = getTriggeredIds();
+        var isExcluded;
+        if (triggeredIds.indexOf('fighter-selector-select-all-button') !== -1) {
+            cacheBreaker += 1;
+            isExcluded = function () { return false; };
+        } else if (triggeredIds.indexOf('fighter-selector-clear-all-button') !== -1) {
+            cacheBreaker += 1;
+            isExcluded = function () { return true; };
+        } else {
+            var bitmask = excludedFighterIdsMem || '0';
+            isExcluded = function (fighterId) { return isBitSet(bitmask, fighterId); };
+        }
+
+        // The fighter ids are the rows' positions. A new selection value makes
+        // Vega re-create the selection, i.e. clears the previously clicked fighters.
+        return [
+            Object.assign({}, spec, {
+                params: [Object.assign({}, spec.params[0], {value: cacheBreaker})],
+                data: Object.assign({}, spec.data, {
+                    values: spec.data.values.map(function (record, fighterId) {
+                        return Object.assign({}, record, {excluded: isExcluded(fighterId)});
+                    }),
+                }),
+            }),
+            cacheBreaker,
+        ];
+    },
+};
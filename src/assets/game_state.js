@@ -0,0 +1,30 @@
+// Clientside game selection.
+// The session store ('selected-game-store') is the only source of truth for the
+// selected game, and no callback both reads and writes it:
+//   - a click on a game selector writes the store (selectGame), and every
+//     callback which depends on the game reads the store, so a game switch fans
+//     out to the charts in one step;
+//   - a game selector shows the stored game (showSelectedGame) when it's
+//     rendered, and when the settings drawer (with the other selector) is
+//     opened or closed, reading the store as a State.
+// See get_callbacks in callbacks.py and pages/fighter_comparisons.py.
+
+window.dash_clientside = window.dash_clientside || {};
+
+var DEFAULT_GAME = 'ultimate';
+
+window.dash_clientside.gameState = {
+    // Returns the store's data: the clicked game, unless it's already stored
+    selectGame: function (selectedGame, storedGame) {
+        if (!selectedGame || selectedGame === storedGame) {
+            return window.dash_clientside.no_update;
+        }
+        return selectedGame;
+    },
+
+    // Returns the selector's value: the stored game, unless it's already shown
+    showSelectedGame: function (_drawerOpened, storedGame, selectedGame) {
+        var game = storedGame || DEFAULT_GAME;
+        return game === selectedGame ? window.dash_clientside.no_update : game;
+    },
+};
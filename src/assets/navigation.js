@@ -0,0 +1,93 @@
+// Clientside navigation chrome.
+// The page title, the active navlinks and the sidebar's status only depend on
+// the url and the screen width, so they're picked in the browser from every
+// possible style / title, which the server computes once at startup (see
+// get_navigation_config in navigation.py and get_callbacks in callbacks.py).
+
+window.dash_clientside = window.dash_clientside || {};
+
+window.dash_clientside.navigation = {
+    // The screen width in the display size div's text, e.g.
+    // "Breakpoint name: <=1500px, width: 1440px", or null if there's none yet
+    parseScreenWidth: function (displaySizeWidthStr) {
+        if (typeof displaySizeWidthStr !== 'string') {
+            return null;
+        }
+        var match = /width: (\d+)px/.exec(displaySizeWidthStr);
+        return match ? parseInt(match[1], 10) : null;
+    },
+
+    // Mirrors the page title logic of get_page_title and get_app_title
+    getPageTitle: function (pageUrl, displaySizeWidthStr, config) {
+        if (Object.prototype.hasOwnProperty.call(config.pageTitles, pageUrl)) {
+            return config.pageTitles[pageUrl];
+        }
+        if (config.appTitlePages.indexOf(pageUrl) === -1) {
+            return config.notFoundTitle;
+        }
+
+        // Choose the size of the app title based on the user's screen width
+        var screenWidth = window.dash_clientside.navigation.parseScreenWidth(
+            displaySizeWidthStr
+        );
+        var appTitles = config.appTitles;
+        if (screenWidth === null) {
+            return appTitles[0][1];
+        }
+        for (var i = 0; i < appTitles.length; i++) {
+            if (screenWidth > appTitles[i][0]) {
+                return appTitles[i][1];
+            }
+        }
+        return appTitles[appTitles.length - 1][1];
+    },
+
+    // Active flags of the sidebar's navlinks, then the drawer's navlinks
+    getActiveNavlinks: function (pageUrl, navlinkPages) {
+        var active = navlinkPages.map(function (page) {
+            return page === pageUrl;
+        });
+        return active.concat(active);
+    },
+
+    // Returns the sidebar's style outputs (see get_sidebar_style_outputs), then
+    // the styles of the page container, the sidebar container, the dummy
+    // sidebar container and the drawer's hamburger menu
+    getSidebarStatus: function (displaySizeWidthStr, pageUrl, config) {
+        // Collapse / expand the sidebar depending on the user's screen width.
+        // On pages with a drawer this happens behind the scenes, so that the
+        // sidebar is the correct size when the user navigates to a page with one.
+        var screenWidth = window.dash_clientside.navigation.parseScreenWidth(
+            displaySizeWidthStr
+        );
+        var sidebarStatus = screenWidth !== null && screenWidth < config.collapseBelowPx
+            ? 'collapsed'
+            : 'expanded';
+        var pageContainerStyle = config.pageContainerStyles[sidebarStatus];
+
+        var sidebarContainerStyle;
+        var drawerHamburgerMenuStyle;
+        if (config.sidebarPages.indexOf(pageUrl) !== -1) {
+            // Display the sidebar, hide the drawer's hamburger menu
+            sidebarContainerStyle = null;
+            drawerHamburgerMenuStyle = {visibility: 'hidden'};
+        } else if (config.drawerPages.indexOf(pageUrl) !== -1) {
+            // Hide the sidebar, display the drawer's hamburger menu
+            sidebarContainerStyle = {display: 'none'};
+            drawerHamburgerMenuStyle = null;
+            pageContainerStyle = config.pageContainerStyles.hidden;
+        } else {
+            // Non-existent page (404)
+            sidebarContainerStyle = {display: 'none'};
+            drawerHamburgerMenuStyle = {display: 'none'};
+            pageContainerStyle = config.pageContainerStyles.hidden;
+        }
+
+        return config.sidebarStyleOutputs[sidebarStatus].concat([
+            pageContainerStyle,
+            sidebarContainerStyle,
+            sidebarContainerStyle,
+            drawerHamburgerMenuStyle,
+        ]);
+    },
+};
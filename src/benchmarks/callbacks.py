@@ -0,0 +1,335 @@
+# Benchmark every server-side Dash callback by replaying realistic user sessions
+# (page loads, game switches, dropdown changes, fighter exclusions and window
+# resize storms) through Dash's callback endpoint with Flask's test client.
+#
+# The harness keeps a simulated store of component props (built from the app
+# shell and the page's layout), and - like the browser - fires every callback
+# whose inputs changed, applying the responses to the store until nothing
+# changes anymore. Clientside and pattern-matching callbacks are skipped, e.g.
+# a game switch is replayed as a change of the selected game store (the game
+# selectors write to it in the browser).
+#
+# Run from the `src` directory:
+#     python -m benchmarks.callbacks
+
+import statistics
+import time
+
+import dash
+
+from app import app
+from data_store import GAMES
+from fighter_index import encode_bitmask
+
+# Guard against callback cycles
+MAX_DISPATCHES_PER_EVENT = 100
+
+RESIZE_WIDTHS = [*range(400, 2000, 50)]
+
+
+def get_display_size_width(width):
+    # Same format as the breakpoints clientside callback in callbacks.py
+    return f'Breakpoint name: <={width}px, width: {width}px'
+
+
+def get_display_size_height(height):
+    return f'Breakpoint name: <={height}px, height: {height}px'
+
+
+# (name, page path, events). Each event maps (component id, prop) to a new value.
+SCENARIOS = [
+    (
+        'correlations: game switches',
+        '/attribute-correlations',
+        [{('selected-game-store', 'data'): game} for game in [*GAMES, 'ultimate']],
+    ),
+    (
+        'correlations: dropdown changes',
+        '/attribute-correlations',
+        [
+            {('scatter-dropdown-1', 'value'): var}
+            for var in ['weight', 'gravity', 'run_speed', 'jump_height']
+        ],
+    ),
+    (
+        'correlations: exclusion toggles',
+        '/attribute-correlations',
+        [
+            {('excluded-fighter-ids-mem', 'data'): encode_bitmask(range(n))}
+            for n in [1, 5, 10, 5, 0]
+        ],
+    ),
+    (
+        'correlations: resize storm',
+        '/attribute-correlations',
+        [
+            {('display-size-width', 'children'): get_display_size_width(width)}
+            for width in RESIZE_WIDTHS
+        ],
+    ),
+    (
+        'distributions: dropdown changes',
+        '/attribute-distributions',
+        [
+            {('bar-dropdown', 'value'): var}
+            for var in ['weight', 'gravity', 'run_speed', 'jump_height']
+        ],
+    ),
+    (
+        'distributions: resize storm',
+        '/attribute-distributions',
+        [
+            {('display-size-width', 'children'): get_display_size_width(width)}
+            for width in RESIZE_WIDTHS
+        ],
+    ),
+    (
+        'comparisons: fighter and normalization changes',
+        '/fighter-comparisons',
+        [
+            {('fighter-comparison-dropdown-1', 'value'): '02'},
+            {('fighter-comparison-dropdown-2', 'value'): '03'},
+            {('normalization-selector', 'value'): 'zscore'},
+            {('normalization-selector', 'value'): 'percentile'},
+            {('selected-game-store', 'data'): 'melee'},
+        ],
+    ),
+]
+
+
+def collect_props(component, props):
+    # (id, prop) -> value for every component with a (string) id.
+    # Props holding components (e.g. children) are only traversed.
+    if isinstance(component, list | tuple):
+        for child in component:
+            collect_props(child, props)
+        return
+    if not hasattr(component, 'to_plotly_json'):
+        return
+
+    component_props = component.to_plotly_json()['props']
+    component_id = component_props.get('id')
+    for prop, value in component_props.items():
+        if isinstance(component_id, str) and not contains_components(value):
+            props[component_id, prop] = value
+        collect_props(value, props)
+
+
+def contains_components(value):
+    if isinstance(value, list | tuple):
+        return any(contains_components(item) for item in value)
+
+    return hasattr(value, 'to_plotly_json')
+
+
+def get_page_props(page_path):
+    props = {}
+    for page in dash.page_registry.values():
+        if page['relative_path'] == page_path:
+            layout = page['layout']
+            collect_props(layout() if callable(layout) else layout, props)
+
+    return props
+
+
+def get_initial_props(page_path):
+    props = {}
+    collect_props(app.layout, props)
+    props.update(get_page_props(page_path))
+
+    props['url', 'pathname'] = page_path
+    props['display-size-width', 'children'] = get_display_size_width(1440)
+    props['display-size-height', 'children'] = get_display_size_height(900)
+
+    return props
+
+
+def parse_outputs(output):
+    # 'id.prop' or '..id1.prop1...id2.prop2..' (props may have an @hash suffix)
+    if not output.startswith('..'):
+        component_id, prop = output.rsplit('.', 1)
+        return {'id': component_id, 'property': prop}
+
+    outputs = []
+    for output_spec in output[2:-2].split('...'):
+        component_id, prop = output_spec.rsplit('.', 1)
+        outputs.append({'id': component_id, 'property': prop})
+
+    return outputs
+
+
+def get_server_callbacks(client):
+    callbacks = []
+    for callback in client.get('/_dash-dependencies').get_json():
+        dependencies = [*callback['inputs'], *callback['state']]
+        is_pattern_matching = callback['output'].lstrip('.').startswith('{') or any(
+            not isinstance(dependency['id'], str) for dependency in dependencies
+        )
+        if callback.get('clientside_function') or is_pattern_matching:
+            continue
+        callbacks.append(callback)
+
+    return callbacks
+
+
+def get_prop_values(dependencies, props):
+    return [
+        {**dependency, 'value': props.get((dependency['id'], dependency['property']))}
+        for dependency in dependencies
+    ]
+
+
+def dispatch(client, callback, props, changed, timings):
+    # Call the callback like the browser does, apply its response to the props,
+    # and return the (id, prop) pairs it updated
+    input_ids = {(i['id'], i['property']) for i in callback['inputs']}
+    body = {
+        'output': callback['output'],
+        'outputs': parse_outputs(callback['output']),
+        'inputs': get_prop_values(callback['inputs'], props),
+        'state': get_prop_values(callback['state'], props),
+        'changedPropIds': [f'{i}.{prop}' for i, prop in changed & input_ids],
+    }
+
+    # Flask's test client handles the request in-process,
+    # so this is the server's processing time (without the network)
+    start = time.perf_counter()
+    response = client.post('/_dash-update-component', json=body)
+    duration = time.perf_counter() - start
+
+    timing = timings.setdefault(
+        callback['output'], {'durations': [], 'bytes': [], 'no_update': 0}
+    )
+    timing['durations'].append(duration)
+    timing['bytes'].append(len(response.data))
+
+    if response.status_code == 204:  # PreventUpdate
+        timing['no_update'] += 1
+        return set()
+    if response.status_code != 200:
+        raise RuntimeError(
+            f'{callback["output"]} failed with status {response.status_code}'
+        )
+
+    updated = set()
+    for component_id, component_props in response.get_json()['response'].items():
+        for prop, value in component_props.items():
+            props[component_id, prop] = value
+            updated.add((component_id, prop))
+
+    return updated
+
+
+def is_triggered(callback, props, changed, initial):
+    # Only callbacks whose inputs are all on the page (or in the app shell) fire
+    input_ids = [(i['id'], i['property']) for i in callback['inputs']]
+    if not all(input_id in props for input_id in input_ids):
+        return False
+    if initial:
+        # On page load, every callback fires (unless it opted out)
+        return not callback.get('prevent_initial_call')
+
+    return any(input_id in changed for input_id in input_ids)
+
+
+def get_prop_ids(dependencies):
+    # Outputs' props may have an @hash suffix (allow_duplicate)
+    if isinstance(dependencies, dict):
+        dependencies = [dependencies]
+
+    return {
+        (dependency['id'], dependency['property'].split('@')[0])
+        for dependency in dependencies
+    }
+
+
+def cascade(client, callbacks, props, changed, timings, initial=False):
+    # Fire the callbacks triggered by the changed props,
+    # then the ones triggered by their outputs, and so on.
+    # Like the browser, a triggered callback waits while another triggered
+    # callback updates one of its inputs, and then fires once for both changes.
+    num_dispatches = 0
+    pending = {}
+    while changed or initial or pending:
+        for index, callback in enumerate(callbacks):
+            if is_triggered(callback, props, changed, initial):
+                pending[index] = pending.get(index, set()) | changed
+        initial = False
+
+        pending_outputs = {
+            index: get_prop_ids(parse_outputs(callbacks[index]['output']))
+            for index in pending
+        }
+        ready = [
+            index
+            for index in pending
+            if not any(
+                get_prop_ids(callbacks[index]['inputs']) & outputs
+                for other_index, outputs in pending_outputs.items()
+                if other_index != index
+            )
+        ] or list(pending)
+
+        next_changed = set()
+        for index in ready:
+            num_dispatches += 1
+            if num_dispatches > MAX_DISPATCHES_PER_EVENT:
+                raise RuntimeError('Too many callback dispatches, is there a cycle?')
+            callback_changed = pending.pop(index)
+            next_changed |= dispatch(
+                client, callbacks[index], props, callback_changed, timings
+            )
+        changed = next_changed
+
+
+def get_percentile(durations_ms, percentile):
+    return durations_ms[min(int(percentile * len(durations_ms)), len(durations_ms) - 1)]
+
+
+def run_benchmark(scenarios=SCENARIOS):
+    client = app.server.test_client()
+    callbacks = get_server_callbacks(client)
+
+    timings = {}
+    for _, page_path, events in scenarios:
+        props = get_initial_props(page_path)
+        cascade(client, callbacks, props, set(), timings, initial=True)
+        for event in events:
+            props.update(event)
+            cascade(client, callbacks, props, set(event), timings)
+
+    results = {}
+    for output, timing in timings.items():
+        durations_ms = sorted(1000 * duration for duration in timing['durations'])
+        results[output] = {
+            'calls': len(durations_ms),
+            'no_update': timing['no_update'],
+            'p50': statistics.median(durations_ms),
+            'p95': get_percentile(durations_ms, 0.95),
+            'p99': get_percentile(durations_ms, 0.99),
+            'mean_bytes': statistics.mean(timing['bytes']),
+        }
+
+    return results
+
+
+def print_results(results):
+    header = (
+        f'{"callback output":<60}{"calls":>7}{"no-op":>7}{"p50":>10}{"p95":>10}'
+        f'{"p99":>10}{"mean bytes":>12}'
+    )
+    print(header)
+    print('-' * len(header))
+    # Callbacks with the most total time first
+    for output, result in sorted(
+        results.items(), key=lambda item: -item[1]['p50'] * item[1]['calls']
+    ):
+        print(
+            f'{output[:59]:<60}{result["calls"]:>7}{result["no_update"]:>7}'
+            f'{result["p50"]:>8.2f}ms{result["p95"]:>8.2f}ms{result["p99"]:>8.2f}ms'
+            f'{result["mean_bytes"]:>12.0f}'
+        )
+
+
+if __name__ == '__main__':
+    print_results(run_benchmark())
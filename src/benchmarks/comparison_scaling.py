@@ -0,0 +1,86 @@
+# Benchmark how the comparison plot's build time and spec size scale
+# with the number of fighters being compared.
+#
+# First checks that normalizing doesn't drop any fighters from the comparison
+# data, for every game and normalization method, including when all but one
+# fighter are excluded (so every attribute is constant across the rest).
+#
+# Run from the `src` directory:
+#     python -m benchmarks.comparison_scaling
+
+from plotly.io.json import to_json_plotly
+
+from benchmarks.spec_build import N_RUNS, summarize, time_calls
+from data_store import GAMES
+from normalization import NORMALIZATION_METHODS
+from plots import MAX_COMPARISON_FIGHTERS, get_comparison_plot
+from records import get_long_format_columns
+from utils import get_fighter_lookup_table, get_valid_attributes
+
+
+def check_long_format_columns():
+    for game in GAMES:
+        fighter_numbers = get_fighter_lookup_table(game=game)['fighter_number'].tolist()
+        attributes = get_valid_attributes(data_type='continuous', game=game)
+        raw_columns = get_long_format_columns(game, fighter_numbers, attributes)
+        if len(raw_columns['value']) == 0:
+            raise AssertionError(f'No comparison data: {game}')
+
+        for normalization in NORMALIZATION_METHODS:
+            for excluded_fighter_ids in [[], [*range(1, len(fighter_numbers))]]:
+                columns = get_long_format_columns(
+                    game,
+                    fighter_numbers,
+                    attributes,
+                    normalization=normalization,
+                    excluded_fighter_ids=excluded_fighter_ids,
+                )
+                if columns['fighter_number'].tolist() != (
+                    raw_columns['fighter_number'].tolist()
+                ):
+                    raise AssertionError(
+                        f'Normalizing dropped fighters: {game} {normalization} '
+                        f'({len(excluded_fighter_ids)} fighters excluded)',
+                    )
+
+
+def run_benchmark(n_runs=N_RUNS, game='ultimate', normalization='zscore'):
+    fighter_numbers = get_fighter_lookup_table(game=game)['fighter_number'].tolist()
+
+    results = {}
+    for num_fighters in range(1, MAX_COMPARISON_FIGHTERS + 1):
+        kwargs = {
+            'fighters': fighter_numbers[:num_fighters],
+            'comparison_mode': 'multi',
+            'selected_game': game,
+            'screen_width': 1440,
+            'normalization': normalization,
+        }
+        spec = get_comparison_plot(**kwargs)
+
+        results[num_fighters] = {
+            'build': summarize(
+                time_calls(lambda kwargs=kwargs: get_comparison_plot(**kwargs), n_runs),
+            ),
+            'spec_bytes': len(to_json_plotly(spec)),
+        }
+
+    return results
+
+
+def print_results(results):
+    header = f'{"fighters":<10}{"build median":>14}{"build p99":>12}{"bytes":>10}'
+    print(header)
+    print('-' * len(header))
+    for num_fighters, result in results.items():
+        print(
+            f'{num_fighters:<10}'
+            f'{result["build"]["median"]:>12.3f}ms'
+            f'{result["build"]["p99"]:>10.3f}ms'
+            f'{result["spec_bytes"]:>10}'
+        )
+
+
+if __name__ == '__main__':
+    check_long_format_columns()
+    print_results(run_benchmark())
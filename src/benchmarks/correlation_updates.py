@@ -0,0 +1,122 @@
+# Compare updating the correlation matrix incrementally when fighters are excluded
+# (see correlations.py) with recomputing it using DataFrame.corr.
+#
+# Run from the `src` directory:
+#     python -m benchmarks.correlation_updates
+#
+# Besides random exclusion sets, the incremental matrices are checked against
+# DataFrame.corr for exclusion sets which leave an attribute constant.
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.spec_build import summarize, time_calls
+from correlations import GAME_CORRELATIONS, get_correlations_excluding
+from data_store import GAMES, get_columns
+
+N_RUNS = 200
+N_RANDOM_EXCLUSION_SETS = 50
+
+
+def get_params_df(game):
+    params = get_columns(game, 'params')
+    attributes = GAME_CORRELATIONS[game]['attributes']
+
+    return pd.DataFrame(
+        {attribute: params[attribute].astype(float) for attribute in attributes},
+    )
+
+
+def get_constant_column_exclusion_sets(params_df):
+    # For each attribute, exclude every fighter whose value differs from the most
+    # common one, so the attribute is constant across the remaining fighters.
+    exclusion_sets = []
+    for attribute in params_df.columns:
+        column = params_df[attribute]
+        mode = column.mode()
+        if len(mode) > 0:
+            excluded = column.index[column != mode.iloc[0]]
+            exclusion_sets.append(tuple(sorted(excluded)))
+
+    return exclusion_sets
+
+
+def get_random_exclusion_sets(params_df, n_sets=N_RANDOM_EXCLUSION_SETS):
+    rng = np.random.default_rng(0)
+    n_fighters = len(params_df)
+
+    return [
+        tuple(
+            sorted(
+                rng.choice(n_fighters, rng.integers(n_fighters), replace=False).tolist()
+            )
+        )
+        for _ in range(n_sets)
+    ]
+
+
+def recompute(params_df, excluded_fighter_ids):
+    return params_df.drop(index=list(excluded_fighter_ids)).corr().to_numpy()
+
+
+def update(game, excluded_fighter_ids):
+    # Bypass the cache, so every call does the incremental update
+    return get_correlations_excluding.__wrapped__(game, excluded_fighter_ids)
+
+
+def check_correlations(game, params_df, exclusion_sets):
+    for excluded_fighter_ids in exclusion_sets:
+        expected = recompute(params_df, excluded_fighter_ids)
+        actual = update(game, excluded_fighter_ids)
+        if not np.allclose(actual, expected, atol=1e-9, equal_nan=True):
+            raise AssertionError(
+                f'Correlations do not match DataFrame.corr: '
+                f'{game} excluding {excluded_fighter_ids}',
+            )
+
+
+def run_benchmark(n_runs=N_RUNS):
+    results = {}
+    for game in GAMES:
+        params_df = get_params_df(game)
+        exclusion_sets = get_random_exclusion_sets(params_df)
+        check_correlations(
+            game,
+            params_df,
+            get_constant_column_exclusion_sets(params_df) + exclusion_sets,
+        )
+
+        excluded_fighter_ids = exclusion_sets[0]
+        results[game] = {
+            'corr': summarize(
+                time_calls(
+                    lambda df=params_df, ids=excluded_fighter_ids: recompute(df, ids),
+                    n_runs,
+                ),
+            ),
+            'incremental': summarize(
+                time_calls(
+                    lambda game=game, ids=excluded_fighter_ids: update(game, ids),
+                    n_runs,
+                ),
+            ),
+        }
+
+    return results
+
+
+def print_results(results):
+    header = f'{"game":<10}{"method":<14}{"median":>12}{"p99":>12}'
+    print(header)
+    print('-' * len(header))
+    for game, result in results.items():
+        for method in ['corr', 'incremental']:
+            print(
+                f'{game:<10}{method:<14}'
+                f'{result[method]["median"]:>10.3f}ms'
+                f'{result[method]["p99"]:>10.3f}ms'
+            )
+
+
+if __name__ == '__main__':
+    print_results(run_benchmark())
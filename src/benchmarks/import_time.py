@@ -0,0 +1,49 @@
+# Profile the app's import time (i.e. the cold start before the first request)
+# with `python -X importtime`, and report the slowest imports.
+#
+# Run from the `src` directory:
+#     python -m benchmarks.import_time
+
+import subprocess
+import sys
+
+N_SLOWEST = 25
+
+
+def profile_imports(module='app'):
+    # Returns [(cumulative time in ms, self time in ms, module name)]
+    # Runs this Python interpreter in a fresh process, so the imports are cold.
+    # No shell is involved and the module to import is chosen by the caller.
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        # Looks like "import time:       123 |       4567 |   package.module"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:') :].split('|')
+        imports.append(
+            (int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()),
+        )
+
+    return imports
+
+
+def print_results(imports, n_slowest=N_SLOWEST):
+    total_ms = sum(self_ms for _, self_ms, _ in imports)
+    print(f'total import time: {total_ms:.1f}ms ({len(imports)} modules)\n')
+
+    header = f'{"cumulative":>12}{"self":>10}  module'
+    print(header)
+    print('-' * len(header))
+    for cumulative_ms, self_ms, name in sorted(imports, reverse=True)[:n_slowest]:
+        print(f'{cumulative_ms:>10.1f}ms{self_ms:>8.1f}ms  {name}')
+
+
+if __name__ == '__main__':
+    print_results(profile_imports())
@@ -0,0 +1,102 @@
+# Compare DataFrame.to_dict(orient='records') with the columnar records path
+# (records.columns_to_records) for the data behind each of the chart specs.
+#
+# Run from the `src` directory:
+#     python -m benchmarks.record_serialization
+
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+from benchmarks.spec_build import N_RUNS, summarize, time_calls
+from records import (
+    columns_to_records,
+    get_fighter_columns,
+    get_fighter_selector_columns,
+    get_valid_rows_mask,
+)
+from utils import get_correlations_df, get_valid_attributes
+
+
+def get_benchmark_data():
+    # (columns, fields) for the data used by each spec builder
+    corr_df = get_correlations_df()
+    corr_columns = {column: corr_df[column].to_numpy() for column in corr_df.columns}
+    selector_columns = get_fighter_selector_columns('ultimate')
+    comparison_fields = [
+        'fighter',
+        'img_url',
+        'fighter_number',
+        *get_valid_attributes(data_type='continuous', game='ultimate'),
+    ]
+
+    return {
+        'scatter': (
+            get_fighter_columns('ultimate'),
+            ['fighter', 'img_url', 'fastfall_speed', 'run_speed'],
+        ),
+        'bar': (get_fighter_columns('ultimate'), ['fighter', 'img_url', 'weight']),
+        'corr_matrix': (corr_columns, [*corr_columns]),
+        'fighter_selector': (selector_columns, [*selector_columns]),
+        'comparison': (get_fighter_columns('ultimate', 'zscore'), comparison_fields),
+    }
+
+
+def to_dict_records(columns, fields):
+    return pd.DataFrame(columns)[fields].dropna().to_dict(orient='records')
+
+
+def columnar_records(columns, fields):
+    return columns_to_records(columns, fields, get_valid_rows_mask(columns, fields))
+
+
+def run_benchmark(n_runs=N_RUNS):
+    results = {}
+    for chart, (columns, fields) in get_benchmark_data().items():
+        records = columnar_records(columns, fields)
+        if records != to_dict_records(columns, fields):
+            raise AssertionError(f'Columnar records do not match to_dict for {chart}')
+
+        results[chart] = {
+            'to_dict': summarize(
+                time_calls(
+                    lambda columns=columns, fields=fields: to_dict_records(
+                        columns, fields
+                    ),
+                    n_runs,
+                ),
+            ),
+            'columnar': summarize(
+                time_calls(
+                    lambda columns=columns, fields=fields: columnar_records(
+                        columns, fields
+                    ),
+                    n_runs,
+                ),
+            ),
+            'json': summarize(
+                time_calls(lambda records=records: to_json_plotly(records), n_runs),
+            ),
+        }
+
+    return results
+
+
+def print_results(results):
+    header = (
+        f'{"chart":<18}{"to_dict median":>16}{"columnar median":>17}'
+        f'{"columnar p99":>14}{"json median":>14}'
+    )
+    print(header)
+    print('-' * len(header))
+    for chart, result in results.items():
+        print(
+            f'{chart:<18}'
+            f'{result["to_dict"]["median"]:>14.3f}ms'
+            f'{result["columnar"]["median"]:>15.3f}ms'
+            f'{result["columnar"]["p99"]:>12.3f}ms'
+            f'{result["json"]["median"]:>12.3f}ms'
+        )
+
+
+if __name__ == '__main__':
+    print_results(run_benchmark())
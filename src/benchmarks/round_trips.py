@@ -0,0 +1,187 @@
+# Count the server round trips (Dash callback requests) caused by navigating
+# between pages, by resizing the window and by user interactions, e.g. to check
+# that a callback moved to the browser doesn't hit the server anymore.
+#
+# Uses the session replay of benchmarks.callbacks: the browser's callbacks
+# aren't simulated, only the requests they'd cause on the server are counted.
+#
+# Run from the `src` directory:
+#     python -m benchmarks.round_trips
+#
+# To compare before / after a change, run the benchmark on both revisions.
+# Scenarios with a round trip budget fail the run (exit status 1) when they
+# need more round trips per event, e.g. a game switch must only reach the
+# callbacks which depend on the game, once each, and resizing a page whose charts
+# are sized in the browser must not reach the server at all.
+
+from app import app
+from benchmarks.callbacks import (
+    RESIZE_WIDTHS,
+    cascade,
+    get_display_size_width,
+    get_initial_props,
+    get_page_props,
+    get_server_callbacks,
+)
+from data_store import GAMES
+from fighter_index import encode_bitmask
+
+NAVIGATION_PATHS = [
+    '/attribute-correlations',
+    '/attribute-distributions',
+    '/fighter-comparisons',
+    '/attribute-info',
+    '/',
+]
+
+GAME_SWITCHES = [{('selected-game-store', 'data'): game} for game in [*GAMES, 'ultimate']]
+
+# Game switch: the fighter selector's spec, and the page's chart callback
+MAX_GAME_SWITCH_ROUND_TRIPS = 2
+
+# Pages whose charts are all sized in the browser
+CLIENTSIDE_SIZED_PAGES = ['/', '/attribute-correlations']
+
+# (name, initial page path, events), where an event is a page path to navigate to,
+# a screen width to resize the window to, or a map of (component id, prop) to a
+# new value (a user interaction)
+SCENARIOS = [
+    ('navigation', '/', NAVIGATION_PATHS),
+    ('resize storm: home', '/', RESIZE_WIDTHS),
+    ('resize storm: attribute correlations', '/attribute-correlations', RESIZE_WIDTHS),
+    ('resize storm: fighter comparisons', '/fighter-comparisons', RESIZE_WIDTHS),
+    (
+        'interactions: attribute correlations',
+        '/attribute-correlations',
+        [
+            {('scatter-dropdown-1', 'value'): 'weight'},
+            {('scatter-dropdown-2', 'value'): 'gravity'},
+            {('excluded-fighter-ids-mem', 'data'): encode_bitmask([0, 1])},
+        ],
+    ),
+    (
+        'interactions: attribute distributions',
+        '/attribute-distributions',
+        [
+            {('bar-dropdown', 'value'): 'gravity'},
+            {('excluded-fighter-ids-mem', 'data'): encode_bitmask([0, 1])},
+        ],
+    ),
+    (
+        'interactions: fighter comparisons',
+        '/fighter-comparisons',
+        [
+            {('fighter-comparison-dropdown-1', 'value'): '02'},
+            {('normalization-selector', 'value'): 'zscore'},
+        ],
+    ),
+    ('game switches: attribute correlations', '/attribute-correlations', GAME_SWITCHES),
+    ('game switches: attribute distributions', '/attribute-distributions', GAME_SWITCHES),
+    ('game switches: fighter comparisons', '/fighter-comparisons', GAME_SWITCHES),
+]
+
+# Scenario name -> max round trips per event
+ROUND_TRIP_BUDGETS = {
+    **{
+        name: MAX_GAME_SWITCH_ROUND_TRIPS
+        for name, _, _ in SCENARIOS
+        if name.startswith('game switches')
+    },
+    **{
+        name: 0
+        for name, page_path, _ in SCENARIOS
+        if name.startswith('resize storm') and page_path in CLIENTSIDE_SIZED_PAGES
+    },
+}
+
+
+def navigate(client, callbacks, props, page_keys, page_path, counts):
+    # The previous page's components are replaced by the new page's,
+    # whose callbacks fire like on a page load
+    for key in page_keys:
+        props.pop(key, None)
+    page_props = get_page_props(page_path)
+    props.update(page_props)
+    props['url', 'pathname'] = page_path
+
+    cascade(client, callbacks, props, {('url', 'pathname'), *page_props}, counts)
+
+    return set(page_props)
+
+
+def resize(client, callbacks, props, width, counts):
+    event = {('display-size-width', 'children'): get_display_size_width(width)}
+    props.update(event)
+    cascade(client, callbacks, props, set(event), counts)
+
+
+def interact(client, callbacks, props, event, counts):
+    props.update(event)
+    cascade(client, callbacks, props, set(event), counts)
+
+
+def count_round_trips(scenarios=SCENARIOS):
+    client = app.server.test_client()
+    callbacks = get_server_callbacks(client)
+
+    results = {}
+    for name, page_path, events in scenarios:
+        props = get_initial_props(page_path)
+        page_keys = set(get_page_props(page_path))
+        cascade(client, callbacks, props, set(), {}, initial=True)
+
+        counts = {}
+        for event in events:
+            if isinstance(event, str):
+                page_keys = navigate(client, callbacks, props, page_keys, event, counts)
+            elif isinstance(event, int):
+                resize(client, callbacks, props, event, counts)
+            else:
+                interact(client, callbacks, props, event, counts)
+
+        round_trips = {
+            output: len(timing['durations']) for output, timing in counts.items()
+        }
+        results[name] = {
+            'events': len(events),
+            'round_trips': sum(round_trips.values()),
+            'by_callback': round_trips,
+        }
+
+    return results
+
+
+def print_results(results):
+    for name, result in results.items():
+        print(
+            f'{name}: {result["round_trips"]} round trips for {result["events"]} events '
+            f'({result["round_trips"] / result["events"]:.1f} per event)'
+        )
+        for output, count in sorted(
+            result['by_callback'].items(), key=lambda item: -item[1]
+        ):
+            print(f'    {count:>5}  {output[:100]}')
+
+
+def get_budget_violations(results, budgets=ROUND_TRIP_BUDGETS):
+    violations = []
+    for name, max_round_trips in budgets.items():
+        result = results[name]
+        if result['round_trips'] > max_round_trips * result['events']:
+            violations.append(
+                f'{name}: {result["round_trips"]} round trips for {result["events"]} '
+                f'events, the budget is {max_round_trips} per event'
+            )
+
+    return violations
+
+
+if __name__ == '__main__':
+    results = count_round_trips()
+    print_results(results)
+
+    violations = get_budget_violations(results)
+    for violation in violations:
+        print(f'Over budget - {violation}')
+    if violations:
+        raise SystemExit(1)
@@ -0,0 +1,134 @@
+# Benchmark the time it takes to build (and serialize) each chart's Vega-Lite spec.
+#
+# Run from the `src` directory:
+#     python -m benchmarks.spec_build
+#
+# To compare before / after a change, run the benchmark on both revisions.
+
+import statistics
+import time
+
+from plotly.io.json import to_json_plotly
+
+from plots import (
+    get_bar_chart,
+    get_comparison_plot,
+    get_corr_matrix_plot,
+    get_fighter_selector_chart,
+    get_scatter_plot,
+)
+
+N_RUNS = 200
+
+SPEC_BUILDERS = {
+    'scatter': (
+        get_scatter_plot,
+        {
+            'var_1': 'fastfall_speed',
+            'var_2': 'run_speed',
+            'screen_width': 1440,
+            'screen_height': 900,
+            'excluded_fighter_ids': [],
+            'selected_game': 'ultimate',
+        },
+    ),
+    'corr_matrix': (
+        get_corr_matrix_plot,
+        {'var_1': 'fastfall_speed', 'var_2': 'run_speed', 'screen_width': 1440},
+    ),
+    'horizontal_bar': (
+        get_bar_chart,
+        {
+            'var': 'weight',
+            'screen_width': 1440,
+            'excluded_fighter_ids': [],
+            'selected_game': 'ultimate',
+        },
+    ),
+    'vertical_bar': (
+        get_bar_chart,
+        {
+            'var': 'weight',
+            'screen_width': 600,
+            'excluded_fighter_ids': [],
+            'selected_game': 'ultimate',
+        },
+    ),
+    'comparison': (
+        get_comparison_plot,
+        {
+            'fighter_1': '01',
+            'fighter_2': '09',
+            'selected_game': 'ultimate',
+            'screen_width': 1440,
+            'normalization': 'zscore',
+        },
+    ),
+    'fighter_selector': (
+        get_fighter_selector_chart.__wrapped__,  # uncached, it's built once per game
+        {'selected_game': 'ultimate'},
+    ),
+}
+
+
+def time_calls(function, n_runs=N_RUNS):
+    durations = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def summarize(durations):
+    durations_ms = sorted(1000 * duration for duration in durations)
+    p99_index = min(int(0.99 * len(durations_ms)), len(durations_ms) - 1)
+
+    return {
+        'median': statistics.median(durations_ms),
+        'p99': durations_ms[p99_index],
+    }
+
+
+def run_benchmark(n_runs=N_RUNS):
+    results = {}
+    for chart, (builder, kwargs) in SPEC_BUILDERS.items():
+        spec = builder(**kwargs)
+
+        build_times = summarize(
+            time_calls(lambda builder=builder, kwargs=kwargs: builder(**kwargs), n_runs),
+        )
+        serialize_times = summarize(
+            time_calls(lambda spec=spec: to_json_plotly(spec), n_runs),
+        )
+
+        results[chart] = {
+            'build': build_times,
+            'serialize': serialize_times,
+            'spec_bytes': len(to_json_plotly(spec)),
+        }
+
+    return results
+
+
+def print_results(results):
+    header = (
+        f'{"chart":<18}{"build median":>14}{"build p99":>12}'
+        f'{"json median":>14}{"json p99":>12}{"bytes":>10}'
+    )
+    print(header)
+    print('-' * len(header))
+    for chart, result in results.items():
+        print(
+            f'{chart:<18}'
+            f'{result["build"]["median"]:>12.3f}ms'
+            f'{result["build"]["p99"]:>10.3f}ms'
+            f'{result["serialize"]["median"]:>12.3f}ms'
+            f'{result["serialize"]["p99"]:>10.3f}ms'
+            f'{result["spec_bytes"]:>10}'
+        )
+
+
+if __name__ == '__main__':
+    print_results(run_benchmark())
@@ -0,0 +1,69 @@
+# Compare the time it takes to load the dataset store from the CSVs
+# with mapping the binary snapshot (see snapshot.py).
+#
+# Run from the `src` directory:
+#     python -m benchmarks.startup
+
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.spec_build import summarize, time_calls
+from data_store import (
+    GAMES,
+    compute_dataset_version,
+    get_source_files,
+    load_game_datasets,
+)
+from snapshot import read_snapshot, write_snapshot
+
+N_RUNS = 20
+
+
+def load_csvs():
+    return {game: load_game_datasets(game) for game in GAMES}, compute_dataset_version()
+
+
+def run_benchmark(n_runs=N_RUNS):
+    source_files = get_source_files()
+    datasets, dataset_version = load_csvs()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_file = str(Path(tmp_dir) / 'datasets.snapshot')
+        write_snapshot(snapshot_file, datasets, source_files, dataset_version)
+
+        snapshot_datasets, snapshot_version = read_snapshot(snapshot_file, source_files)
+        for game, tables in datasets.items():
+            for table, columns in tables.items():
+                if not pd.DataFrame(columns).equals(
+                    pd.DataFrame(snapshot_datasets[game][table])
+                ):
+                    raise AssertionError(f'Snapshot does not match CSV: {game} {table}')
+        if snapshot_version != dataset_version:
+            raise AssertionError('Snapshot dataset version does not match')
+
+        return {
+            'csv': summarize(time_calls(load_csvs, n_runs)),
+            'snapshot': summarize(
+                time_calls(lambda: read_snapshot(snapshot_file, source_files), n_runs),
+            ),
+            'snapshot_bytes': Path(snapshot_file).stat().st_size,
+        }
+
+
+def print_results(results):
+    header = f'{"source":<12}{"median":>12}{"p99":>12}'
+    print(header)
+    print('-' * len(header))
+    for source in ['csv', 'snapshot']:
+        print(
+            f'{source:<12}'
+            f'{results[source]["median"]:>10.3f}ms'
+            f'{results[source]["p99"]:>10.3f}ms'
+        )
+    print(f'\nsnapshot size: {results["snapshot_bytes"]} bytes')
+
+
+if __name__ == '__main__':
+    print_results(run_benchmark())
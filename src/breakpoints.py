@@ -0,0 +1,40 @@
+from bisect import bisect_right
+
+# Window size breakpoints (used by the WindowBreakpoints component in app.py)
+# width breakpoint every 50px, plus common bootstrap breakpoints
+WIDTH_BREAKPOINTS_PX = [
+    *range(400, 576, 50),
+    576,
+    *range(600, 768, 50),
+    768,
+    *range(800, 992, 50),
+    992,
+    *range(1000, 2100, 50),
+]
+# height breakpoint every 50px
+HEIGHT_BREAKPOINTS_PX = [*range(400, 1300, 50)]
+
+# Bucket size for screens smaller / larger than every breakpoint
+OUT_OF_RANGE_BUCKET_PX = 50
+
+
+def get_size_bucket(size_px, breakpoints_px):
+    # Quantize a screen dimension to the lower bound of its breakpoint bucket,
+    # so that every screen between two breakpoints gets the same chart sizes
+    # (and therefore shares cached specs).
+    if size_px is None:
+        return None
+
+    i = bisect_right(breakpoints_px, size_px)
+    if i == 0 or i == len(breakpoints_px):
+        return max(size_px - size_px % OUT_OF_RANGE_BUCKET_PX, OUT_OF_RANGE_BUCKET_PX)
+
+    return breakpoints_px[i - 1]
+
+
+def get_width_bucket(screen_width):
+    return get_size_bucket(screen_width, WIDTH_BREAKPOINTS_PX)
+
+
+def get_height_bucket(screen_height):
+    return get_size_bucket(screen_height, HEIGHT_BREAKPOINTS_PX)
@@ -1,97 +1,89 @@
-from dash import Input, Output, State, ctx, html
+from dash import ClientsideFunction, Input, Output, State, ctx, html
 from dash.exceptions import PreventUpdate
-
-from navigation import get_page_container_style, get_sidebar_style_outputs
+from plotly.io.json import to_json_plotly
+
+from fighter_index import (
+    EMPTY_BITMASK,
+    encode_bitmask,
+    get_all_fighter_ids,
+    get_num_fighters,
+    toggle_bitmask,
+)
+from navigation import get_navigation_config
 from plots import get_fighter_selector_chart
 from utils import (
     convert_excluded_fighter_ids,
     determine_clicked_id,
-    get_app_title,
+    get_app_title_variants,
     get_excluded_fighter_ids,
-    get_fighter_lookup_table,
+    get_excluded_fighters_bitmask,
     get_page_title,
-    get_screen_width,
     initialize_excluded_fighters,
     parse_vega_fighter_selection,
     update_excluded_fighter_numbers,
 )
 
+# Pages with a navlink in the sidebar and the drawer, in the navlinks' order
+NAVLINK_PAGES = [
+    '/',
+    '/attribute-correlations',
+    '/attribute-distributions',
+    '/attribute-info',
+    '/fighter-comparisons',
+]
+
 
-def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
+def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):
     # Update the page title
     # based on the current page's url and the user's screen size
-    @app.callback(
+    title_config = {
+        # Some pages use the app's title as the page title,
+        # other pages have a specific title for that page instead.
+        'appTitlePages': ['/', '/attribute-info'],
+        'pageTitles': {
+            page_url: get_page_title(page_url)
+            for page_url in [
+                '/attribute-correlations',
+                '/attribute-distributions',
+                '/fighter-comparisons',
+            ]
+        },
+        'appTitles': get_app_title_variants(),
+        'notFoundTitle': html.H1('404 - Page not found', id='page-title'),
+    }
+    app.clientside_callback(
+        f"""(pageUrl, displaySizeWidthStr) => window.dash_clientside.navigation
+            .getPageTitle(
+                pageUrl, displaySizeWidthStr, {to_json_plotly(title_config)}
+            )""",
         Output('page-title-container', 'children'),
         Input('url', 'pathname'),
         Input('display-size-width', 'children'),
     )
-    def update_page_title(page_url, display_size_width_str):
-        # Some pages use the app's title as the page title,
-        # other pages have a specific title for that page instead.
-        app_title_pages = [
-            '/',
-            '/attribute-info',
-        ]
-        specific_title_pages = [
-            '/attribute-correlations',
-            '/attribute-distributions',
-            '/fighter-comparisons',
-        ]
-
-        if page_url in specific_title_pages:
-            page_title = get_page_title(page_url)
-        elif page_url in app_title_pages:
-            # Choose the size of the app title based on the user's screen width
-            screen_width = get_screen_width(display_size_width_str)
-            page_title = get_app_title(screen_width)
-        else:
-            page_title = html.H1('404 - Page not found', id='page-title')
-
-        return page_title
 
     # Update the active navlink (for both the drawer and the sidebar)
     # based on the current page's url
-    @app.callback(
-        Output('sidebar-navlink-/', 'active'),
-        Output('sidebar-navlink-/attribute-correlations', 'active'),
-        Output('sidebar-navlink-/attribute-distributions', 'active'),
-        Output('sidebar-navlink-/attribute-info', 'active'),
-        Output('sidebar-navlink-/fighter-comparisons', 'active'),
-        Output('drawer-navlink-/', 'active'),
-        Output('drawer-navlink-/attribute-correlations', 'active'),
-        Output('drawer-navlink-/attribute-distributions', 'active'),
-        Output('drawer-navlink-/attribute-info', 'active'),
-        Output('drawer-navlink-/fighter-comparisons', 'active'),
+    app.clientside_callback(
+        f"""(pageUrl) => window.dash_clientside.navigation
+            .getActiveNavlinks(pageUrl, {to_json_plotly(NAVLINK_PAGES)})""",
+        *[
+            Output(f'{nav_type}-navlink-{page_url}', 'active')
+            for nav_type in ['sidebar', 'drawer']
+            for page_url in NAVLINK_PAGES
+        ],
         Input('url', 'pathname'),
     )
-    def update_active_navlink(page_url):
-        home_active = page_url == '/'
-        correlations_active = page_url == '/attribute-correlations'
-        distributions_active = page_url == '/attribute-distributions'
-        info_active = page_url == '/attribute-info'
-        comparisons_active = page_url == '/fighter-comparisons'
-
-        return 2 * (
-            home_active,
-            correlations_active,
-            distributions_active,
-            info_active,
-            comparisons_active,
-        )
 
     # Update the sidebar's status (expanded / collapsed / hidden)
     # based on the current page's url and the user's screen size
-    @app.callback(
-        Output('sidebar-navlink-/', 'styles'),
-        Output('sidebar-navlink-/attribute-correlations', 'styles'),
-        Output('sidebar-navlink-/attribute-distributions', 'styles'),
-        Output('sidebar-navlink-/attribute-info', 'styles'),
-        Output('sidebar-navlink-/fighter-comparisons', 'styles'),
-        Output('sidebar-navlink-/', 'style'),
-        Output('sidebar-navlink-/attribute-correlations', 'style'),
-        Output('sidebar-navlink-/attribute-distributions', 'style'),
-        Output('sidebar-navlink-/attribute-info', 'style'),
-        Output('sidebar-navlink-/fighter-comparisons', 'style'),
+    navigation_config = get_navigation_config(num_pages, drawer_pages, sidebar_pages)
+    app.clientside_callback(
+        f"""(displaySizeWidthStr, pageUrl) => window.dash_clientside.navigation
+            .getSidebarStatus(
+                displaySizeWidthStr, pageUrl, {to_json_plotly(navigation_config)}
+            )""",
+        *[Output(f'sidebar-navlink-{page_url}', 'styles') for page_url in NAVLINK_PAGES],
+        *[Output(f'sidebar-navlink-{page_url}', 'style') for page_url in NAVLINK_PAGES],
         Output('sidebar', 'style'),
         Output('dummy-sidebar', 'style'),
         Output('page-container', 'style'),
@@ -101,62 +93,6 @@ def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
         Input('display-size-width', 'children'),
         Input('url', 'pathname'),
     )
-    def update_sidebar_status(display_size_width_str, page_url):
-        screen_width = get_screen_width(display_size_width_str)
-
-        # Collapse / expand the sidebar depending on the user's screen width.
-        # If the user is on a page with a drawer (no sidebar),
-        # then this happens behind the scenes so that the sidebar
-        # is the correct size when the user navigates to a page with a sidebar.
-        if screen_width is not None and screen_width < 900:
-            # Collapse the sidebar
-            sidebar_styles = get_sidebar_style_outputs(
-                is_collapsed=True,
-                num_pages=num_pages,
-            )
-            page_container_style = get_page_container_style(
-                sidebar_status='collapsed',
-            )
-        else:
-            # Expand the sidebar
-            sidebar_styles = get_sidebar_style_outputs(
-                is_collapsed=False,
-                num_pages=num_pages,
-            )
-            page_container_style = get_page_container_style(
-                sidebar_status='expanded',
-            )
-
-        # Update the page's layout depending on the current page's url
-        if page_url in sidebar_pages:
-            # Display the sidebar, hide the drawer's hamburger menu
-            sidebar_container_style = None
-            drawer_hamburger_menu_style = {'visibility': 'hidden'}
-        elif page_url in drawer_pages:
-            # Hide the sidebar, display the drawer's hamburger menu
-            sidebar_container_style = {'display': 'none'}
-            drawer_hamburger_menu_style = None
-            page_container_style = get_page_container_style(
-                sidebar_status='hidden',
-            )
-        else:
-            # This only happens if the user navigates to a non-existent page
-            # (i.e. a 404 error)
-            sidebar_container_style = {'display': 'none'}
-            drawer_hamburger_menu_style = {'display': 'none'}
-            page_container_style = get_page_container_style(
-                sidebar_status='hidden',
-            )
-
-        dummy_sidebar_container_style = sidebar_container_style
-
-        return (
-            *sidebar_styles,
-            page_container_style,
-            sidebar_container_style,
-            dummy_sidebar_container_style,
-            drawer_hamburger_menu_style,
-        )
 
     # Update the drawer's status (opened / closed)
     # based on the current page's url
@@ -220,46 +156,40 @@ def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
             return True, []
         raise PreventUpdate
 
-    # Update fighter selector chart
+    # Build the fighter selector chart's spec when the game is changed
+    # (once per game, it's cached), and get the game's excluded fighters
     @app.callback(
-        Output('fighter-selector-chart', 'spec'),
+        Output('fighter-selector-spec', 'data'),
         Output('excluded-fighter-ids-mem', 'data'),
+        Input('selected-game-store', 'data'),
+        State('excluded-fighter-numbers', 'data'),
+    )
+    def update_fighter_selector_spec(selected_game, excluded_fighter_numbers):
+        excluded_fighter_ids = convert_excluded_fighter_ids(
+            excluded_fighter_numbers, selected_game
+        )
+
+        return (
+            get_fighter_selector_chart(selected_game),
+            encode_bitmask(excluded_fighter_ids),
+        )
+
+    # Update fighter selector chart: mark the excluded fighters (and reset the
+    # selection) in the browser, so that opening the settings menu and the
+    # select all / clear all buttons need no server work
+    app.clientside_callback(
+        ClientsideFunction(
+            namespace='fighterSelector', function_name='renderFighterSelector'
+        ),
+        Output('fighter-selector-chart', 'spec'),
         Output('cache-breaker', 'data'),
+        Input('fighter-selector-spec', 'data'),
         Input('settings-menu-drawer', 'opened'),
-        Input('game-selector-buttons', 'value'),
         Input('fighter-selector-select-all-button', 'n_clicks'),
         Input('fighter-selector-clear-all-button', 'n_clicks'),
         State('excluded-fighter-ids-mem', 'data'),
-        State('excluded-fighter-numbers', 'data'),
         State('cache-breaker', 'data'),
     )
-    def update_fighter_selector_chart(
-        is_opened,
-        selected_game,
-        select_all_click,
-        clear_all_click,
-        excluded_fighter_ids_mem,
-        excluded_fighter_numbers,
-        cache_breaker,
-    ):
-        if ctx.triggered_id == 'fighter-selector-select-all-button':
-            cache_breaker += 1
-            excluded_fighter_ids = []
-        elif ctx.triggered_id == 'fighter-selector-clear-all-button':
-            cache_breaker += 1
-            excluded_fighter_ids = [*get_fighter_lookup_table(game=selected_game).index]
-        elif ctx.triggered_id == 'game-selector-buttons':
-            excluded_fighter_ids = convert_excluded_fighter_ids(
-                excluded_fighter_numbers, selected_game
-            )
-        else:
-            excluded_fighter_ids = get_excluded_fighter_ids(excluded_fighter_ids_mem)
-
-        chart = get_fighter_selector_chart(
-            excluded_fighter_ids, selected_game, cache_breaker
-        )
-
-        return chart, {'ids': excluded_fighter_ids}, cache_breaker
 
     # Update excluded fighters
     @app.callback(
@@ -273,7 +203,7 @@ def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
         State('fighter-selector-mem', 'data'),
         State('excluded-fighter-ids-mem', 'data'),
         State('skip-next-selector-update', 'data'),
-        State('game-selector-buttons', 'value'),
+        State('selected-game-store', 'data'),
         State('excluded-fighter-numbers', 'data'),
         State('cache-breaker', 'data'),
         State('settings-menu-drawer', 'opened'),
@@ -294,14 +224,14 @@ def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
         if ctx.triggered_id == 'fighter-selector-select-all-button':
             return (
                 {'selected': []},
-                {'ids': []},
+                EMPTY_BITMASK,
                 initialize_excluded_fighters(excluded=None),
                 False,
             )
         if ctx.triggered_id == 'fighter-selector-clear-all-button':
             return (
                 {'selected': []},
-                {'ids': [*get_fighter_lookup_table(game=selected_game).index]},
+                encode_bitmask(get_all_fighter_ids(selected_game)),
                 initialize_excluded_fighters(excluded='all'),
                 False,
             )
@@ -324,21 +254,20 @@ def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
                 False,
             )
 
-        excluded_fighter_ids = get_excluded_fighter_ids(excluded_fighter_ids_mem)
-        if clicked_id in excluded_fighter_ids:
-            excluded_fighter_ids.remove(clicked_id)
-        else:
-            excluded_fighter_ids.append(clicked_id)
-
+        excluded_fighter_ids_mem = toggle_bitmask(
+            get_excluded_fighters_bitmask(excluded_fighter_ids_mem, selected_game),
+            clicked_id,
+            get_num_fighters(selected_game),
+        )
         excluded_fighter_numbers = update_excluded_fighter_numbers(
             excluded_fighter_numbers,
-            excluded_fighter_ids,
+            get_excluded_fighter_ids(excluded_fighter_ids_mem, selected_game),
             selected_game,
         )
 
         return (
             {'selected': selected_fighter_ids},
-            {'ids': excluded_fighter_ids},
+            excluded_fighter_ids_mem,
             excluded_fighter_numbers,
             False,
         )
@@ -365,19 +294,22 @@ def get_callbacks(app, num_pages, drawer_pages, sidebar_pages):  # noqa: PLR0915
         State('breakpoints', 'height'),
     )
 
-    # Sync settings menu game selector with global store
-    @app.callback(
-        Output('game-selector-buttons', 'value'),
-        Input('selected-game-store', 'data'),
-    )
-    def sync_settings_game_selector_from_store(selected_game):
-        return selected_game if selected_game else 'ultimate'
-
-    # Update global store when settings menu game selector changes
-    @app.callback(
-        Output('selected-game-store', 'data', allow_duplicate=True),
+    # Game selection: the session store is the only source of truth, the game
+    # selectors write to it when clicked, and show it (read as a State) when the
+    # settings drawer is opened. Every callback which depends on the game reads
+    # the store, so a game switch fans out to the charts in one step
+    # (see assets/game_state.js)
+    app.clientside_callback(
+        ClientsideFunction(namespace='gameState', function_name='selectGame'),
+        Output('selected-game-store', 'data'),
         Input('game-selector-buttons', 'value'),
+        State('selected-game-store', 'data'),
         prevent_initial_call=True,
     )
-    def update_store_from_settings_selector(selected_game):
-        return selected_game
+    app.clientside_callback(
+        ClientsideFunction(namespace='gameState', function_name='showSelectedGame'),
+        Output('game-selector-buttons', 'value'),
+        Input('settings-menu-drawer', 'opened'),
+        State('selected-game-store', 'data'),
+        State('game-selector-buttons', 'value'),
+    )
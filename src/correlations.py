@@ -0,0 +1,126 @@
+from functools import lru_cache
+
+import numpy as np
+
+from data_store import GAMES, get_columns
+
+
+def get_correlation_attributes(game):
+    # Correlations are only meaningful for the continuous attributes
+    attribute_lookup = get_columns(game, 'attribute_lookup')
+    is_continuous = attribute_lookup['type'] == 'C'
+
+    return attribute_lookup['attribute'][is_continuous].tolist()
+
+
+def compute_pearson_sums(matrix):
+    # Pairwise-complete Pearson sums for every pair of columns (i, j),
+    # i.e. only the rows where both attribute i and attribute j are present count.
+    # The sums for attribute j in the pair are the transposes of those for i.
+    valid = ~np.isnan(matrix)
+    x = np.where(valid, matrix, 0.0)
+    m = valid.astype(float)
+
+    return {
+        'n': m.T @ m,
+        'sum_x': x.T @ m,
+        'sum_xy': x.T @ x,
+        'sum_xx': (x**2).T @ m,
+    }
+
+
+def subtract_pearson_sums(sums, removed_sums):
+    return {key: sums[key] - removed_sums[key] for key in sums}
+
+
+def get_correlations_from_sums(sums, reference_sums=None):
+    # `reference_sums` are the sums that `sums` were derived from by subtraction
+    # (if any), which bound the rounding error left in `sums`.
+    if reference_sums is None:
+        reference_sums = sums
+
+    n = sums['n']
+    sum_x = sums['sum_x']
+    sum_y = sum_x.T
+
+    covariance = n * sums['sum_xy'] - sum_x * sum_y
+    variance_x = n * sums['sum_xx'] - sum_x**2
+
+    # Variances that are only non-zero due to rounding error (e.g. an attribute
+    # which is constant across the remaining fighters) are treated as zero,
+    # which gives an undefined (NaN) correlation, just like DataFrame.corr.
+    # The rounding error scales with the sums before any fighters were removed,
+    # not with what remains of them after the subtraction.
+    variance_x[variance_x <= 1e-12 * n * reference_sums['sum_xx']] = 0
+    variance_y = variance_x.T
+
+    # The covariance of a zero-variance attribute is rounding error too,
+    # so it can't be divided through (that would give a spurious +/-1).
+    defined = (variance_x > 0) & (variance_y > 0)
+    correlations = np.full(covariance.shape, np.nan)
+    correlations[defined] = np.clip(
+        covariance[defined] / np.sqrt(variance_x[defined] * variance_y[defined]),
+        -1,
+        1,
+    )
+
+    correlations.flags.writeable = False
+    return correlations
+
+
+def load_game_correlations(game):
+    attributes = get_correlation_attributes(game)
+    params = get_columns(game, 'params')
+    matrix = np.column_stack(
+        [params[attribute].astype(float) for attribute in attributes],
+    )
+
+    # Center each column before accumulating the sums.
+    # This doesn't change the correlations, but avoids catastrophic cancellation.
+    centered_matrix = matrix - np.nanmean(matrix, axis=0)
+    sums = compute_pearson_sums(centered_matrix)
+
+    return {
+        'attributes': attributes,
+        'centered_matrix': centered_matrix,
+        'sums': sums,
+        'correlations': get_correlations_from_sums(sums),
+    }
+
+
+# Correlation matrices for every game (with no fighters excluded),
+# precomputed once at startup.
+GAME_CORRELATIONS = {game: load_game_correlations(game) for game in GAMES}
+
+
+def get_correlation_matrix(game='ultimate', excluded_fighter_ids=None):
+    if excluded_fighter_ids is None:
+        excluded_fighter_ids = []
+
+    n_fighters = len(GAME_CORRELATIONS[game]['centered_matrix'])
+    excluded_fighter_ids = tuple(
+        sorted({i for i in excluded_fighter_ids if 0 <= i < n_fighters}),
+    )
+
+    return (
+        GAME_CORRELATIONS[game]['attributes'],
+        get_correlations_excluding(game, excluded_fighter_ids),
+    )
+
+
+@lru_cache(maxsize=256)
+def get_correlations_excluding(game, excluded_fighter_ids):
+    game_correlations = GAME_CORRELATIONS[game]
+
+    if len(excluded_fighter_ids) == 0:
+        return game_correlations['correlations']
+
+    # Rather than recomputing the correlations from scratch,
+    # remove the excluded fighters' contributions from the precomputed sums.
+    excluded_rows = game_correlations['centered_matrix'][list(excluded_fighter_ids)]
+    sums = subtract_pearson_sums(
+        game_correlations['sums'],
+        compute_pearson_sums(excluded_rows),
+    )
+
+    return get_correlations_from_sums(sums, reference_sums=game_correlations['sums'])
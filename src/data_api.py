@@ -0,0 +1,65 @@
+from functools import lru_cache
+
+from flask import Response, abort, request
+
+from data_store import DATASET_VERSION, GAMES, NORMALIZATIONS
+from url_paths import get_request_path, get_route_path
+from utils import get_fighter_attributes_df
+
+# The data at a given URL never changes (the URL contains the dataset version),
+# so browsers may cache it for as long as they like.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def get_dataset_name(game, normalization='none'):
+    return f'fighters_{game}_{normalization}'
+
+
+def get_dataset_url(game, normalization='none'):
+    return get_request_path(
+        f'data/{DATASET_VERSION}/{get_dataset_name(game, normalization)}.json'
+    )
+
+
+def get_dataset_etag(game, normalization='none'):
+    return f'"{DATASET_VERSION}-{get_dataset_name(game, normalization)}"'
+
+
+@lru_cache(maxsize=len(GAMES) * len(NORMALIZATIONS))
+def get_dataset_json(game, normalization='none'):
+    # Every fighter (none excluded) with every attribute,
+    # NaNs are written as null so that the browser can parse the JSON.
+    fighter_attributes_df = get_fighter_attributes_df(
+        game=game,
+        normalization=normalization,
+    )
+
+    return fighter_attributes_df.to_json(orient='records')
+
+
+def register_data_routes(server):
+    # Serve each game's fighter attributes as a named, versioned JSON dataset
+    # that the chart specs can reference instead of inlining the data.
+    datasets = {
+        get_dataset_name(game, normalization): (game, normalization)
+        for game in GAMES
+        for normalization in NORMALIZATIONS
+    }
+
+    @server.route(get_route_path('data/<version>/<dataset_name>.json'))
+    def serve_dataset(version, dataset_name):
+        if version != DATASET_VERSION or dataset_name not in datasets:
+            abort(404)
+
+        game, normalization = datasets[dataset_name]
+        etag = get_dataset_etag(game, normalization)
+        headers = {'ETag': etag, 'Cache-Control': IMMUTABLE_CACHE_CONTROL}
+
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=304, headers=headers)
+
+        return Response(
+            get_dataset_json(game, normalization),
+            mimetype='application/json',
+            headers=headers,
+        )
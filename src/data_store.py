@@ -0,0 +1,157 @@
+import hashlib
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from normalization import NORMALIZATION_METHODS, normalize_columns
+from snapshot import SNAPSHOT_FILE, read_snapshot
+from sprites import get_head_image_file, get_head_image_url
+
+DATA_DIR = '../data/clean'
+
+GAMES = ['ultimate', 'sm4sh', 'brawl', 'melee', '64']
+NORMALIZATIONS = ['none', *NORMALIZATION_METHODS]
+
+
+def load_columns(file):
+    # Parse the CSV once and keep each column as a typed (read-only) NumPy array.
+    # fighter_number is kept as a string so that e.g. '01' and '04E' survive.
+    df = pd.read_csv(file, dtype={'fighter_number': str})
+
+    columns = {}
+    for column_name in df.columns:
+        column = df[column_name].to_numpy()
+        column.flags.writeable = False
+        columns[column_name] = column
+
+    return columns
+
+
+def load_game_datasets(game):
+    return {
+        'params': load_columns(f'{DATA_DIR}/{game}_fighter_params.csv'),
+        'fighter_lookup': load_columns(f'{DATA_DIR}/{game}_fighter_lookup_table.csv'),
+        'attribute_lookup': load_columns(f'{DATA_DIR}/{game}_attribute_lookup_table.csv'),
+    }
+
+
+def get_source_files():
+    return sorted(Path(DATA_DIR).rglob('*.csv'))
+
+
+def compute_dataset_version():
+    # Short content hash of every data file,
+    # used to version (and cache-bust) the data served to the browser.
+    hasher = hashlib.sha256()
+    for file in get_source_files():
+        hasher.update(file.read_bytes())
+
+    return hasher.hexdigest()[:12]
+
+
+def load_datasets():
+    # Map the binary snapshot (see snapshot.py) if it's up to date with the CSVs,
+    # otherwise parse the CSVs. Returns (datasets, dataset version, source).
+    snapshot = read_snapshot(SNAPSHOT_FILE, get_source_files())
+    if snapshot is not None:
+        return *snapshot, 'snapshot'
+
+    datasets = {game: load_game_datasets(game) for game in GAMES}
+    return datasets, compute_dataset_version(), 'csv'
+
+
+def get_fighter_slug(fighter_number, fighter):
+    # e.g. ('04E', 'Dark Samus') -> '04E_dark_samus', the head image's file name
+    clean_fighter_name = re.sub(
+        r'\.|\(|\)', '', fighter.lower().replace(' ', '_').replace('&', 'and')
+    )
+
+    return f'{fighter_number}_{clean_fighter_name}'
+
+
+def add_image_columns(datasets):
+    # Add each fighter's slug and head image url to the tables with fighters,
+    # and fail fast if any of the head images doesn't exist.
+    missing_images = set()
+    for game, tables in datasets.items():
+        for table in ['params', 'fighter_lookup']:
+            columns = tables[table]
+            fighter_slugs = [
+                get_fighter_slug(fighter_number, fighter)
+                for fighter_number, fighter in zip(
+                    columns['fighter_number'], columns['fighter'], strict=True
+                )
+            ]
+            missing_images.update(
+                get_head_image_file(game, fighter_slug)
+                for fighter_slug in fighter_slugs
+                if not Path(get_head_image_file(game, fighter_slug)).is_file()
+            )
+
+            image_columns = {
+                'fighter_slug': np.array(fighter_slugs, dtype=object),
+                'img_url': np.array(
+                    [get_head_image_url(game, slug) for slug in fighter_slugs],
+                    dtype=object,
+                ),
+            }
+            for column in image_columns.values():
+                column.flags.writeable = False
+            tables[table] = {**columns, **image_columns}
+
+    if missing_images:
+        raise FileNotFoundError(
+            f'Missing fighter head images: {", ".join(sorted(missing_images))}'
+        )
+
+    return datasets
+
+
+# Process-wide dataset store, loaded once when the module is first imported
+# so that callbacks never need to touch the filesystem or the CSV parser.
+# The load time is reported by metrics.py.
+_load_start = time.perf_counter()
+DATASETS, DATASET_VERSION, DATA_SOURCE = load_datasets()
+DATASETS = add_image_columns(DATASETS)
+DATA_LOAD_SECONDS = time.perf_counter() - _load_start
+
+
+@lru_cache(maxsize=256)
+def get_normalized_params(game, normalization, excluded_fighter_ids):
+    # The normalized variants are derived from the raw params (instead of being
+    # read from separate files), with the statistics computed from the
+    # non-excluded fighters only.
+    columns = DATASETS[game]['params']
+    num_rows = len(columns['fighter_number'])
+    reference_mask = np.ones(num_rows, dtype=bool)
+    reference_mask[[i for i in excluded_fighter_ids if 0 <= i < num_rows]] = False
+
+    return normalize_columns(columns, normalization, reference_mask)
+
+
+def get_columns(game, table, normalization=None, excluded_fighter_ids=None):
+    if game not in DATASETS:
+        raise ValueError(f'Invalid game: {game}. Must be one of {GAMES}.')
+
+    if table == 'params':
+        if normalization is None or normalization == 'none':
+            return DATASETS[game]['params']
+        if excluded_fighter_ids is None:
+            excluded_fighter_ids = []
+        return get_normalized_params(
+            game, normalization, tuple(sorted(set(excluded_fighter_ids)))
+        )
+
+    return DATASETS[game][table]
+
+
+def get_dataframe(game, table, normalization=None, excluded_fighter_ids=None):
+    # Callers are free to mutate the returned DataFrame (e.g. add columns),
+    # so always hand out a copy of the stored columns.
+    return pd.DataFrame(
+        get_columns(game, table, normalization, excluded_fighter_ids), copy=True
+    )
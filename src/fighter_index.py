@@ -0,0 +1,170 @@
+import re
+from functools import lru_cache
+
+from data_store import GAMES, get_columns
+
+# Mapping between a game's fighter ids (row positions in the game's tables)
+# and fighter numbers (e.g. '04E'), which identify a fighter across games.
+# The indexes are built once per game, so translating k fighters is O(k)
+# with no DataFrames involved (these run on the exclusion callbacks' path).
+#
+# Sets of fighters (e.g. the excluded fighters) are stored as bitmasks encoded
+# as hex strings: bit i is set if fighter i (a fighter id, or a position in the
+# fighter universe) is in the set. The encoding is canonical, so two sets are
+# equal if and only if their strings are.
+# The bitmasks are stored in the browser, so the ones received from a client are
+# validated: anything which isn't a (short enough) hex string is the empty set,
+# and bits past the last fighter are dropped.
+EMPTY_BITMASK = '0'
+BITMASK_PATTERN = re.compile(r'[0-9a-f]+')
+
+
+@lru_cache(maxsize=1)
+def get_fighter_universe():
+    # Every fighter number of every game, each with a fixed position
+    # (Ultimate's roster first, since it includes every other game's fighters)
+    fighter_numbers = {}
+    for game in GAMES:
+        fighter_numbers.update(
+            dict.fromkeys(get_columns(game, 'fighter_lookup')['fighter_number'])
+        )
+
+    return tuple(fighter_numbers)
+
+
+@lru_cache(maxsize=1)
+def get_fighter_universe_positions():
+    # fighter number -> position in the fighter universe
+    return {
+        fighter_number: position
+        for position, fighter_number in enumerate(get_fighter_universe())
+    }
+
+
+@lru_cache(maxsize=len(GAMES))
+def get_game_fighter_numbers(game):
+    # fighter id -> fighter number
+    return tuple(get_columns(game, 'fighter_lookup')['fighter_number'])
+
+
+@lru_cache(maxsize=len(GAMES))
+def get_game_fighter_ids(game):
+    # fighter number -> fighter id
+    return {
+        fighter_number: fighter_id
+        for fighter_id, fighter_number in enumerate(get_game_fighter_numbers(game))
+    }
+
+
+@lru_cache(maxsize=len(GAMES))
+def get_game_universe_positions(game):
+    # fighter id -> position in the fighter universe
+    universe_positions = get_fighter_universe_positions()
+
+    return tuple(
+        universe_positions[fighter_number]
+        for fighter_number in get_game_fighter_numbers(game)
+    )
+
+
+def get_num_fighters(game):
+    return len(get_game_fighter_numbers(game))
+
+
+def get_all_fighter_ids(game):
+    return [*range(get_num_fighters(game))]
+
+
+def fighter_ids_to_numbers(game, fighter_ids):
+    fighter_numbers = get_game_fighter_numbers(game)
+
+    return [
+        fighter_numbers[fighter_id]
+        for fighter_id in fighter_ids
+        if 0 <= fighter_id < len(fighter_numbers)
+    ]
+
+
+def fighter_numbers_to_ids(game, fighter_numbers):
+    # Fighters who aren't in the game are skipped
+    fighter_ids = get_game_fighter_ids(game)
+
+    return sorted(
+        fighter_ids[fighter_number]
+        for fighter_number in fighter_numbers
+        if fighter_number in fighter_ids
+    )
+
+
+def map_fighter_ids(fighter_ids, from_game, to_game):
+    # The ids of the same fighters in another game
+    return fighter_numbers_to_ids(to_game, fighter_ids_to_numbers(from_game, fighter_ids))
+
+
+def encode_bitmask(positions):
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+
+    return format(mask, 'x')
+
+
+def parse_bitmask(bitmask, num_positions):
+    # The bitmask as an int, with only the bits of positions 0 to num_positions - 1
+    max_length = max(-(-num_positions // 4), 1)
+    if (
+        not isinstance(bitmask, str)
+        or len(bitmask) > max_length
+        or not BITMASK_PATTERN.fullmatch(bitmask)
+    ):
+        return 0
+
+    return int(bitmask, 16) & ((1 << num_positions) - 1)
+
+
+def decode_bitmask(bitmask, num_positions):
+    # Sorted positions of the set bits
+    mask = parse_bitmask(bitmask, num_positions)
+
+    return [position for position in range(mask.bit_length()) if mask >> position & 1]
+
+
+def toggle_bitmask(bitmask, position, num_positions):
+    mask = parse_bitmask(bitmask, num_positions)
+    if isinstance(position, int) and 0 <= position < num_positions:
+        mask ^= 1 << position
+
+    return format(mask, 'x')
+
+
+def clean_bitmask(bitmask, num_positions):
+    # Canonical encoding of a bitmask from a client
+    return format(parse_bitmask(bitmask, num_positions), 'x')
+
+
+def get_full_universe_bitmask():
+    return format((1 << len(get_fighter_universe())) - 1, 'x')
+
+
+def universe_bitmask_to_fighter_ids(game, bitmask):
+    # The game's fighters which are in a set of the fighter universe
+    mask = parse_bitmask(bitmask, len(get_fighter_universe()))
+
+    return [
+        fighter_id
+        for fighter_id, position in enumerate(get_game_universe_positions(game))
+        if mask >> position & 1
+    ]
+
+
+def update_universe_bitmask(bitmask, game, fighter_ids):
+    # Replace the game's fighters in a set of the fighter universe with the given
+    # fighters, and keep the other games' fighters as they were
+    universe_positions = get_game_universe_positions(game)
+    game_mask = int(encode_bitmask(universe_positions), 16)
+    fighters_mask = int(
+        encode_bitmask(universe_positions[fighter_id] for fighter_id in fighter_ids), 16
+    )
+    mask = parse_bitmask(bitmask, len(get_fighter_universe()))
+
+    return format(mask & ~game_mask | fighters_mask, 'x')
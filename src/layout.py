@@ -97,6 +97,7 @@ def get_settings_menu():
                 style={'z-index': '9999'},
             ),
             dcc.Store(id='cache-breaker', storage_type='memory', data=999),
+            dcc.Store(id='fighter-selector-spec', storage_type='memory'),
             dcc.Store(id='fighter-selector-mem', storage_type='memory'),
             dcc.Store(id='excluded-fighter-ids-mem', storage_type='memory'),
             dcc.Store(id='skip-next-selector-update', storage_type='memory', data=False),
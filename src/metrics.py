@@ -0,0 +1,319 @@
+import cProfile
+import itertools
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from flask import Response, g, request
+
+import data_store
+from correlations import get_correlations_excluding
+from data_api import get_dataset_json
+from plots import get_fighter_selector_chart
+from records import (
+    get_correlation_records_cached,
+    get_fighter_columns,
+    get_fighter_records_cached,
+)
+from response_cache import get_response_cache_info
+
+# Instrumentation of the app's Dash callbacks, exposed on /metrics in the
+# Prometheus text format. Enable by setting the METRICS environment variable.
+#
+# Slow requests can also be profiled: a sample of the callback requests
+# (METRICS_PROFILE_SAMPLE_RATE, 0-1, default 0 i.e. off) is run under cProfile,
+# and the profile is written to PROFILE_DIR if the request took longer than
+# METRICS_SLOW_REQUEST_MS. Open the .prof files with e.g. snakeviz.
+# Requests are sampled at an even interval, e.g. every 10th with a rate of 0.1.
+# Only one request is profiled at a time, even when the server is threaded:
+# sampled requests which start while another one is profiled aren't profiled.
+PROFILE_SAMPLE_RATE = float(os.getenv('METRICS_PROFILE_SAMPLE_RATE', '0'))
+SLOW_REQUEST_SECONDS = float(os.getenv('METRICS_SLOW_REQUEST_MS', '500')) / 1000
+PROFILE_DIR = '../profiler/slow_requests'
+
+METRIC_PREFIX = 'smash_charts'
+
+# Upper bounds (seconds) of the callback duration histogram buckets
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+# In-process (LRU) caches to report hit rates for, besides the callback caches
+LRU_CACHES = {
+    'correlations_excluding': get_correlations_excluding,
+    'dataset_json': get_dataset_json,
+    'normalized_params': data_store.get_normalized_params,
+    'fighter_columns': get_fighter_columns,
+    'fighter_selector_chart': get_fighter_selector_chart,
+    'fighter_records': get_fighter_records_cached,
+    'correlation_records': get_correlation_records_cached,
+}
+
+# Per-callback stats, keyed by the callback's output(s),
+# e.g. 'scatter-plot-params.data' or '..bar-chart.spec...bar-title.children..'
+callback_stats = {}
+profiled_requests = {'sampled': 0, 'written': 0}
+stats_lock = threading.Lock()
+
+# Counts the callback requests, for sampling the requests to profile
+callback_request_counter = itertools.count(1)
+# Held while a request is profiled
+profiler_lock = threading.Lock()
+
+
+def get_empty_callback_stats():
+    return {
+        'count': 0,
+        'duration_sum': 0.0,
+        'duration_buckets': [0] * len(DURATION_BUCKETS),
+        'response_bytes_sum': 0,
+        'errors': 0,
+    }
+
+
+def record_callback(output, duration, response_bytes, is_error):
+    with stats_lock:
+        stats = callback_stats.setdefault(output, get_empty_callback_stats())
+        stats['count'] += 1
+        stats['duration_sum'] += duration
+        stats['response_bytes_sum'] += response_bytes
+        stats['errors'] += is_error
+        for i, upper_bound in enumerate(DURATION_BUCKETS):
+            if duration <= upper_bound:
+                stats['duration_buckets'][i] += 1
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    formatted_labels = ','.join(
+        f'{key}="{escape(value)}"' for key, value in labels.items()
+    )
+
+    return '{' + formatted_labels + '}'
+
+
+def format_metric(name, metric_type, help_text, samples):
+    # Each sample is a (suffix, labels, value) tuple
+    name = f'{METRIC_PREFIX}_{name}'
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    lines.extend(
+        f'{name}{suffix}{format_labels(labels)} {value}'
+        for suffix, labels, value in samples
+    )
+
+    return lines
+
+
+def get_callback_metrics():
+    with stats_lock:
+        stats_by_output = {
+            output: {**stats, 'duration_buckets': [*stats['duration_buckets']]}
+            for output, stats in callback_stats.items()
+        }
+
+    duration_samples = []
+    bytes_samples = []
+    error_samples = []
+    for output, stats in sorted(stats_by_output.items()):
+        labels = {'output': output}
+        for upper_bound, count in zip(
+            DURATION_BUCKETS, stats['duration_buckets'], strict=True
+        ):
+            duration_samples.append(('_bucket', {**labels, 'le': upper_bound}, count))
+        duration_samples.extend(
+            [
+                ('_bucket', {**labels, 'le': '+Inf'}, stats['count']),
+                ('_sum', labels, stats['duration_sum']),
+                ('_count', labels, stats['count']),
+            ]
+        )
+        bytes_samples.extend(
+            [
+                ('_sum', labels, stats['response_bytes_sum']),
+                ('_count', labels, stats['count']),
+            ]
+        )
+        error_samples.append(('', labels, stats['errors']))
+
+    return [
+        *format_metric(
+            'callback_duration_seconds',
+            'histogram',
+            'Time spent handling Dash callback requests.',
+            duration_samples,
+        ),
+        *format_metric(
+            'callback_response_bytes',
+            'summary',
+            'Size of Dash callback responses (e.g. chart specs).',
+            bytes_samples,
+        ),
+        *format_metric(
+            'callback_errors_total',
+            'counter',
+            'Dash callback requests which returned an error status.',
+            error_samples,
+        ),
+    ]
+
+
+def get_cache_metrics():
+    cache_infos = {
+        name: function.cache_info()._asdict() for name, function in LRU_CACHES.items()
+    }
+    cache_infos.update(
+        {
+            f'callback:{name}': {
+                'hits': info['hits'],
+                'misses': info['misses'],
+                'currsize': info['size'],
+            }
+            for name, info in get_response_cache_info().items()
+        }
+    )
+
+    samples = {'hits': [], 'misses': [], 'size': []}
+    for name, info in sorted(cache_infos.items()):
+        labels = {'cache': name}
+        samples['hits'].append(('', labels, info['hits']))
+        samples['misses'].append(('', labels, info['misses']))
+        samples['size'].append(('', labels, info['currsize']))
+
+    return [
+        *format_metric('cache_hits_total', 'counter', 'Cache hits.', samples['hits']),
+        *format_metric(
+            'cache_misses_total', 'counter', 'Cache misses.', samples['misses']
+        ),
+        *format_metric(
+            'cache_size', 'gauge', 'Number of cached entries.', samples['size']
+        ),
+    ]
+
+
+def get_metrics_text():
+    lines = [
+        *get_callback_metrics(),
+        *get_cache_metrics(),
+        *format_metric(
+            'data_load_seconds',
+            'gauge',
+            'Time it took to load the dataset store at startup.',
+            [('', {'source': data_store.DATA_SOURCE}, data_store.DATA_LOAD_SECONDS)],
+        ),
+        *format_metric(
+            'profiled_requests_total',
+            'counter',
+            'Callback requests run under the profiler, and profiles written to disk.',
+            [('', {'result': key}, value) for key, value in profiled_requests.items()],
+        ),
+    ]
+
+    return '\n'.join(lines) + '\n'
+
+
+def get_callback_output(callback_map):
+    # The callback's output(s) identify the callback. The request body comes from
+    # the client, so anything that isn't a registered callback is recorded under
+    # one label (which keeps the number of labels, and profile file names, bounded).
+    body = request.get_json(silent=True) or {}
+    output = body.get('output')
+
+    return output if isinstance(output, str) and output in callback_map else 'unknown'
+
+
+def is_sampled_for_profiling():
+    count = next(callback_request_counter)
+
+    # True once every 1 / PROFILE_SAMPLE_RATE requests
+    return int(count * PROFILE_SAMPLE_RATE) > int((count - 1) * PROFILE_SAMPLE_RATE)
+
+
+def start_profiler():
+    # Returns the started profiler, or None if another request is being profiled
+    if not profiler_lock.acquire(blocking=False):
+        return None
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is active in this process (outside of the metrics)
+        profiler_lock.release()
+        return None
+
+    return profiler
+
+
+def stop_profiler(profiler):
+    profiler.disable()
+    profiler_lock.release()
+
+
+def write_profile(profiler, output, duration):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    file_name = '{}_{}ms_{}.prof'.format(
+        datetime.now().strftime('%Y-%m-%d_%H%M%S'),
+        int(1000 * duration),
+        re.sub(r'[^A-Za-z0-9_-]+', '_', output).strip('_')[:100],
+    )
+    profiler.dump_stats(os.path.join(PROFILE_DIR, file_name))
+
+
+def register_metrics(app):
+    server = app.server
+    callback_path = f'{app.config.routes_pathname_prefix}_dash-update-component'
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path != callback_path:
+            return
+
+        g.metrics_start = time.perf_counter()
+        g.metrics_profiler = None
+        if PROFILE_SAMPLE_RATE and is_sampled_for_profiling():
+            g.metrics_profiler = start_profiler()
+
+    @server.after_request
+    def record_callback_timer(response):
+        if request.path != callback_path or 'metrics_start' not in g:
+            return response
+
+        duration = time.perf_counter() - g.metrics_start
+        output = get_callback_output(app.callback_map)
+        record_callback(
+            output,
+            duration,
+            response.calculate_content_length() or 0,
+            is_error=response.status_code >= 400,
+        )
+
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            stop_profiler(profiler)
+            with stats_lock:
+                profiled_requests['sampled'] += 1
+            if duration >= SLOW_REQUEST_SECONDS:
+                write_profile(profiler, output, duration)
+                with stats_lock:
+                    profiled_requests['written'] += 1
+
+        return response
+
+    @server.teardown_request
+    def stop_callback_profiler(_exception):
+        # Requests which failed before after_request still need to stop profiling
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            stop_profiler(profiler)
+
+    @server.route('/metrics')
+    def serve_metrics():
+        return Response(
+            get_metrics_text(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
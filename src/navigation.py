@@ -16,6 +16,9 @@ EXPANDED_SIDEBAR_NAVLINK_WIDTH = EXPANDED_SIDEBAR_WIDTH - EXPANDED_SIDEBAR_NAVLI
 
 DRAWER_SIZE = EXPANDED_SIDEBAR_WIDTH + EXPANDED_SIDEBAR_NAVLINK_MARGIN
 
+# The sidebar is collapsed on screens narrower than this
+SIDEBAR_COLLAPSE_WIDTH_PX = 900
+
 
 def get_menu_button(div_id, button_type, initial_load=False):
     # Don't display during the initial load:
@@ -258,3 +261,25 @@ def get_page_container_style(sidebar_status):
         }
 
     return page_container_style
+
+
+def get_navigation_config(num_pages, drawer_pages, sidebar_pages):
+    # Every style the navigation chrome can have, for the clientside callbacks
+    # (see assets/navigation.js) which pick one based on the url and screen size
+    return {
+        'collapseBelowPx': SIDEBAR_COLLAPSE_WIDTH_PX,
+        'drawerPages': drawer_pages,
+        'sidebarPages': sidebar_pages,
+        'sidebarStyleOutputs': {
+            'collapsed': get_sidebar_style_outputs(
+                is_collapsed=True, num_pages=num_pages
+            ),
+            'expanded': get_sidebar_style_outputs(
+                is_collapsed=False, num_pages=num_pages
+            ),
+        },
+        'pageContainerStyles': {
+            sidebar_status: get_page_container_style(sidebar_status)
+            for sidebar_status in ['hidden', 'collapsed', 'expanded']
+        },
+    }
@@ -0,0 +1,103 @@
+import warnings
+
+import numpy as np
+
+# Each method maps a (num_fighters x num_attributes) array of raw values to
+# normalized values. The statistics (min, mean, median, ...) are computed from
+# the reference rows only - i.e. the fighters that haven't been excluded -
+# and then applied to every row, so excluded fighters can still be compared.
+# Missing values (NaN) are ignored by the statistics and stay missing.
+# Attributes with no spread across the reference fighters (a zero range,
+# standard deviation or interquartile range) are only centered, not scaled,
+# so the reference fighters get 0 rather than NaN (0 / 0).
+
+
+def get_scale(spread):
+    # The spread to divide by, with zero spreads replaced by 1
+    return np.where(spread > 0, spread, 1.0)
+
+
+def normalize_minmax(values, reference):
+    # Scale to 0-1, where 0 is the minimum and 1 is the maximum value
+    minimum = np.nanmin(reference, axis=0)
+    maximum = np.nanmax(reference, axis=0)
+
+    return (values - minimum) / get_scale(maximum - minimum)
+
+
+def normalize_zscore(values, reference):
+    # Number of (sample) standard deviations from the mean
+    mean = np.nanmean(reference, axis=0)
+    std = np.nanstd(reference, axis=0, ddof=1)
+
+    return (values - mean) / get_scale(std)
+
+
+def normalize_robust(values, reference):
+    # Like the z-score, but using the median and the interquartile range,
+    # so that a few extreme fighters don't squash everyone else together
+    q1, median, q3 = np.nanpercentile(reference, [25, 50, 75], axis=0)
+
+    return (values - median) / get_scale(q3 - q1)
+
+
+def normalize_percentile(values, reference):
+    # Fraction of the reference fighters with a value <= the fighter's value
+    normalized = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        reference_column = np.sort(reference[:, j][~np.isnan(reference[:, j])])
+        if len(reference_column) == 0:
+            continue
+
+        valid = ~np.isnan(column)
+        normalized[valid, j] = np.searchsorted(
+            reference_column, column[valid], side='right'
+        ) / len(reference_column)
+
+    return normalized
+
+
+NORMALIZATION_METHODS = {
+    'minmax': normalize_minmax,
+    'zscore': normalize_zscore,
+    'robust': normalize_robust,
+    'percentile': normalize_percentile,
+}
+
+
+def normalize_columns(columns, method, reference_mask=None):
+    # Normalize every numeric column (except fighter_number, which is a string)
+    # using the given method. Returns read-only columns, like data_store.
+    if method not in NORMALIZATION_METHODS:
+        raise ValueError(
+            f'Invalid normalization: {method}. Must be one of {[*NORMALIZATION_METHODS]}.'
+        )
+
+    numeric_fields = [
+        field for field, column in columns.items() if column.dtype.kind in 'iuf'
+    ]
+    normalized_columns = dict(columns)
+    if not numeric_fields:
+        return normalized_columns
+
+    values = np.column_stack(
+        [columns[field].astype(float) for field in numeric_fields],
+    )
+    if reference_mask is None or not reference_mask.any():
+        # With every fighter excluded, fall back to normalizing against everyone
+        reference = values
+    else:
+        reference = values[reference_mask]
+
+    # All-missing attributes give NaN
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # all-NaN slices
+        normalized = NORMALIZATION_METHODS[method](values, reference)
+
+    for j, field in enumerate(numeric_fields):
+        column = np.where(np.isfinite(normalized[:, j]), normalized[:, j], np.nan)
+        column.flags.writeable = False
+        normalized_columns[field] = column
+
+    return normalized_columns
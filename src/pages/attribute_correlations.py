@@ -3,29 +3,53 @@ from json import loads
 import dash
 import dash_bootstrap_components as dbc
 import dash_vega_components as dvc
-from dash import Input, Output, State, callback, dcc, html
+from dash import (
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+    callback,
+    clientside_callback,
+    ctx,
+    dcc,
+    html,
+    no_update,
+)
 from dash.exceptions import PreventUpdate
 
+from fighter_index import EMPTY_BITMASK
 from plots import (
     DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
     DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
+    get_corr_matrix_highlight_patches,
     get_corr_matrix_plot,
     get_scatter_plot,
+    get_scatter_plot_axes_patches,
+    get_scatter_plot_exclusion_patches,
     get_scatter_plot_title,
 )
+from response_cache import memoize_response
+from spec_patches import get_spec_patch
 from utils import (
+    get_all_dropdown_options,
     get_attribute_selector_dropdown,
+    get_dropdown_options_store,
     get_excluded_fighter_ids,
+    get_excluded_fighters_bitmask,
     get_icon,
-    get_screen_height,
-    get_screen_width,
-    get_valid_attributes,
+    get_plot_kwargs,
     get_vertical_spacer,
     get_window_title,
+    lazy_layout,
 )
 
 dash.register_page(__name__, title=get_window_title(__name__), order=3)
 
+# Screen size the server builds the scatter plot and correlation matrix specs for,
+# the specs are then re-sized in the browser for the user's actual screen
+NOMINAL_SCREEN_WIDTH = 900
+NOMINAL_SCREEN_HEIGHT = 600
+
 # Define preset attribute pairs for quick selection
 PRESET_PAIRS = [
     {
@@ -45,215 +69,232 @@ PRESET_PAIRS = [
     },
 ]
 
-preset_buttons = [
-    dbc.Button(
-        preset['label'],
-        id={'type': 'preset-button', 'index': i},
-        color='light',
-        size='sm',
-        className='w-100 mb-2',
-    )
-    for i, preset in enumerate(PRESET_PAIRS)
-]
 
-plot_controls_card = dbc.Card(
-    className='mb-3',
-    children=[
-        dbc.CardBody(
-            [
-                html.H4('Choose Attributes', className='mb-3'),
-                html.Div(
-                    id='scatter-dropdown-container',
-                    children=[
-                        html.Label('X-Axis:', className='mb-1'),
-                        get_attribute_selector_dropdown(
-                            div_id='scatter-dropdown-1',
-                            default_value=DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
-                            data_type='continuous',
-                        ),
-                        get_vertical_spacer(height=12),
-                        html.Label('Y-Axis:', className='mb-1'),
-                        get_attribute_selector_dropdown(
-                            div_id='scatter-dropdown-2',
-                            default_value=DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
-                            data_type='continuous',
-                        ),
-                    ],
-                ),
-                get_vertical_spacer(height=16),
-                dbc.Button(
-                    [get_icon('mdi:swap-vertical', height=18), ' Swap Axes'],
-                    id='swap-axes-button',
-                    color='light',
-                    size='sm',
-                    className='w-100',
-                ),
-                get_vertical_spacer(height=20),
-                html.H5('Quick Selections', className='mb-2'),
-                html.Div(
-                    id='preset-buttons-container',
-                    children=preset_buttons,
-                ),
-                get_vertical_spacer(height=20),
-                html.H5('Chart Options', className='mb-2'),
-                html.Label('Fighter Icon Size:', className='mb-1'),
-                dcc.Slider(
-                    id='scatter-image-size-slider',
-                    value=1,
-                    min=0,
-                    max=2,
-                    step=0.25,
-                    marks={0: 'XS', 0.5: 'S', 1: 'M', 1.5: 'L', 2: 'XL'},
-                    updatemode='drag',
-                ),
-                get_vertical_spacer(height=15),
-                dbc.Switch(
-                    id='scatter-aspect-mode',
-                    label='Maintain Square Aspect Ratio',
-                    value=True,
-                ),
-                dbc.Tooltip(
-                    [
-                        'When enabled, plot maintains 1:1 aspect ratio. ',
-                        html.Br(),
-                        'When disabled, plot expands to fill available space.',
-                    ],
-                    target='scatter-aspect-mode',
-                    trigger='hover',
-                    placement='right',
-                ),
-            ]
+def get_preset_buttons():
+    return [
+        dbc.Button(
+            preset['label'],
+            id={'type': 'preset-button', 'index': i},
+            color='light',
+            size='sm',
+            className='w-100 mb-2',
         )
-    ],
-)
+        for i, preset in enumerate(PRESET_PAIRS)
+    ]
 
-correlation_matrix_card = dbc.Card(
-    [
-        dbc.CardBody(
-            [
-                html.Div(
-                    [
-                        html.H5(
-                            'Correlation Matrix',
-                            style={'display': 'inline-block'},
-                        ),
-                        html.Span(
-                            get_icon(
-                                'mdi:information-outline',
-                                height=20,
+
+def get_plot_controls_card():
+    return dbc.Card(
+        className='mb-3',
+        children=[
+            dbc.CardBody(
+                [
+                    html.H4('Choose Attributes', className='mb-3'),
+                    html.Div(
+                        id='scatter-dropdown-container',
+                        children=[
+                            html.Label('X-Axis:', className='mb-1'),
+                            get_attribute_selector_dropdown(
+                                div_id='scatter-dropdown-1',
+                                default_value=DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
+                                data_type='continuous',
                             ),
-                            id='correlation-info-icon',
-                            style={
-                                'margin-left': '8px',
-                                'cursor': 'help',
-                                'vertical-align': 'middle',
-                                'opacity': 0.7,
-                            },
-                        ),
-                        dbc.Tooltip(
-                            'Correlation is a value between -1 and 1 that '
-                            'measures how closely two attributes are related. '
-                            'Positive means they increase together, '
-                            'negative means they move oppositely. '
-                            'Values near ±1 mean a stronger link, '
-                            'values near 0 mean a weaker link.',
-                            target='correlation-info-icon',
-                            placement='right',
+                            get_vertical_spacer(height=12),
+                            html.Label('Y-Axis:', className='mb-1'),
+                            get_attribute_selector_dropdown(
+                                div_id='scatter-dropdown-2',
+                                default_value=DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
+                                data_type='continuous',
+                            ),
+                        ],
+                    ),
+                    get_vertical_spacer(height=16),
+                    dbc.Button(
+                        [get_icon('mdi:swap-vertical', height=18), ' Swap Axes'],
+                        id='swap-axes-button',
+                        color='light',
+                        size='sm',
+                        className='w-100',
+                    ),
+                    get_vertical_spacer(height=20),
+                    html.H5('Quick Selections', className='mb-2'),
+                    html.Div(
+                        id='preset-buttons-container',
+                        children=get_preset_buttons(),
+                    ),
+                    get_vertical_spacer(height=20),
+                    html.H5('Chart Options', className='mb-2'),
+                    html.Label('Fighter Icon Size:', className='mb-1'),
+                    dcc.Slider(
+                        id='scatter-image-size-slider',
+                        value=1,
+                        min=0,
+                        max=2,
+                        step=0.25,
+                        marks={0: 'XS', 0.5: 'S', 1: 'M', 1.5: 'L', 2: 'XL'},
+                        updatemode='drag',
+                    ),
+                    get_vertical_spacer(height=15),
+                    dbc.Switch(
+                        id='scatter-aspect-mode',
+                        label='Maintain Square Aspect Ratio',
+                        value=True,
+                    ),
+                    dbc.Tooltip(
+                        [
+                            'When enabled, plot maintains 1:1 aspect ratio. ',
+                            html.Br(),
+                            'When disabled, plot expands to fill available space.',
+                        ],
+                        target='scatter-aspect-mode',
+                        trigger='hover',
+                        placement='right',
+                    ),
+                ]
+            )
+        ],
+    )
+
+
+def get_correlation_matrix_card():
+    return dbc.Card(
+        [
+            dbc.CardBody(
+                [
+                    html.Div(
+                        [
+                            html.H5(
+                                'Correlation Matrix',
+                                style={'display': 'inline-block'},
+                            ),
+                            html.Span(
+                                get_icon(
+                                    'mdi:information-outline',
+                                    height=20,
+                                ),
+                                id='correlation-info-icon',
+                                style={
+                                    'margin-left': '8px',
+                                    'cursor': 'help',
+                                    'vertical-align': 'middle',
+                                    'opacity': 0.7,
+                                },
+                            ),
+                            dbc.Tooltip(
+                                'Correlation is a value between -1 and 1 that '
+                                'measures how closely two attributes are related. '
+                                'Positive means they increase together, '
+                                'negative means they move oppositely. '
+                                'Values near ±1 mean a stronger link, '
+                                'values near 0 mean a weaker link.',
+                                target='correlation-info-icon',
+                                placement='right',
+                            ),
+                        ],
+                        className='mb-2',
+                    ),
+                    dbc.Collapse(
+                        dvc.Vega(
+                            id='corr-matrix-plot',
+                            className='corr-matrix-plot-frame',
+                            opt={'renderer': 'svg', 'actions': False},
+                            style={'margin-top': '10px'},
                         ),
-                    ],
-                    className='mb-2',
-                ),
-                dbc.Collapse(
+                        id='correlation-collapse',
+                        is_open=False,
+                    ),
+                    dbc.Button(
+                        id='toggle-correlation-button',
+                        children=[
+                            get_icon('mdi:chevron-right', height=18),
+                            ' Show Matrix',
+                        ],
+                        color='link',
+                        size='sm',
+                        className='p-0',
+                    ),
+                ]
+            ),
+        ],
+    )
+
+
+def get_scatter_plot_card():
+    return dbc.Card(
+        [
+            dbc.CardBody(
+                style={'overflow': 'hidden'},
+                children=[
+                    html.Div(
+                        [
+                            html.H3(
+                                id='scatter-title',
+                                style={'display': 'inline-block'},
+                            ),
+                        ],
+                        className='mb-3',
+                    ),
                     dvc.Vega(
-                        id='corr-matrix-plot',
-                        className='corr-matrix-plot-frame',
+                        id='scatter-plot',
+                        className='scatter-plot-frame',
                         opt={'renderer': 'svg', 'actions': False},
-                        style={'margin-top': '10px'},
                     ),
-                    id='correlation-collapse',
-                    is_open=False,
-                ),
-                dbc.Button(
-                    id='toggle-correlation-button',
-                    children=[
-                        get_icon('mdi:chevron-right', height=18),
-                        ' Show Matrix',
-                    ],
-                    color='link',
-                    size='sm',
-                    className='p-0',
-                ),
-            ]
-        ),
-    ],
-)
+                ],
+            ),
+        ],
+    )
 
-scatter_plot_card = dbc.Card(
-    [
-        dbc.CardBody(
-            style={'overflow': 'hidden'},
-            children=[
-                html.Div(
-                    [
-                        html.H3(
-                            id='scatter-title',
-                            style={'display': 'inline-block'},
-                        ),
-                    ],
-                    className='mb-3',
-                ),
-                dvc.Vega(
-                    id='scatter-plot',
-                    className='scatter-plot-frame',
-                    opt={'renderer': 'svg', 'actions': False},
-                ),
-            ],
-        ),
-    ],
-)
 
-layout = html.Div(
-    className='inner-page-container',
-    style={'margin-top': '20px'},
-    children=[
-        dbc.Row(
-            [
-                # Left column: Controls
-                dbc.Col(
-                    [
-                        plot_controls_card,
-                        correlation_matrix_card,
-                    ],
-                    width=12,
-                    lg=3,
-                    className='mb-3',
-                ),
-                # Right column: Scatter plot
-                dbc.Col(
-                    [
-                        scatter_plot_card,
-                    ],
-                    width=12,
-                    lg=9,
-                ),
-            ],
-        ),
-        dcc.Store(
-            id='scatter-plot-params',
-            storage_type='memory',
-            data={
-                'var_1': DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
-                'var_2': DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
-                'screen_width': 900,
-                'screen_height': 600,
-                'excluded_fighter_ids': [],
-                'selected_game': 'ultimate',
-                'image_size_multiplier': 1.0,
-                'maintain_square_aspect': True,
-            },
-        ),
-    ],
-)
+@lazy_layout
+def layout():
+    return html.Div(
+        className='inner-page-container',
+        style={'margin-top': '20px'},
+        children=[
+            dbc.Row(
+                [
+                    # Left column: Controls
+                    dbc.Col(
+                        [
+                            get_plot_controls_card(),
+                            get_correlation_matrix_card(),
+                        ],
+                        width=12,
+                        lg=3,
+                        className='mb-3',
+                    ),
+                    # Right column: Scatter plot
+                    dbc.Col(
+                        [
+                            get_scatter_plot_card(),
+                        ],
+                        width=12,
+                        lg=9,
+                    ),
+                ],
+            ),
+            dcc.Store(
+                id='scatter-plot-params',
+                storage_type='memory',
+                data={
+                    'var_1': DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
+                    'var_2': DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
+                    'excluded_fighters': EMPTY_BITMASK,
+                    'selected_game': 'ultimate',
+                },
+            ),
+            dcc.Store(id='scatter-plot-spec', storage_type='memory'),
+            dcc.Store(id='corr-matrix-spec', storage_type='memory'),
+            get_dropdown_options_store(
+                div_id='scatter-dropdown-options',
+                options_by_game=get_all_dropdown_options(data_type='continuous'),
+                default_values=[
+                    DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
+                    DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
+                ],
+            ),
+        ],
+    )
 
 
 # Toggle correlation matrix collapse
@@ -293,7 +334,7 @@ def swap_axes(n_clicks, var_1, var_2):
     Output('scatter-dropdown-1', 'value', allow_duplicate=True),
     Output('scatter-dropdown-2', 'value', allow_duplicate=True),
     Input({'type': 'preset-button', 'index': dash.dependencies.ALL}, 'n_clicks'),
-    State('game-selector-buttons', 'value'),
+    State('selected-game-store', 'data'),
     prevent_initial_call=True,
 )
 def handle_preset_buttons(n_clicks_list, selected_game):
@@ -316,129 +357,124 @@ def handle_preset_buttons(n_clicks_list, selected_game):
     return preset['x'], preset['y']
 
 
-# Update dropdown list when game is changed
-@callback(
-    Output('scatter-dropdown-container', 'children'),
-    Input('game-selector-buttons', 'value'),
-    State('scatter-plot-params', 'data'),
+# Update dropdown list when game is changed (in the browser)
+clientside_callback(
+    ClientsideFunction(
+        namespace='dropdownOptions', function_name='switchDropdownOptions'
+    ),
+    Output('scatter-dropdown-1', 'options'),
+    Output('scatter-dropdown-2', 'options'),
+    Output('scatter-dropdown-1', 'value', allow_duplicate=True),
+    Output('scatter-dropdown-2', 'value', allow_duplicate=True),
+    Input('selected-game-store', 'data'),
+    State('scatter-dropdown-options', 'data'),
+    State('scatter-dropdown-1', 'value'),
+    State('scatter-dropdown-2', 'value'),
+    prevent_initial_call='initial_duplicate',
 )
-def update_scatter_dropdowns(selected_game, scatter_plot_params):
-    valid_attributes = get_valid_attributes(data_type='continuous', game=selected_game)
-    prev_scatter_var_1 = scatter_plot_params['var_1']
-    prev_scatter_var_2 = scatter_plot_params['var_2']
-
-    if prev_scatter_var_1 in valid_attributes:
-        default_value_1 = prev_scatter_var_1
-    else:
-        default_value_1 = DEFAULT_SCATTER_PLOT_ATTRIBUTE_1
-
-    if prev_scatter_var_2 in valid_attributes:
-        default_value_2 = prev_scatter_var_2
-    else:
-        default_value_2 = DEFAULT_SCATTER_PLOT_ATTRIBUTE_2
-
-    return [
-        html.Label('X-Axis:', className='mb-1'),
-        get_attribute_selector_dropdown(
-            div_id='scatter-dropdown-1',
-            default_value=default_value_1,
-            data_type='continuous',
-            game=selected_game,
-        ),
-        get_vertical_spacer(height=12),
-        html.Label('Y-Axis:', className='mb-1'),
-        get_attribute_selector_dropdown(
-            div_id='scatter-dropdown-2',
-            default_value=default_value_2,
-            data_type='continuous',
-            game=selected_game,
-        ),
-    ]
 
 
-# Update scatter plot parameters object
+# Update the scatter plot and the correlation matrix plot, in one round trip.
+# The params store holds the last plotted params, so that inputs which don't
+# change the plots need no work.
+# Only the inputs which change the plotted data go through the server,
+# both plots are sized in the browser (see resizeScatterPlot and
+# resizeCorrMatrixPlot in assets/chart_sizing.js).
 @callback(
     Output('scatter-plot-params', 'data'),
+    Output('scatter-plot-spec', 'data'),
+    Output('scatter-title', 'children'),
+    Output('corr-matrix-spec', 'data'),
     Input('scatter-dropdown-1', 'value'),
     Input('scatter-dropdown-2', 'value'),
-    Input('display-size-width', 'children'),
-    Input('display-size-height', 'children'),
     Input('excluded-fighter-ids-mem', 'data'),
-    Input('game-selector-buttons', 'value'),
-    Input('scatter-image-size-slider', 'value'),
-    Input('scatter-aspect-mode', 'value'),
+    Input('selected-game-store', 'data'),
     State('scatter-plot-params', 'data'),
 )
-def update_scatter_plot_params(
+def update_scatter_plots(
     scatter_var_1,
     scatter_var_2,
-    display_size_width_str,
-    display_size_height_str,
     excluded_fighter_ids_mem,
     selected_game,
-    image_size_slider_val,
-    maintain_square_aspect,
     scatter_plot_params,
 ):
-    screen_width = get_screen_width(display_size_width_str)
-    screen_height = get_screen_height(display_size_height_str)
-    excluded_fighter_ids = get_excluded_fighter_ids(excluded_fighter_ids_mem)
-    image_size_multiplier = calc_image_size_multiplier(image_size_slider_val)
+    excluded_fighters = get_excluded_fighters_bitmask(
+        excluded_fighter_ids_mem, selected_game
+    )
 
     prev_scatter_var_1 = scatter_plot_params['var_1']
     prev_scatter_var_2 = scatter_plot_params['var_2']
-    prev_screen_width = scatter_plot_params['screen_width']
-    prev_screen_height = scatter_plot_params['screen_height']
-    prev_excluded_fighter_ids = scatter_plot_params['excluded_fighter_ids']
+    prev_excluded_fighters = scatter_plot_params['excluded_fighters']
     prev_selected_game = scatter_plot_params['selected_game']
-    prev_image_size_multiplier = scatter_plot_params['image_size_multiplier']
-    prev_maintain_square_aspect = scatter_plot_params['maintain_square_aspect']
 
     if scatter_var_1 is None:
         scatter_var_1 = prev_scatter_var_1
     if scatter_var_2 is None:
         scatter_var_2 = prev_scatter_var_2
-    if screen_width is None:
-        screen_width = prev_screen_width
-    if screen_height is None:
-        screen_height = prev_screen_height
-    if abs(image_size_multiplier - prev_image_size_multiplier) < 0.02:
-        image_size_multiplier = prev_image_size_multiplier
-    if maintain_square_aspect is None:
-        maintain_square_aspect = prev_maintain_square_aspect
+
+    is_vars_changed = (
+        scatter_var_1 != prev_scatter_var_1 or scatter_var_2 != prev_scatter_var_2
+    )
+    is_axes_swap = (
+        is_vars_changed
+        and scatter_var_1 == prev_scatter_var_2
+        and scatter_var_2 == prev_scatter_var_1
+    )
+    is_game_changed = selected_game != prev_selected_game
+    is_exclusion_changed = excluded_fighters != prev_excluded_fighters
+    is_dataset_changed = is_game_changed or is_exclusion_changed
+    is_initial_call = ctx.triggered_id is None
 
     # Prevent unnecessary updates:
-    if (
-        scatter_var_1 == prev_scatter_var_1
-        and scatter_var_2 == prev_scatter_var_2
-        and screen_width == prev_screen_width
-        and screen_height == prev_screen_height
-        and set(excluded_fighter_ids) == set(prev_excluded_fighter_ids)
-        and selected_game == prev_selected_game
-        and round(image_size_multiplier, 2) == round(prev_image_size_multiplier, 2)
-        and maintain_square_aspect == prev_maintain_square_aspect
-    ):
+    if not (is_initial_call or is_vars_changed or is_dataset_changed):
         raise PreventUpdate
 
-    return {
+    data_params = {
         'var_1': scatter_var_1,
         'var_2': scatter_var_2,
-        'screen_width': screen_width,
-        'screen_height': screen_height,
-        'excluded_fighter_ids': excluded_fighter_ids,
+        'excluded_fighters': excluded_fighters,
         'selected_game': selected_game,
-        'image_size_multiplier': image_size_multiplier,
-        'maintain_square_aspect': maintain_square_aspect,
     }
+    # Swapping the axes, changing the highlighted attributes and (un)excluding
+    # fighters only change parts of the specs the browser already has,
+    # so only those parts are sent
+    if is_initial_call or is_game_changed or (is_vars_changed and not is_axes_swap):
+        scatter_plot_spec, scatter_title = get_scatter_plot_outputs(data_params)
+    elif is_axes_swap or is_exclusion_changed:
+        patches = {}
+        list_changes = {}
+        scatter_title = no_update
+        if is_axes_swap:
+            patches.update(get_scatter_plot_axes_patches(scatter_var_1, scatter_var_2))
+            scatter_title = get_scatter_plot_title(scatter_var_1, scatter_var_2)
+        if is_exclusion_changed:
+            exclusion_patches, list_changes = get_scatter_plot_exclusion_patches(
+                scatter_var_1,
+                scatter_var_2,
+                selected_game,
+                get_excluded_fighter_ids(excluded_fighters, selected_game),
+                get_excluded_fighter_ids(prev_excluded_fighters, selected_game),
+            )
+            patches.update(exclusion_patches)
+        scatter_plot_spec = get_spec_patch(patches, list_changes)
+    else:
+        # Only the highlighted attributes changed (on the correlation matrix)
+        scatter_plot_spec, scatter_title = no_update, no_update
 
+    if is_initial_call or is_dataset_changed:
+        corr_matrix_spec = get_corr_matrix_spec(data_params)
+    else:
+        # Only the highlighted attributes changed
+        corr_matrix_spec = get_spec_patch(
+            get_corr_matrix_highlight_patches(scatter_var_1, scatter_var_2)
+        )
 
-# Update the scatter plot
-@callback(
-    Output('scatter-plot', 'spec'),
-    Output('scatter-title', 'children'),
-    Input('scatter-plot-params', 'data'),
-)
-def update_scatter_plot(scatter_plot_params):
+    return data_params, scatter_plot_spec, scatter_title, corr_matrix_spec
+
+
+# The (unsized) scatter plot spec and title
+@memoize_response()
+def get_scatter_plot_outputs(scatter_plot_params):
     title_params = {
         key: scatter_plot_params[key]
         for key in ['var_1', 'var_2']
@@ -446,28 +482,42 @@ def update_scatter_plot(scatter_plot_params):
     }
 
     return (
-        get_scatter_plot(**scatter_plot_params),
+        get_scatter_plot(
+            **get_plot_kwargs(scatter_plot_params),
+            screen_width=NOMINAL_SCREEN_WIDTH,
+            screen_height=NOMINAL_SCREEN_HEIGHT,
+        ),
         get_scatter_plot_title(**title_params),
     )
 
 
-# Update the correlation matrix plot
-@callback(
-    Output('corr-matrix-plot', 'spec'),
-    Input('scatter-plot-params', 'data'),
+# Size the scatter plot for the user's screen and the chosen icon size / aspect
+# ratio, without a round trip to the server
+clientside_callback(
+    ClientsideFunction(namespace='chartSizing', function_name='resizeScatterPlot'),
+    Output('scatter-plot', 'spec'),
+    Input('scatter-plot-spec', 'data'),
+    Input('display-size-width', 'children'),
+    Input('display-size-height', 'children'),
+    Input('scatter-image-size-slider', 'value'),
+    Input('scatter-aspect-mode', 'value'),
 )
-def update_corr_matrix_plot(scatter_plot_params):
-    corr_matrix_params = {
-        key: scatter_plot_params[key]
-        for key in ['var_1', 'var_2', 'screen_width']
-        if key in scatter_plot_params
-    }
 
-    return get_corr_matrix_plot(**corr_matrix_params)
+
+# The (unsized) correlation matrix spec
+@memoize_response()
+def get_corr_matrix_spec(corr_matrix_params):
+    return get_corr_matrix_plot(
+        **get_plot_kwargs(corr_matrix_params),
+        screen_width=NOMINAL_SCREEN_WIDTH,
+    )
 
 
-def calc_image_size_multiplier(x):
-    if not isinstance(x, int | float):
-        return 1.0
-    # f(0) = 1/2; f(1) = 1; f(2) = 2
-    return (0.25 * x**2) + (0.25 * x) + 0.5
+# Size the correlation matrix for the user's screen, without a round trip
+# to the server
+clientside_callback(
+    ClientsideFunction(namespace='chartSizing', function_name='resizeCorrMatrixPlot'),
+    Output('corr-matrix-plot', 'spec'),
+    Input('corr-matrix-spec', 'data'),
+    Input('display-size-width', 'children'),
+)
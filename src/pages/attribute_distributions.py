@@ -1,135 +1,165 @@
 import dash
 import dash_bootstrap_components as dbc
 import dash_vega_components as dvc
-from dash import Input, Output, State, callback, dcc, html
+from dash import (
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+    callback,
+    clientside_callback,
+    ctx,
+    dcc,
+    html,
+    no_update,
+)
 from dash.exceptions import PreventUpdate
 
-from plots import DEFAULT_BAR_CHART_ATTRIBUTE, get_bar_chart, get_bar_chart_title
+from breakpoints import get_width_bucket
+from fighter_index import EMPTY_BITMASK
+from plots import (
+    DEFAULT_BAR_CHART_ATTRIBUTE,
+    get_bar_chart,
+    get_bar_chart_exclusion_patches,
+    get_bar_chart_title,
+)
+from response_cache import memoize_response
+from spec_patches import get_spec_patch
 from utils import (
+    get_all_dropdown_options,
     get_attribute_selector_dropdown,
+    get_dropdown_options_store,
     get_excluded_fighter_ids,
+    get_excluded_fighters_bitmask,
+    get_plot_kwargs,
     get_screen_width,
-    get_valid_attributes,
     get_vertical_spacer,
     get_window_title,
+    lazy_layout,
 )
 
 dash.register_page(__name__, title=get_window_title(__name__), order=2)
 
-layout = html.Div(
-    className='inner-page-container',
-    children=[
-        dbc.Row(
-            [
-                # Attribute selection (1x dropdown list)
-                html.Div(
-                    children=[
-                        html.Div(
-                            children=html.H4('Choose an attribute:'),
-                            style={
-                                'width': '270px',
-                                'padding-left': '5px',
-                            },
-                        ),
-                        html.Div(
-                            id='bar-dropdown-container',
-                            children=[
-                                get_attribute_selector_dropdown(
-                                    div_id='bar-dropdown',
-                                    default_value=DEFAULT_BAR_CHART_ATTRIBUTE,
-                                ),
-                            ],
-                            style={'width': '270px'},
-                        ),
-                    ],
-                    style={
-                        'width': '95%',
-                        'float': 'right',
-                    },
-                ),
-            ],
-        ),
-        dbc.Row(
-            [
-                # Spacer
-                get_vertical_spacer(height=20),
-            ],
-        ),
-        dbc.Row(
-            [
-                # Bar chart
-                html.H3(
-                    id='bar-title',
-                    style={
-                        'height': '6%',
-                        'width': '100%',
-                        'text-align': 'center',
-                    },
-                ),
-                dvc.Vega(
-                    id='bar-chart',
-                    className='bar-chart-frame',
-                    opt={'renderer': 'svg', 'actions': False},
-                ),
-            ],
-        ),
-        dcc.Store(
-            id='bar-chart-params',
-            storage_type='memory',
-            data={
-                'var': DEFAULT_BAR_CHART_ATTRIBUTE,
-                'screen_width': 900,
-                'excluded_fighter_ids': [],
-                'selected_game': 'ultimate',
-            },
-        ),
-    ],
-)
-
 
-# Update dropdown list when game is changed
-@callback(
-    Output('bar-dropdown-container', 'children'),
-    Input('game-selector-buttons', 'value'),
-    State('bar-chart-params', 'data'),
-)
-def update_bar_dropdown(selected_game, bar_chart_params):
-    prev_selected_var = bar_chart_params['var']
+@lazy_layout
+def layout():
+    return html.Div(
+        className='inner-page-container',
+        children=[
+            dbc.Row(
+                [
+                    # Attribute selection (1x dropdown list)
+                    html.Div(
+                        children=[
+                            html.Div(
+                                children=html.H4('Choose an attribute:'),
+                                style={
+                                    'width': '270px',
+                                    'padding-left': '5px',
+                                },
+                            ),
+                            html.Div(
+                                id='bar-dropdown-container',
+                                children=[
+                                    get_attribute_selector_dropdown(
+                                        div_id='bar-dropdown',
+                                        default_value=DEFAULT_BAR_CHART_ATTRIBUTE,
+                                    ),
+                                ],
+                                style={'width': '270px'},
+                            ),
+                        ],
+                        style={
+                            'width': '95%',
+                            'float': 'right',
+                        },
+                    ),
+                ],
+            ),
+            dbc.Row(
+                [
+                    # Spacer
+                    get_vertical_spacer(height=20),
+                ],
+            ),
+            dbc.Row(
+                [
+                    # Bar chart
+                    html.H3(
+                        id='bar-title',
+                        style={
+                            'height': '6%',
+                            'width': '100%',
+                            'text-align': 'center',
+                        },
+                    ),
+                    dvc.Vega(
+                        id='bar-chart',
+                        className='bar-chart-frame',
+                        opt={'renderer': 'svg', 'actions': False},
+                    ),
+                ],
+            ),
+            dcc.Store(
+                id='bar-chart-params',
+                storage_type='memory',
+                data={
+                    'var': DEFAULT_BAR_CHART_ATTRIBUTE,
+                    'screen_width': 900,
+                    'excluded_fighters': EMPTY_BITMASK,
+                    'selected_game': 'ultimate',
+                },
+            ),
+            get_dropdown_options_store(
+                div_id='bar-dropdown-options',
+                options_by_game=get_all_dropdown_options(data_type='all'),
+                default_values=[DEFAULT_BAR_CHART_ATTRIBUTE],
+            ),
+        ],
+    )
 
-    if prev_selected_var in get_valid_attributes(data_type='all', game=selected_game):
-        default_value = prev_selected_var
-    else:
-        default_value = DEFAULT_BAR_CHART_ATTRIBUTE
 
-    return get_attribute_selector_dropdown(
-        div_id='bar-dropdown',
-        default_value=default_value,
-        game=selected_game,
-    )
+# Update dropdown list when game is changed (in the browser)
+clientside_callback(
+    ClientsideFunction(
+        namespace='dropdownOptions', function_name='switchDropdownOptions'
+    ),
+    Output('bar-dropdown', 'options'),
+    Output('bar-dropdown', 'value'),
+    Input('selected-game-store', 'data'),
+    State('bar-dropdown-options', 'data'),
+    State('bar-dropdown', 'value'),
+)
 
 
-# Update bar chart parameters object
+# Update the bar chart, in one round trip.
+# The params store holds the last plotted params, so that inputs which don't
+# change the chart (e.g. a resize within the same breakpoint) need no work.
 @callback(
     Output('bar-chart-params', 'data'),
+    Output('bar-chart', 'spec'),
+    Output('bar-title', 'children'),
     Input('bar-dropdown', 'value'),
     Input('display-size-width', 'children'),
     Input('excluded-fighter-ids-mem', 'data'),
-    Input('game-selector-buttons', 'value'),
+    Input('selected-game-store', 'data'),
     State('bar-chart-params', 'data'),
 )
-def update_scatter_plot_params(
+def update_bar_chart(
     selected_var,
     display_size_width_str,
     excluded_fighter_ids_mem,
     selected_game,
     bar_chart_params,
 ):
-    screen_width = get_screen_width(display_size_width_str)
-    excluded_fighter_ids = get_excluded_fighter_ids(excluded_fighter_ids_mem)
+    screen_width = get_width_bucket(get_screen_width(display_size_width_str))
+    excluded_fighters = get_excluded_fighters_bitmask(
+        excluded_fighter_ids_mem, selected_game
+    )
 
     prev_selected_var = bar_chart_params['var']
     prev_screen_width = bar_chart_params['screen_width']
-    prev_excluded_fighter_ids = bar_chart_params['excluded_fighter_ids']
+    prev_excluded_fighters = bar_chart_params['excluded_fighters']
     prev_selected_game = bar_chart_params['selected_game']
 
     if selected_var is None:
@@ -137,31 +167,44 @@ def update_scatter_plot_params(
     if screen_width is None:
         screen_width = prev_screen_width
 
-    # Prevent unnecessary updates:
-    if (
-        selected_var == prev_selected_var
-        and screen_width == prev_screen_width
-        and set(excluded_fighter_ids) == set(prev_excluded_fighter_ids)
-        and selected_game == prev_selected_game
-    ):
+    is_initial_call = ctx.triggered_id is None
+    is_exclusion_changed = excluded_fighters != prev_excluded_fighters
+    is_chart_changed = (
+        selected_var != prev_selected_var
+        or screen_width != prev_screen_width
+        or selected_game != prev_selected_game
+    )
+
+    # Prevent unnecessary updates (the chart is always built on the initial call):
+    if not (is_initial_call or is_chart_changed or is_exclusion_changed):
         raise PreventUpdate
 
-    return {
+    bar_chart_params = {
         'var': selected_var,
         'screen_width': screen_width,
-        'excluded_fighter_ids': excluded_fighter_ids,
+        'excluded_fighters': excluded_fighters,
         'selected_game': selected_game,
     }
 
+    if is_initial_call or is_chart_changed:
+        return bar_chart_params, *get_bar_chart_outputs(bar_chart_params)
 
-# Update the bar chart
-@callback(
-    Output('bar-chart', 'spec'),
-    Output('bar-title', 'children'),
-    Input('bar-chart-params', 'data'),
-)
-def update_bar_chart(bar_chart_params):
+    # Only the excluded fighters changed: send the rows to remove / add
+    # (and the new order of the bars) instead of the whole spec
+    patches, list_changes = get_bar_chart_exclusion_patches(
+        selected_var,
+        screen_width,
+        selected_game,
+        get_excluded_fighter_ids(excluded_fighters, selected_game),
+        get_excluded_fighter_ids(prev_excluded_fighters, selected_game),
+    )
+
+    return bar_chart_params, get_spec_patch(patches, list_changes), no_update
+
+
+@memoize_response()
+def get_bar_chart_outputs(bar_chart_params):
     return (
-        get_bar_chart(**bar_chart_params),
+        get_bar_chart(**get_plot_kwargs(bar_chart_params)),
         get_bar_chart_title(bar_chart_params['var']),
     )
@@ -1,292 +1,438 @@
 import dash
 import dash_bootstrap_components as dbc
 import dash_vega_components as dvc
-from dash import Input, Output, State, callback, dcc, html
+from dash import (
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+    callback,
+    clientside_callback,
+    ctx,
+    dcc,
+    html,
+)
 from dash.exceptions import PreventUpdate
 
+from breakpoints import get_width_bucket
+from fighter_index import EMPTY_BITMASK
 from layout import get_game_selector_buttons
 from plots import (
     DEFAULT_FIGHTER_1,
     DEFAULT_FIGHTER_2,
+    MAX_COMPARISON_FIGHTERS,
     get_comparison_plot,
 )
+from response_cache import memoize_response
 from utils import (
-    get_fighter_lookup_table,
+    get_all_fighter_dropdown_options,
+    get_dropdown_options_store,
+    get_excluded_fighters_bitmask,
     get_fighter_selector_dropdown,
     get_icon,
     get_normalization_tooltip,
+    get_plot_kwargs,
     get_screen_width,
     get_vertical_spacer,
     get_window_title,
+    lazy_layout,
 )
 
 dash.register_page(__name__, title=get_window_title(__name__), order=4)
 
-layout = html.Div(
-    className='inner-page-container',
-    children=[
-        html.Div(
-            [
-                dbc.Row(
-                    [
-                        # Left column: Fighter selection and normalization controls
-                        dbc.Col(
-                            [
-                                html.Div(
-                                    children=html.H4('Choose two fighters:'),
-                                    style={
-                                        'width': '270px',
-                                        'padding-left': '5px',
-                                    },
-                                ),
-                                html.Div(
-                                    id='comparison-dropdown-container',
-                                    children=[
-                                        get_fighter_selector_dropdown(
-                                            div_id='fighter-comparison-dropdown-1',
-                                            default_value=DEFAULT_FIGHTER_1,
-                                        ),
-                                        get_vertical_spacer(height=8),
-                                        get_fighter_selector_dropdown(
-                                            div_id='fighter-comparison-dropdown-2',
-                                            default_value=DEFAULT_FIGHTER_2,
+PAIR_DROPDOWN_STYLE = {'width': '270px'}
+MULTI_DROPDOWN_STYLE = {'width': '270px'}
+
+
+@lazy_layout
+def layout():
+    return html.Div(
+        className='inner-page-container',
+        children=[
+            html.Div(
+                [
+                    dbc.Row(
+                        [
+                            # Left column: Fighter selection and normalization controls
+                            dbc.Col(
+                                [
+                                    html.Div(
+                                        children=dcc.RadioItems(
+                                            id='comparison-mode-selector',
+                                            options=[
+                                                {
+                                                    'label': 'Two fighters',
+                                                    'value': 'pair',
+                                                },
+                                                {
+                                                    'label': 'Up to '
+                                                    f'{MAX_COMPARISON_FIGHTERS} fighters',
+                                                    'value': 'multi',
+                                                },
+                                            ],
+                                            value='pair',
+                                            inline=True,
+                                            inputStyle={'margin-right': '4px'},
+                                            labelStyle={'margin-right': '12px'},
                                         ),
-                                    ],
-                                    style={'width': '270px'},
-                                ),
-                                get_vertical_spacer(height=20),
-                                html.Div(
-                                    children=[
-                                        html.H4(
-                                            'Select Game:', style={'margin-bottom': '8px'}
+                                        style={
+                                            'width': '270px',
+                                            'padding-left': '5px',
+                                            'margin-bottom': '8px',
+                                        },
+                                    ),
+                                    html.Div(
+                                        children=html.H4(
+                                            'Choose two fighters:',
+                                            id='comparison-dropdown-heading',
                                         ),
-                                        html.Div(
-                                            get_game_selector_buttons(
-                                                'game-selector-buttons-comparison'
+                                        style={
+                                            'width': '270px',
+                                            'padding-left': '5px',
+                                        },
+                                    ),
+                                    html.Div(
+                                        id='comparison-dropdown-container',
+                                        children=[
+                                            get_fighter_selector_dropdown(
+                                                div_id='fighter-comparison-dropdown-1',
+                                                default_value=DEFAULT_FIGHTER_1,
                                             ),
-                                            style={
-                                                'display': 'flex',
-                                                'flex-direction': 'column',
-                                                'gap': '4px',
-                                            },
-                                        ),
-                                    ],
-                                    style={'width': '270px', 'padding-left': '5px'},
-                                ),
-                                get_vertical_spacer(height=20),
-                                html.Div(
-                                    children=[
-                                        html.Div(
-                                            [
-                                                html.H4(
-                                                    'Normalization:',
-                                                    style={
-                                                        'display': 'inline-block',
-                                                        'margin-bottom': '8px',
-                                                    },
+                                            get_vertical_spacer(height=8),
+                                            get_fighter_selector_dropdown(
+                                                div_id='fighter-comparison-dropdown-2',
+                                                default_value=DEFAULT_FIGHTER_2,
+                                            ),
+                                        ],
+                                        style=PAIR_DROPDOWN_STYLE,
+                                    ),
+                                    html.Div(
+                                        id='comparison-multi-dropdown-container',
+                                        children=[
+                                            get_fighter_selector_dropdown(
+                                                div_id='fighter-comparison-dropdown-multi',
+                                                default_value=[
+                                                    DEFAULT_FIGHTER_1,
+                                                    DEFAULT_FIGHTER_2,
+                                                ],
+                                                multi=True,
+                                            ),
+                                            dbc.FormText(
+                                                f'Up to {MAX_COMPARISON_FIGHTERS} '
+                                                'fighters can be compared. '
+                                                'Remove a fighter to choose another.',
+                                                id='comparison-multi-limit-message',
+                                                style={'display': 'none'},
+                                            ),
+                                        ],
+                                        style={**MULTI_DROPDOWN_STYLE, 'display': 'none'},
+                                    ),
+                                    get_vertical_spacer(height=20),
+                                    html.Div(
+                                        children=[
+                                            html.H4(
+                                                'Select Game:',
+                                                style={'margin-bottom': '8px'},
+                                            ),
+                                            html.Div(
+                                                get_game_selector_buttons(
+                                                    'game-selector-buttons-comparison'
                                                 ),
-                                                html.Span(
-                                                    get_icon(
-                                                        'mdi:information-outline',
-                                                        height=20,
+                                                style={
+                                                    'display': 'flex',
+                                                    'flex-direction': 'column',
+                                                    'gap': '4px',
+                                                },
+                                            ),
+                                        ],
+                                        style={'width': '270px', 'padding-left': '5px'},
+                                    ),
+                                    get_vertical_spacer(height=20),
+                                    html.Div(
+                                        children=[
+                                            html.Div(
+                                                [
+                                                    html.H4(
+                                                        'Normalization:',
+                                                        style={
+                                                            'display': 'inline-block',
+                                                            'margin-bottom': '8px',
+                                                        },
+                                                    ),
+                                                    html.Span(
+                                                        get_icon(
+                                                            'mdi:information-outline',
+                                                            height=20,
+                                                        ),
+                                                        id='normalization-info-icon',
+                                                        style={
+                                                            'margin-left': '8px',
+                                                            'cursor': 'help',
+                                                            'vertical-align': 'middle',
+                                                            'opacity': 0.7,
+                                                        },
                                                     ),
-                                                    id='normalization-info-icon',
-                                                    style={
-                                                        'margin-left': '8px',
-                                                        'cursor': 'help',
-                                                        'vertical-align': 'middle',
-                                                        'opacity': 0.7,
+                                                    get_normalization_tooltip(),
+                                                ],
+                                            ),
+                                            dcc.RadioItems(
+                                                id='normalization-selector',
+                                                options=[
+                                                    {'label': 'None', 'value': 'none'},
+                                                    {
+                                                        'label': 'Min-Max (0-1)',
+                                                        'value': 'minmax',
                                                     },
-                                                ),
-                                                get_normalization_tooltip(),
-                                            ],
-                                        ),
-                                        dcc.RadioItems(
-                                            id='normalization-selector',
-                                            options=[
-                                                {'label': 'None', 'value': 'none'},
-                                                {
-                                                    'label': 'Min-Max (0-1)',
-                                                    'value': 'minmax',
+                                                    {
+                                                        'label': 'Z-Score',
+                                                        'value': 'zscore',
+                                                    },
+                                                    {
+                                                        'label': 'Robust (Median / IQR)',
+                                                        'value': 'robust',
+                                                    },
+                                                    {
+                                                        'label': 'Percentile',
+                                                        'value': 'percentile',
+                                                    },
+                                                ],
+                                                value='none',
+                                                style={
+                                                    'display': 'flex',
+                                                    'flex-direction': 'column',
+                                                    'gap': '4px',
                                                 },
-                                                {'label': 'Z-Score', 'value': 'zscore'},
-                                            ],
-                                            value='none',
-                                            style={
-                                                'display': 'flex',
-                                                'flex-direction': 'column',
-                                                'gap': '4px',
-                                            },
-                                        ),
-                                    ],
-                                    style={'width': '270px', 'padding-left': '5px'},
-                                ),
-                            ],
-                            width=12,
-                            md=12,
-                            lg=4,
-                            style={'margin-bottom': '20px'},
-                        ),
-                        # Right column: Comparison plot
-                        dbc.Col(
-                            [
-                                dvc.Vega(
-                                    id='comparison-plot',
-                                    className='comparison-plot-frame',
-                                    opt={'renderer': 'svg', 'actions': False},
-                                ),
-                            ],
-                            width=12,
-                            md=12,
-                            lg=8,
-                            style={
-                                'display': 'flex',
-                                'flex-direction': 'column',
-                                'align-items': 'center',
-                                'padding-top': '20px',
-                                'padding-bottom': '100px',
-                            },
-                        ),
-                    ],
-                    style={'margin-bottom': '80px'},
-                ),
-            ],
-            style={
-                'max-width': '1400px',
-                'margin': '0 auto',
-                'width': '100%',
-                'float': 'left',
-            },
-        ),
-        dcc.Store(
-            id='comparison-plot-params',
-            storage_type='memory',
-            data={
-                'fighter_1': DEFAULT_FIGHTER_1,
-                'fighter_2': DEFAULT_FIGHTER_2,
-                'screen_width': 900,
-                'selected_game': 'ultimate',
-                'normalization': 'none',
-            },
-        ),
-    ],
-)
-
-
-# Sync local game selector with global store
-@callback(
-    Output('game-selector-buttons-comparison', 'value'),
-    Input('selected-game-store', 'data'),
-)
-def sync_game_selector_from_store(selected_game):
-    return selected_game if selected_game else 'ultimate'
+                                            ),
+                                        ],
+                                        style={'width': '270px', 'padding-left': '5px'},
+                                    ),
+                                ],
+                                width=12,
+                                md=12,
+                                lg=4,
+                                style={'margin-bottom': '20px'},
+                            ),
+                            # Right column: Comparison plot
+                            dbc.Col(
+                                [
+                                    dvc.Vega(
+                                        id='comparison-plot',
+                                        className='comparison-plot-frame',
+                                        opt={'renderer': 'svg', 'actions': False},
+                                    ),
+                                ],
+                                width=12,
+                                md=12,
+                                lg=8,
+                                style={
+                                    'display': 'flex',
+                                    'flex-direction': 'column',
+                                    'align-items': 'center',
+                                    'padding-top': '20px',
+                                    'padding-bottom': '100px',
+                                },
+                            ),
+                        ],
+                        style={'margin-bottom': '80px'},
+                    ),
+                ],
+                style={
+                    'max-width': '1400px',
+                    'margin': '0 auto',
+                    'width': '100%',
+                    'float': 'left',
+                },
+            ),
+            dcc.Store(
+                id='comparison-plot-params',
+                storage_type='memory',
+                data={
+                    'fighter_1': DEFAULT_FIGHTER_1,
+                    'fighter_2': DEFAULT_FIGHTER_2,
+                    'screen_width': 900,
+                    'selected_game': 'ultimate',
+                    'normalization': 'none',
+                    'fighters': [DEFAULT_FIGHTER_1, DEFAULT_FIGHTER_2],
+                    'comparison_mode': 'pair',
+                    'excluded_fighters': EMPTY_BITMASK,
+                },
+            ),
+            get_dropdown_options_store(
+                div_id='fighter-comparison-dropdown-options',
+                options_by_game=get_all_fighter_dropdown_options(),
+                default_values=[DEFAULT_FIGHTER_1, DEFAULT_FIGHTER_2, []],
+            ),
+            dcc.Store(
+                id='comparison-max-fighters',
+                storage_type='memory',
+                data=MAX_COMPARISON_FIGHTERS,
+            ),
+        ],
+    )
 
 
-# Update global store when local game selector changes
-@callback(
+# The local game selector writes to the session store when clicked, and shows
+# the stored game when the page is loaded and when the settings drawer (with the
+# other game selector) is opened or closed (in the browser),
+# see the game selection callbacks in callbacks.py
+clientside_callback(
+    ClientsideFunction(namespace='gameState', function_name='selectGame'),
     Output('selected-game-store', 'data', allow_duplicate=True),
     Input('game-selector-buttons-comparison', 'value'),
+    State('selected-game-store', 'data'),
     prevent_initial_call=True,
 )
-def update_store_from_local_selector(selected_game):
-    return selected_game
+clientside_callback(
+    ClientsideFunction(namespace='gameState', function_name='showSelectedGame'),
+    Output('game-selector-buttons-comparison', 'value'),
+    Input('settings-menu-drawer', 'opened'),
+    State('selected-game-store', 'data'),
+    State('game-selector-buttons-comparison', 'value'),
+)
 
 
-# Update fighter dropdown list when game is changed
+# Switch between comparing two fighters and comparing many fighters
 @callback(
-    Output('comparison-dropdown-container', 'children'),
-    Input('game-selector-buttons-comparison', 'value'),
-    State('comparison-plot-params', 'data'),
+    Output('comparison-dropdown-heading', 'children'),
+    Output('comparison-dropdown-container', 'style'),
+    Output('comparison-multi-dropdown-container', 'style'),
+    Input('comparison-mode-selector', 'value'),
 )
-def update_fighter_dropdowns(selected_game, comparison_plot_params):
-    fighter_lookup = get_fighter_lookup_table(game=selected_game)
-    available_fighter_numbers = fighter_lookup['fighter_number'].tolist()
-    prev_fighter_1 = comparison_plot_params['fighter_1']
-    prev_fighter_2 = comparison_plot_params['fighter_2']
+def update_comparison_mode(comparison_mode):
+    if comparison_mode == 'multi':
+        return (
+            f'Choose up to {MAX_COMPARISON_FIGHTERS} fighters:',
+            {**PAIR_DROPDOWN_STYLE, 'display': 'none'},
+            MULTI_DROPDOWN_STYLE,
+        )
 
-    if prev_fighter_1 in available_fighter_numbers:
-        default_fighter_1 = prev_fighter_1
-    else:
-        default_fighter_1 = DEFAULT_FIGHTER_1
+    return (
+        'Choose two fighters:',
+        PAIR_DROPDOWN_STYLE,
+        {**MULTI_DROPDOWN_STYLE, 'display': 'none'},
+    )
 
-    if prev_fighter_2 in available_fighter_numbers:
-        default_fighter_2 = prev_fighter_2
-    else:
-        default_fighter_2 = DEFAULT_FIGHTER_2
 
-    return [
-        get_fighter_selector_dropdown(
-            div_id='fighter-comparison-dropdown-1',
-            default_value=default_fighter_1,
-            game=selected_game,
-        ),
-        get_vertical_spacer(height=8),
-        get_fighter_selector_dropdown(
-            div_id='fighter-comparison-dropdown-2',
-            default_value=default_fighter_2,
-            game=selected_game,
-        ),
-    ]
+# Update fighter dropdown lists when game is changed (in the browser)
+clientside_callback(
+    ClientsideFunction(
+        namespace='dropdownOptions', function_name='switchDropdownOptions'
+    ),
+    Output('fighter-comparison-dropdown-1', 'options'),
+    Output('fighter-comparison-dropdown-2', 'options'),
+    Output('fighter-comparison-dropdown-multi', 'options'),
+    Output('fighter-comparison-dropdown-1', 'value'),
+    Output('fighter-comparison-dropdown-2', 'value'),
+    Output('fighter-comparison-dropdown-multi', 'value'),
+    Input('selected-game-store', 'data'),
+    State('fighter-comparison-dropdown-options', 'data'),
+    State('fighter-comparison-dropdown-1', 'value'),
+    State('fighter-comparison-dropdown-2', 'value'),
+    State('fighter-comparison-dropdown-multi', 'value'),
+)
+
+
+# Cap the number of fighters in the multi-select dropdown (in the browser):
+# once the cap is reached, the other fighters can't be chosen
+clientside_callback(
+    ClientsideFunction(namespace='dropdownOptions', function_name='capMultiSelection'),
+    Output('fighter-comparison-dropdown-multi', 'options', allow_duplicate=True),
+    Output('comparison-multi-limit-message', 'style'),
+    Input('fighter-comparison-dropdown-multi', 'value'),
+    Input('selected-game-store', 'data'),
+    State('fighter-comparison-dropdown-options', 'data'),
+    State('comparison-max-fighters', 'data'),
+    prevent_initial_call=True,
+)
 
 
-# Update comparison plot parameters object
+# Update the comparison plot, in one round trip.
+# The params store holds the last plotted params, so that inputs which don't
+# change the plot (e.g. a resize within the same breakpoint) need no work.
 @callback(
     Output('comparison-plot-params', 'data'),
+    Output('comparison-plot', 'spec'),
     Input('fighter-comparison-dropdown-1', 'value'),
     Input('fighter-comparison-dropdown-2', 'value'),
+    Input('fighter-comparison-dropdown-multi', 'value'),
+    Input('comparison-mode-selector', 'value'),
     Input('display-size-width', 'children'),
-    Input('game-selector-buttons-comparison', 'value'),
+    Input('selected-game-store', 'data'),
     Input('normalization-selector', 'value'),
+    Input('excluded-fighter-ids-mem', 'data'),
     State('comparison-plot-params', 'data'),
 )
-def update_comparison_params(
+def update_comparison_plot(
     fighter_1,
     fighter_2,
+    fighters,
+    comparison_mode,
     display_size_width_str,
     selected_game,
     normalization,
+    excluded_fighter_ids_mem,
     comparison_plot_params,
 ):
-    screen_width = get_screen_width(display_size_width_str)
+    screen_width = get_width_bucket(get_screen_width(display_size_width_str))
+    excluded_fighters = get_excluded_fighters_bitmask(
+        excluded_fighter_ids_mem, selected_game
+    )
 
     prev_fighter_1 = comparison_plot_params['fighter_1']
     prev_fighter_2 = comparison_plot_params['fighter_2']
+    prev_fighters = comparison_plot_params['fighters']
+    prev_comparison_mode = comparison_plot_params['comparison_mode']
     prev_screen_width = comparison_plot_params['screen_width']
     prev_selected_game = comparison_plot_params['selected_game']
     prev_normalization = comparison_plot_params['normalization']
+    prev_excluded_fighters = comparison_plot_params['excluded_fighters']
 
     if fighter_1 is None:
         fighter_1 = prev_fighter_1
     if fighter_2 is None:
         fighter_2 = prev_fighter_2
+    if fighters is None:
+        fighters = prev_fighters
+    fighters = fighters[:MAX_COMPARISON_FIGHTERS]
+    if comparison_mode is None:
+        comparison_mode = prev_comparison_mode
     if screen_width is None:
         screen_width = prev_screen_width
     if normalization is None:
         normalization = prev_normalization
+    if normalization == 'none':
+        # Raw values don't depend on which fighters are excluded, so neither do
+        # the plot and its cache key (as in get_fighter_records_cached)
+        excluded_fighters = EMPTY_BITMASK
 
-    # Prevent unnecessary updates
+    # Prevent unnecessary updates (the plot is always built on the initial call)
     if (
-        fighter_1 == prev_fighter_1
+        ctx.triggered_id is not None
+        and fighter_1 == prev_fighter_1
         and fighter_2 == prev_fighter_2
+        and fighters == prev_fighters
+        and comparison_mode == prev_comparison_mode
         and screen_width == prev_screen_width
         and selected_game == prev_selected_game
         and normalization == prev_normalization
+        and excluded_fighters == prev_excluded_fighters
     ):
         raise PreventUpdate
 
-    return {
+    comparison_plot_params = {
         'fighter_1': fighter_1,
         'fighter_2': fighter_2,
         'screen_width': screen_width,
         'selected_game': selected_game,
         'normalization': normalization,
+        'fighters': fighters,
+        'comparison_mode': comparison_mode,
+        'excluded_fighters': excluded_fighters,
     }
 
+    return comparison_plot_params, get_comparison_spec(comparison_plot_params)
 
-# Update the comparison plot
-@callback(
-    Output('comparison-plot', 'spec'),
-    Input('comparison-plot-params', 'data'),
-)
-def update_comparison_plot(comparison_plot_params):
-    return get_comparison_plot(**comparison_plot_params)
+
+@memoize_response()
+def get_comparison_spec(comparison_plot_params):
+    return get_comparison_plot(**get_plot_kwargs(comparison_plot_params))
@@ -1,11 +1,14 @@
 import dash
 from dash import html
 
-from utils import get_introduction_block, get_window_title
+from utils import get_introduction_block, get_window_title, lazy_layout
 
 dash.register_page(__name__, title=get_window_title(__name__), path='/', order=1)
 
-layout = html.Div(
-    className='inner-page-container',
-    children=[get_introduction_block()],
-)
+
+@lazy_layout
+def layout():
+    return html.Div(
+        className='inner-page-container',
+        children=[get_introduction_block()],
+    )
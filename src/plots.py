@@ -1,14 +1,22 @@
 import math
-
-from utils import (
-    append_img_urls,
-    append_row_col_for_fighter_selector,
-    format_attribute_name,
-    get_correlations_df,
-    get_fighter_attributes_df,
-    get_fighter_lookup_table,
-    get_valid_attributes,
+import os
+from functools import cache
+
+import numpy as np
+
+from breakpoints import get_height_bucket, get_width_bucket
+from data_api import get_dataset_name, get_dataset_url
+from data_store import get_columns
+from records import (
+    columns_to_records,
+    get_correlation_records,
+    get_fighter_records,
+    get_fighter_records_by_id,
+    get_fighter_selector_columns,
+    get_fighter_selector_records,
+    get_long_format_columns,
 )
+from utils import format_attribute_name, get_valid_attributes
 
 DEFAULT_BAR_CHART_ATTRIBUTE = 'weight'
 DEFAULT_SCATTER_PLOT_ATTRIBUTE_1 = 'fastfall_speed'
@@ -16,6 +24,29 @@ DEFAULT_SCATTER_PLOT_ATTRIBUTE_2 = 'run_speed'
 DEFAULT_FIGHTER_1 = '01'  # Mario
 DEFAULT_FIGHTER_2 = '09'  # Luigi
 
+# Colors of the fighters on the comparison plot, in order of selection
+COMPARISON_COLORS = [
+    '#5B9BD5',
+    '#FF8C42',
+    '#70AD47',
+    '#E15759',
+    '#9467BD',
+    '#EDC948',
+    '#17BECF',
+    '#8C564B',
+]
+MAX_COMPARISON_FIGHTERS = len(COMPARISON_COLORS)
+
+# Reference the fighter data by URL (see data_api.py) instead of embedding it
+# in every spec, so that the browser can cache it and reuse it across charts.
+# Enable by setting the DATA_URLS environment variable.
+USE_DATA_URLS = bool(os.getenv('DATA_URLS'))
+
+VEGA_LITE_SCHEMA = 'https://vega.github.io/schema/vega-lite/v5.15.1.json'
+
+# x-position of the reference line on the comparison plot for normalized data
+BASELINE_X_VALUES = {'minmax': 0.5, 'zscore': 0, 'robust': 0, 'percentile': 0.5}
+
 
 def get_scatter_plot(
     var_1,
@@ -38,20 +69,22 @@ def get_scatter_plot(
     axis_title_size, axis_label_size = get_scatter_plot_font_sizes(plot_width)
     image_size = image_size * image_size_multiplier
 
-    # Retrieve the data needed for the scatter plot
-    plot_df = get_fighter_attributes_df(
-        excluded_fighter_ids=excluded_fighter_ids,
-        game=selected_game,
-    )
-    if var_2 == var_1:
-        plot_df = plot_df[['fighter', 'img_url', var_1]]
+    if USE_DATA_URLS:
+        chart_data = get_dataset_reference(
+            selected_game, excluded_fighter_ids, required_fields=[var_1, var_2]
+        )
     else:
-        plot_df = plot_df[['fighter', 'img_url', var_1, var_2]]
-    plot_df = plot_df.dropna()
+        # Retrieve the data needed for the scatter plot
+        plot_records = get_fighter_records(
+            game=selected_game,
+            fields=['fighter', 'img_url', var_1, var_2],
+            excluded_fighter_ids=excluded_fighter_ids,
+        )
+        chart_data = {'data': {'values': plot_records}}
 
     # Vega-Lite specification
     return {
-        '$schema': 'https://vega.github.io/schema/vega-lite/v5.15.1.json',
+        '$schema': VEGA_LITE_SCHEMA,
         'height': plot_height,
         'width': plot_width,
         'config': {
@@ -86,7 +119,38 @@ def get_scatter_plot(
                 'select': {'encodings': ['x', 'y'], 'type': 'interval'},
             }
         ],
-        'data': {'values': plot_df.to_dict(orient='records')},
+        **chart_data,
+    }
+
+
+def get_scatter_plot_exclusion_patches(
+    var_1, var_2, selected_game, excluded_fighter_ids, prev_excluded_fighter_ids
+):
+    # (patches, list changes) which turn the scatter plot spec for the previously
+    # excluded fighters into the one for the excluded fighters (see get_spec_patch)
+    if USE_DATA_URLS:
+        return get_exclusion_transform_patches(
+            selected_game, excluded_fighter_ids, required_fields=[var_1, var_2]
+        ), {}
+
+    return {}, get_data_values_changes(
+        selected_game,
+        ['fighter', 'img_url', var_1, var_2],
+        excluded_fighter_ids,
+        prev_excluded_fighter_ids,
+    )
+
+
+def get_scatter_plot_axes_patches(var_1, var_2):
+    # The parts of the scatter plot spec which depend on the plotted attributes
+    # (besides the data), e.g. for swapping the axes without rebuilding the spec
+    return {
+        ('encoding', 'tooltip', 1, 'field'): var_1,
+        ('encoding', 'tooltip', 2, 'field'): var_2,
+        ('encoding', 'x', 'field'): var_1,
+        ('encoding', 'x', 'title'): format_attribute_name(var_1),
+        ('encoding', 'y', 'field'): var_2,
+        ('encoding', 'y', 'title'): format_attribute_name(var_2),
     }
 
 
@@ -116,8 +180,11 @@ def get_scatter_plot_font_sizes(plot_width):
 
 
 def get_scatter_plot_sizes(screen_width, screen_height, maintain_square_aspect=True):
-    if screen_width > 992:
-        # On lg screens (>992px), plot is in a column taking up ~75% of screen
+    screen_width = get_width_bucket(screen_width)
+    screen_height = get_height_bucket(screen_height)
+
+    if screen_width >= 992:
+        # On lg screens (>=992px), plot is in a column taking up ~75% of screen
         available_width = int(screen_width * 0.74) - 150
     else:
         # On smaller screens, use full width minus padding
@@ -148,46 +215,55 @@ def get_scatter_plot_sizes(screen_width, screen_height, maintain_square_aspect=T
     return plot_height, plot_width, image_size
 
 
-def get_corr_matrix_plot(var_1, var_2, screen_width):
-    correlations_df = get_correlations_df()
-
-    var_1 = format_attribute_name(var_1)
-    var_2 = format_attribute_name(var_2)
+def get_corr_matrix_plot(
+    var_1, var_2, screen_width, selected_game='ultimate', excluded_fighter_ids=None
+):
+    correlation_records = get_correlation_records(
+        game=selected_game,
+        excluded_fighter_ids=excluded_fighter_ids,
+    )
 
-    num_attributes = len(correlations_df) ** (1 / 2)
+    num_attributes = len(correlation_records) ** (1 / 2)
     plot_height, plot_width, circle_size = get_corr_matrix_plot_sizes(
         screen_width,
         num_attributes,
     )
     axis_label_size = get_corr_matrix_plot_font_sizes(plot_width)
 
-    # For the two selected attributes being plotted on the scatter plot,
-    # highlight their labels on the correlation plot by giving them
-    # red color and bold font.
-    selected_attributes_label_red_color = {
-        'condition': {
-            'test': f"datum.value == '{var_1}' || datum.value == '{var_2}'",
-            'value': 'red',
-        },
-        'value': 'black',
-    }
-    selected_attributes_label_bold_font = {
-        'condition': {
-            'test': f"datum.value == '{var_1}' || datum.value == '{var_2}'",
-            'value': 'bold',
-        },
-        'value': 'normal',
-    }
+    # Determine if labels should be shown based on screen width
+    width_bucket = get_width_bucket(screen_width)
+    show_labels = width_bucket >= 1950 or width_bucket < 992
 
-    tooltip = [
-        {'field': 'Attribute 1', 'type': 'nominal'},
-        {'field': 'Attribute 2', 'type': 'nominal'},
-        {'field': 'Correlation', 'type': 'quantitative'},
-    ]
+    # If circle size is > 900, display each correlation with 2 decimals.
+    # Otherwise, only use 1 decimal for each correlation,
+    # so that the text fits in the circle.
+    corr_text = 'corr_2dec' if circle_size > 900 else 'corr_1dec'
 
-    # Create axis configuration based on screen size
-    # Determine if labels should be shown based on screen width
-    if screen_width > 1950 or screen_width <= 992:
+    # The names of the attributes selected for the scatter plot are
+    # stored in the `selected_attributes` param (as formatted names).
+    is_selected_label = 'indexof(selected_attributes, datum.value) >= 0'
+    is_selected_pair = (
+        "datum['Attribute 1'] == selected_attributes[0]"
+        ' && '
+        "datum['Attribute 2'] == selected_attributes[1]"
+        ' || '
+        "datum['Attribute 1'] == selected_attributes[1]"
+        ' && '
+        "datum['Attribute 2'] == selected_attributes[0]"
+    )
+
+    if show_labels:
+        # For the two selected attributes being plotted on the scatter plot,
+        # highlight their labels on the correlation plot by giving them
+        # red color and bold font.
+        selected_attributes_label_red_color = {
+            'condition': {'test': is_selected_label, 'value': 'red'},
+            'value': 'black',
+        }
+        selected_attributes_label_bold_font = {
+            'condition': {'test': is_selected_label, 'value': 'bold'},
+            'value': 'normal',
+        }
         x_axis = {
             'labelAngle': -45,
             'labelColor': selected_attributes_label_red_color,
@@ -212,6 +288,12 @@ def get_corr_matrix_plot(var_1, var_2, screen_width):
             'title': None,
         }
 
+    tooltip = [
+        {'field': 'Attribute 1', 'type': 'nominal'},
+        {'field': 'Attribute 2', 'type': 'nominal'},
+        {'field': 'Correlation', 'type': 'quantitative'},
+    ]
+
     circles_layer = {
         'mark': {'size': circle_size, 'stroke': 'black', 'type': 'circle'},
         'encoding': {
@@ -237,26 +319,12 @@ def get_corr_matrix_plot(var_1, var_2, screen_width):
                 # For the two selected attributes being plotted on the scatter plot,
                 # highlight their circles on the correlation plot by giving their outline
                 # a thicker stroke width.
-                'condition': {
-                    'test': f"datum['Attribute 1'] == '{var_1}'"
-                    ' && '
-                    f"datum['Attribute 2'] == '{var_2}'"
-                    '||'
-                    f"datum['Attribute 1'] == '{var_2}'"
-                    ' && '
-                    f"datum['Attribute 2'] == '{var_1}'",
-                    'value': 3,
-                },
+                'condition': {'test': is_selected_pair, 'value': 3},
                 'value': 1,
             },
         },
     }
 
-    # If circle size is > 900, display each correlation with 2 decimals.
-    # Otherwise, only use 1 decimal for each correlation,
-    # so that the text fits in the circle.
-    corr_text = 'corr_2dec' if circle_size > 900 else 'corr_1dec'
-
     text_layer = {
         # Smaller circle --> smaller font size
         'mark': {'fontSize': get_corr_text_size(circle_size), 'type': 'text'},
@@ -279,15 +347,34 @@ def get_corr_matrix_plot(var_1, var_2, screen_width):
 
     # Vega-Lite specification
     return {
-        '$schema': 'https://vega.github.io/schema/vega-lite/v5.15.1.json',
+        '$schema': VEGA_LITE_SCHEMA,
         'height': plot_height,
         'width': plot_width,
         'config': {
             'axis': {'grid': False, 'labelFontSize': axis_label_size},
             'view': {'continuousHeight': 300, 'continuousWidth': 300},
         },
+        'params': [
+            {
+                'name': 'selected_attributes',
+                'value': get_corr_matrix_selected_attributes(var_1, var_2),
+            },
+        ],
         'layer': [circles_layer, text_layer],
-        'data': {'values': correlations_df.to_dict(orient='records')},
+        'data': {'values': correlation_records},
+    }
+
+
+def get_corr_matrix_selected_attributes(var_1, var_2):
+    # The two attributes being plotted on the scatter plot (highlighted)
+    return [format_attribute_name(var_1), format_attribute_name(var_2)]
+
+
+def get_corr_matrix_highlight_patches(var_1, var_2):
+    # The part of the correlation matrix spec which depends on the scatter plot's
+    # attributes, e.g. for changing the highlight without rebuilding the spec
+    return {
+        ('params', 0, 'value'): get_corr_matrix_selected_attributes(var_1, var_2),
     }
 
 
@@ -301,12 +388,14 @@ def get_corr_matrix_plot_font_sizes(plot_width):
 
 
 def get_corr_matrix_plot_sizes(screen_width, num_attributes):
-    if screen_width > 1950:
+    screen_width = get_width_bucket(screen_width)
+
+    if screen_width >= 1950:
         # On very large screens, plot is in a column taking up ~25% of screen
         # also need to account for x-axis labels
         available_width = int(screen_width * 0.24) - 185
-    elif screen_width > 992:
-        # On lg screens (>992px), plot is in a column taking up ~25% of screen
+    elif screen_width >= 992:
+        # On lg screens (>=992px), plot is in a column taking up ~25% of screen
         available_width = int(screen_width * 0.24) - 70
     else:
         # On smaller screens, columns stack vertically, so use full width minus padding
@@ -346,39 +435,37 @@ def get_bar_chart(var, screen_width, excluded_fighter_ids, selected_game):
         var = DEFAULT_BAR_CHART_ATTRIBUTE
 
     # Retrieve the data needed for the bar chart
-    plot_df = get_fighter_attributes_df(
-        excluded_fighter_ids=excluded_fighter_ids,
+    plot_records = get_fighter_records(
         game=selected_game,
+        fields=['fighter', 'img_url', var],
+        excluded_fighter_ids=excluded_fighter_ids,
     )
-    plot_df = plot_df[['fighter', 'img_url', var]]
-    plot_df = plot_df.dropna()
+
+    if USE_DATA_URLS:
+        chart_data = get_dataset_reference(
+            selected_game, excluded_fighter_ids, required_fields=[var]
+        )
+    else:
+        chart_data = {'data': {'values': plot_records}}
 
     return (
-        get_horizontal_bar_chart(var, screen_width, plot_df)
-        if screen_width > 900
-        else get_vertical_bar_chart(var, screen_width, plot_df)
+        get_horizontal_bar_chart(var, screen_width, plot_records, chart_data)
+        if is_horizontal_bar_chart(screen_width)
+        else get_vertical_bar_chart(var, screen_width, plot_records, chart_data)
     )
 
 
-def get_horizontal_bar_chart(var, screen_width, plot_df):
+def get_horizontal_bar_chart(var, screen_width, plot_records, chart_data):
     plot_height, plot_width, image_size = get_horizontal_bar_chart_sizes(screen_width)
     axis_title_size, axis_label_size = get_bar_chart_font_sizes(plot_width)
-
-    sorted_df = plot_df.sort_values(by=var, ascending=False)
-    sorted_fighter_list = sorted_df.fighter.to_list()
-    max_val = sorted_df[var].to_list()[0] if len(plot_df.index) > 0 else 0
-
-    tooltip = [
-        {'field': 'fighter', 'type': 'nominal'},
-        {'field': var, 'type': 'quantitative'},
-    ]
+    sorted_fighter_list, max_val = get_bar_chart_sort_order(var, plot_records)
 
     bars = {
         'height': plot_height,
         'width': plot_width,
         'mark': {'opacity': 0.7, 'type': 'bar'},
         'encoding': {
-            'tooltip': tooltip,
+            'tooltip': get_bar_chart_tooltip(var),
             'x': {
                 'axis': None,
                 'field': 'fighter',
@@ -400,7 +487,7 @@ def get_horizontal_bar_chart(var, screen_width, plot_df):
         'width': plot_width,
         'mark': {'type': 'image', 'height': image_size, 'width': image_size},
         'encoding': {
-            'tooltip': tooltip,
+            'tooltip': get_bar_chart_tooltip(var),
             'url': {'field': 'img_url', 'type': 'nominal'},
             'x': {
                 'axis': {
@@ -419,36 +506,28 @@ def get_horizontal_bar_chart(var, screen_width, plot_df):
 
     # Vega-Lite specification
     return {
-        '$schema': 'https://vega.github.io/schema/vega-lite/v5.15.1.json',
+        '$schema': VEGA_LITE_SCHEMA,
         'config': {
             'axis': {'labelFontSize': axis_label_size, 'titleFontSize': axis_title_size},
             'concat': {'spacing': image_size - 32},
             'view': {'continuousHeight': 300, 'continuousWidth': 300, 'strokeOpacity': 0},
         },
         'vconcat': [bars, icons],  # Fighter icons appear below each bar
-        'data': {'values': plot_df.to_dict(orient='records')},
+        **chart_data,
     }
 
 
-def get_vertical_bar_chart(var, screen_width, plot_df):
+def get_vertical_bar_chart(var, screen_width, plot_records, chart_data):
     plot_height, plot_width, image_size = get_vertical_bar_chart_sizes(screen_width)
     axis_title_size, axis_label_size = get_bar_chart_font_sizes(plot_width)
-
-    sorted_df = plot_df.sort_values(by=var, ascending=False)
-    sorted_fighter_list = sorted_df.fighter.to_list()
-    max_val = sorted_df[var].to_list()[0] if len(plot_df.index) > 0 else 0
-
-    tooltip = [
-        {'field': 'fighter', 'type': 'nominal'},
-        {'field': var, 'type': 'quantitative'},
-    ]
+    sorted_fighter_list, max_val = get_bar_chart_sort_order(var, plot_records)
 
     bars = {
         'height': plot_height,
         'width': plot_width,
         'mark': {'opacity': 0.7, 'type': 'bar'},
         'encoding': {
-            'tooltip': tooltip,
+            'tooltip': get_bar_chart_tooltip(var),
             'y': {
                 'axis': None,
                 'field': 'fighter',
@@ -470,7 +549,7 @@ def get_vertical_bar_chart(var, screen_width, plot_df):
         'height': plot_height,
         'mark': {'type': 'image', 'height': image_size, 'width': image_size},
         'encoding': {
-            'tooltip': tooltip,
+            'tooltip': get_bar_chart_tooltip(var),
             'url': {'field': 'img_url', 'type': 'nominal'},
             'y': {
                 'axis': {
@@ -489,14 +568,135 @@ def get_vertical_bar_chart(var, screen_width, plot_df):
 
     # Vega-Lite specification
     return {
-        '$schema': 'https://vega.github.io/schema/vega-lite/v5.15.1.json',
+        '$schema': VEGA_LITE_SCHEMA,
         'config': {
             'axis': {'labelFontSize': axis_label_size, 'titleFontSize': axis_title_size},
             'concat': {'spacing': image_size - 32},
             'view': {'continuousHeight': 300, 'continuousWidth': 300, 'strokeOpacity': 0},
         },
         'hconcat': [icons, bars],  # Fighter icons appear to the left of each bar
-        'data': {'values': plot_df.to_dict(orient='records')},
+        **chart_data,
+    }
+
+
+def is_horizontal_bar_chart(screen_width):
+    return get_width_bucket(screen_width) >= 900
+
+
+def get_bar_chart_order_patches(var, screen_width, plot_records):
+    # The parts of the bar chart spec which depend on the plotted fighters:
+    # the order of the bars and icons, and the value axis' domain
+    sorted_fighter_list, max_val = get_bar_chart_sort_order(var, plot_records)
+
+    if is_horizontal_bar_chart(screen_width):
+        return {
+            ('vconcat', 0, 'encoding', 'x', 'sort'): sorted_fighter_list,
+            ('vconcat', 0, 'encoding', 'y', 'scale', 'domainMax'): max_val * 1.15,
+            ('vconcat', 1, 'encoding', 'x', 'sort'): sorted_fighter_list,
+        }
+
+    return {
+        ('hconcat', 0, 'encoding', 'y', 'sort'): sorted_fighter_list,
+        ('hconcat', 1, 'encoding', 'y', 'sort'): sorted_fighter_list,
+        ('hconcat', 1, 'encoding', 'x', 'scale', 'domainMax'): max_val * 1.15,
+    }
+
+
+def get_bar_chart_exclusion_patches(
+    var, screen_width, selected_game, excluded_fighter_ids, prev_excluded_fighter_ids
+):
+    # (patches, list changes) which turn the bar chart spec for the previously
+    # excluded fighters into the one for the excluded fighters (see get_spec_patch)
+    fields = ['fighter', 'img_url', var]
+    plot_records = get_fighter_records(
+        game=selected_game, fields=fields, excluded_fighter_ids=excluded_fighter_ids
+    )
+    patches = get_bar_chart_order_patches(var, screen_width, plot_records)
+
+    if USE_DATA_URLS:
+        return {
+            **patches,
+            **get_exclusion_transform_patches(
+                selected_game, excluded_fighter_ids, required_fields=[var]
+            ),
+        }, {}
+
+    return patches, get_data_values_changes(
+        selected_game, fields, excluded_fighter_ids, prev_excluded_fighter_ids
+    )
+
+
+def get_bar_chart_sort_order(var, plot_records):
+    sorted_records = sorted(plot_records, key=lambda record: record[var], reverse=True)
+    sorted_fighter_list = [record['fighter'] for record in sorted_records]
+    max_val = sorted_records[0][var] if len(sorted_records) > 0 else 0
+
+    return sorted_fighter_list, max_val
+
+
+def get_bar_chart_tooltip(var):
+    return [
+        {'field': 'fighter', 'type': 'nominal'},
+        {'field': var, 'type': 'quantitative'},
+    ]
+
+
+def get_data_values_changes(
+    selected_game, fields, excluded_fighter_ids, prev_excluded_fighter_ids
+):
+    # The rows to remove from / add to a chart's data when the excluded fighters
+    # change, so that the rest of the rows don't need to be sent again
+    excluded_fighter_ids = set(excluded_fighter_ids)
+    prev_excluded_fighter_ids = set(prev_excluded_fighter_ids)
+    newly_excluded = sorted(excluded_fighter_ids - prev_excluded_fighter_ids)
+    newly_included = sorted(prev_excluded_fighter_ids - excluded_fighter_ids)
+
+    return {
+        ('data', 'values'): (
+            get_fighter_records_by_id(selected_game, fields, newly_excluded),
+            get_fighter_records_by_id(selected_game, fields, newly_included),
+        ),
+    }
+
+
+def get_exclusion_transform_patches(selected_game, excluded_fighter_ids, required_fields):
+    # With data URLs, the excluded fighters are only in the spec's transform
+    return {
+        ('transform',): get_dataset_reference(
+            selected_game, excluded_fighter_ids, required_fields
+        )['transform'],
+    }
+
+
+def get_dataset_reference(selected_game, excluded_fighter_ids, required_fields):
+    # The spec's data and transform, which reference the game's (cached) dataset
+    # by URL, and filter it in the browser instead of on the server.
+    transform = [
+        {'filter': {'field': field, 'valid': True}}
+        for field in dict.fromkeys(required_fields)  # drop duplicates, keep order
+    ]
+
+    if excluded_fighter_ids:
+        fighter_numbers = get_columns(selected_game, 'fighter_lookup')['fighter_number']
+        excluded_fighter_numbers = [
+            fighter_numbers[fighter_id]
+            for fighter_id in excluded_fighter_ids
+            if 0 <= fighter_id < len(fighter_numbers)
+        ]
+        transform.append(
+            {
+                'filter': {
+                    'not': {'field': 'fighter_number', 'oneOf': excluded_fighter_numbers},
+                },
+            },
+        )
+
+    return {
+        'data': {
+            'name': get_dataset_name(selected_game),
+            'url': get_dataset_url(selected_game),
+        },
+        'transform': transform,
     }
 
 
@@ -524,6 +724,8 @@ def get_bar_chart_font_sizes(plot_width):
 
 
 def get_horizontal_bar_chart_sizes(screen_width):
+    screen_width = get_width_bucket(screen_width)
+
     plot_height = 250
     plot_width = int(screen_width * 0.86)  # Plot takes up 86% of the screen
 
@@ -537,11 +739,13 @@ def get_horizontal_bar_chart_sizes(screen_width):
 
 
 def get_vertical_bar_chart_sizes(screen_width):
+    screen_width = get_width_bucket(screen_width)
+
     plot_height = 1200
     image_size = 20
 
     max_plot_width = 550
-    if screen_width > 550:
+    if screen_width >= 550:
         plot_width = int(screen_width * 0.8)
     else:
         plot_width = int(screen_width * 0.7)
@@ -550,18 +754,15 @@ def get_vertical_bar_chart_sizes(screen_width):
     return plot_height, plot_width, image_size
 
 
-def get_fighter_selector_chart(
-    excluded_fighter_ids=None, selected_game='ultimate', cache_breaker=999
-):
-    if excluded_fighter_ids is None:
-        excluded_fighter_ids = []
-
-    fighter_df = get_fighter_lookup_table(game=selected_game)
-    fighter_df = append_row_col_for_fighter_selector(fighter_df)
-    fighter_df = append_img_urls(fighter_df, game=selected_game)
-    fighter_df['excluded'] = fighter_df.index.isin(excluded_fighter_ids)
+@cache
+def get_fighter_selector_chart(selected_game='ultimate'):
+    # Built once per game. The excluded fighters are applied in the browser
+    # (see renderFighterSelector in assets/fighter_selector.js).
+    fighter_records = get_fighter_selector_records(selected_game)
 
-    n_rows, n_cols = fighter_df[['row_number', 'col_number']].max() + 1
+    fighter_columns = get_fighter_selector_columns(selected_game)
+    n_rows = int(fighter_columns['row_number'].max()) + 1
+    n_cols = int(fighter_columns['col_number'].max()) + 1
 
     plot_width = 275
     image_size = min(plot_width // n_cols, 40)  # width and height of each fighter head
@@ -576,8 +777,9 @@ def get_fighter_selector_chart(
     }
 
     # Vega-Lite specification
+    # (the selection's value is set in the browser, to reset the selection)
     return {
-        '$schema': 'https://vega.github.io/schema/vega-lite/v5.15.1.json',
+        '$schema': VEGA_LITE_SCHEMA,
         'height': plot_height,
         'width': plot_width,
         'config': {
@@ -614,15 +816,22 @@ def get_fighter_selector_chart(
             {
                 'name': 'fighter_selector',
                 'select': {'type': 'point', 'clear': False, 'toggle': 'true'},
-                'value': cache_breaker,
+                'value': None,
             }
         ],
-        'data': {'values': fighter_df.to_dict(orient='records')},
+        'data': {'values': fighter_records},
     }
 
 
 def get_comparison_plot(
-    fighter_1, fighter_2, selected_game='ultimate', screen_width=900, normalization='none'
+    fighter_1=None,
+    fighter_2=None,
+    selected_game='ultimate',
+    screen_width=900,
+    normalization='none',
+    fighters=None,
+    comparison_mode='pair',
+    excluded_fighter_ids=None,
 ):
     if fighter_1 is None:
         fighter_1 = DEFAULT_FIGHTER_1
@@ -631,48 +840,66 @@ def get_comparison_plot(
     if normalization is None:
         normalization = 'none'
 
-    plot_height, plot_width, image_size = get_comparison_plot_sizes(screen_width)
+    if comparison_mode == 'multi':
+        if not fighters:
+            return get_empty_comparison_plot(screen_width)
+        # Compare any number of fighters (up to MAX_COMPARISON_FIGHTERS)
+        fighters = [*dict.fromkeys(fighters)][:MAX_COMPARISON_FIGHTERS]
+    else:
+        fighters = [*dict.fromkeys([fighter_1, fighter_2])]
+    fighter_colors = dict(zip(fighters, COMPARISON_COLORS, strict=False))
 
-    # Retrieve the data needed for the comparison plot
-    fighter_df = get_fighter_attributes_df(
-        game=selected_game, normalization=normalization
+    plot_height, plot_width, image_size = get_comparison_plot_sizes(
+        screen_width, num_fighters=len(fighters)
     )
-    plot_df = fighter_df[fighter_df['fighter_number'].isin([fighter_1, fighter_2])]
+
+    # Retrieve the data needed for the comparison plot
     valid_attributes = get_valid_attributes(data_type='continuous', game=selected_game)
-    if '05' in [fighter_1, fighter_2] and selected_game == '64':
+    if '05' in fighters and selected_game == '64':
         # If Yoshi is selected in Smash 64, exclude shield size
         # since he has no shield size value in that game.
         # https://www.nintendo.co.jp/n01/n64/software/nus_p_nalj/smash/M_AbilityAll.html
         valid_attributes.remove('shield_size')
-    plot_df = plot_df[['fighter', 'img_url', 'fighter_number', *valid_attributes]]
-    plot_df = plot_df.dropna()
-
-    # Also get raw data for dual tooltips if using normalized data
-    raw_fighter_df = get_fighter_attributes_df(game=selected_game, normalization='none')
-    raw_plot_df = raw_fighter_df[
-        raw_fighter_df['fighter_number'].isin([fighter_1, fighter_2])
-    ]
-    raw_plot_df = raw_plot_df[['fighter', 'img_url', 'fighter_number', *valid_attributes]]
-    raw_plot_df = raw_plot_df.dropna()
 
     # Transform data from wide to long format for the bar chart
-    comparison_data = [
+    # (with the raw values for dual tooltips if using normalized data)
+    comparison_columns = get_long_format_columns(
+        selected_game,
+        fighter_numbers=fighters,
+        attributes=valid_attributes,
+        normalization=normalization,
+        excluded_fighter_ids=excluded_fighter_ids,
+    )
+
+    # One row per fighter
+    plot_fighters = columns_to_records(
         {
-            'fighter': row['fighter'],
-            'fighter_number': row['fighter_number'],
-            'img_url': row['img_url'],
-            'attribute': attribute,
-            'attribute_display': format_attribute_name(attribute),
-            'value': row[attribute],
-            'color': '#5B9BD5' if row['fighter_number'] == fighter_1 else '#FF8C42',
-            # Add raw value for dual tooltips
-            'raw_value': raw_plot_df[
-                raw_plot_df['fighter_number'] == row['fighter_number']
-            ][attribute].iloc[0],
-        }
-        for _, row in plot_df.iterrows()
-        for attribute in valid_attributes
-    ]
+            column: comparison_columns[column][:: len(valid_attributes)]
+            for column in ['fighter', 'img_url', 'fighter_number']
+        },
+        ['fighter', 'img_url', 'fighter_number'],
+    )
+
+    comparison_columns['color'] = np.repeat(
+        [fighter_colors[fighter['fighter_number']] for fighter in plot_fighters],
+        len(valid_attributes),
+    )
+    comparison_data = columns_to_records(
+        comparison_columns,
+        [
+            'fighter',
+            'fighter_number',
+            'img_url',
+            'attribute',
+            'attribute_display',
+            'value',
+            'color',
+            'raw_value',
+        ],
+    )
+
+    # Create fighter info for legend with images
+    fighter_info = get_comparison_legend_info(plot_fighters, fighter_colors, plot_width)
 
     value_title = 'Value' if normalization == 'none' else f'Value ({normalization})'
 
@@ -708,7 +935,14 @@ def get_comparison_plot(
                 'title': value_title,
                 'scale': {
                     'zero': True,
-                    'domain': [0, 1] if normalization == 'minmax' else None,
+                    # Excluded fighters can be outside of the 0-1 range
+                    # of the non-excluded fighters
+                    'domain': (
+                        [0, 1]
+                        if normalization == 'percentile'
+                        or (normalization == 'minmax' and not excluded_fighter_ids)
+                        else None
+                    ),
                 },
             },
             'color': {
@@ -723,8 +957,7 @@ def get_comparison_plot(
     }
 
     # Add reference line for normalized data
-    baseline_x_values = {'minmax': 0.5, 'zscore': 0}
-    if normalization in baseline_x_values:
+    if normalization in BASELINE_X_VALUES:
         reference_line = {
             'height': plot_height,
             'width': plot_width,
@@ -734,7 +967,7 @@ def get_comparison_plot(
                 'strokeDash': [3, 3],
                 'opacity': 0.7,
             },
-            'encoding': {'x': {'datum': baseline_x_values[normalization]}},
+            'encoding': {'x': {'datum': BASELINE_X_VALUES[normalization]}},
             'data': {'values': [{}]},
         }
         comparison_bar_chart = {
@@ -743,45 +976,6 @@ def get_comparison_plot(
             'layer': [comparison_bar_chart, reference_line],
         }
 
-    # Create fighter info for legend with images
-    fighter_info = []
-    if fighter_1 == fighter_2:
-        # Single fighter case - just show one fighter centered
-        fighter_row = plot_df[['fighter', 'img_url', 'fighter_number']].iloc[0]
-        fighter_info.append(
-            {
-                'fighter': fighter_row['fighter'],
-                'img_url': fighter_row['img_url'],
-                'x_position': plot_width / 2,
-                'color': '#5B9BD5',
-            }
-        )
-    else:
-        # Two different fighters - show both with "vs." in between
-        for _, fighter_row in plot_df[
-            ['fighter', 'img_url', 'fighter_number']
-        ].iterrows():
-            is_fighter_1 = fighter_row['fighter_number'] == fighter_1
-            x_offset = -100 if is_fighter_1 else 100
-
-            fighter_info.append(
-                {
-                    'fighter': fighter_row['fighter'],
-                    'img_url': fighter_row['img_url'],
-                    'x_position': plot_width / 2 + x_offset,
-                    'color': '#5B9BD5' if is_fighter_1 else '#FF8C42',
-                }
-            )
-
-        # Add "vs." image in the middle
-        fighter_info.append(
-            {
-                'fighter': '',
-                'img_url': 'assets/img/vs.png',
-                'x_position': plot_width / 2,
-            }
-        )
-
     # Fighter head images for legend
     fighter_images = {
         'width': plot_width,
@@ -803,7 +997,11 @@ def get_comparison_plot(
     fighter_labels = {
         'width': plot_width,
         'height': 0,
-        'mark': {'type': 'text', 'fontSize': 14, 'fontWeight': 'bold'},
+        'mark': {
+            'type': 'text',
+            'fontSize': 14 if len(plot_fighters) <= 4 else 11,
+            'fontWeight': 'bold',
+        },
         'encoding': {
             'text': {'field': 'fighter', 'type': 'nominal'},
             'x': {
@@ -819,7 +1017,7 @@ def get_comparison_plot(
 
     # Vega-Lite specification with vertical concatenation
     return {
-        '$schema': 'https://vega.github.io/schema/vega-lite/v5.15.1.json',
+        '$schema': VEGA_LITE_SCHEMA,
         'config': {
             'axis': {'labelFontSize': 12, 'titleFontSize': 14},
             'view': {'continuousHeight': 300, 'continuousWidth': 300, 'strokeOpacity': 0},
@@ -832,7 +1030,78 @@ def get_comparison_plot(
     }
 
 
-def get_comparison_plot_sizes(screen_width):
+def get_empty_comparison_plot(screen_width=900):
+    # Shown in place of the comparison plot when no fighters are selected
+    plot_height, plot_width, _ = get_comparison_plot_sizes(screen_width)
+
+    return {
+        '$schema': VEGA_LITE_SCHEMA,
+        'config': {'view': {'strokeOpacity': 0}},
+        'height': plot_height,
+        'width': plot_width,
+        'mark': {'type': 'text', 'fontSize': 16, 'color': 'gray'},
+        'encoding': {'text': {'field': 'text', 'type': 'nominal'}},
+        'data': {
+            'values': [
+                {'text': f'Choose up to {MAX_COMPARISON_FIGHTERS} fighters to compare'}
+            ]
+        },
+    }
+
+
+def get_comparison_legend_info(plot_fighters, fighter_colors, plot_width):
+    fighter_info = []
+    if len(plot_fighters) == 1:
+        # Single fighter case - just show one fighter centered
+        fighter_row = plot_fighters[0]
+        fighter_info.append(
+            {
+                'fighter': fighter_row['fighter'],
+                'img_url': fighter_row['img_url'],
+                'x_position': plot_width / 2,
+                'color': fighter_colors[fighter_row['fighter_number']],
+            }
+        )
+    elif len(plot_fighters) == 2:
+        # Two different fighters - show both with "vs." in between
+        for i, fighter_row in enumerate(plot_fighters):
+            x_offset = -100 if i == 0 else 100
+
+            fighter_info.append(
+                {
+                    'fighter': fighter_row['fighter'],
+                    'img_url': fighter_row['img_url'],
+                    'x_position': plot_width / 2 + x_offset,
+                    'color': fighter_colors[fighter_row['fighter_number']],
+                }
+            )
+
+        # Add "vs." image in the middle
+        fighter_info.append(
+            {
+                'fighter': '',
+                'img_url': 'assets/img/vs.png',
+                'x_position': plot_width / 2,
+            }
+        )
+    else:
+        # More than two fighters - spread them evenly across the plot
+        fighter_info.extend(
+            {
+                'fighter': fighter_row['fighter'],
+                'img_url': fighter_row['img_url'],
+                'x_position': plot_width * (i + 0.5) / len(plot_fighters),
+                'color': fighter_colors[fighter_row['fighter_number']],
+            }
+            for i, fighter_row in enumerate(plot_fighters)
+        )
+
+    return fighter_info
+
+
+def get_comparison_plot_sizes(screen_width, num_fighters=2):
+    screen_width = get_width_bucket(screen_width)
+
     if screen_width >= 992:
         plot_width = int(screen_width * 0.45)
         plot_height = int(plot_width * 0.75)
@@ -842,4 +1111,8 @@ def get_comparison_plot_sizes(screen_width):
         plot_height = int(plot_width * 0.85)
         image_size = 40
 
+    if num_fighters > 2:
+        # Each extra fighter adds another bar per attribute, so make the plot taller
+        plot_height = int(plot_height * (1 + 0.25 * (num_fighters - 2)))
+
     return plot_height, plot_width, image_size
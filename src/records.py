@@ -0,0 +1,201 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from data_store import GAMES, get_columns, get_dataframe
+from utils import (
+    append_row_col_for_fighter_selector,
+    format_attribute_name,
+    get_correlations_df,
+)
+
+
+def columns_to_records(columns, fields, row_mask=None):
+    # Equivalent to DataFrame.to_dict(orient='records'), but built straight from
+    # the NumPy columns. ndarray.tolist converts all the values to native
+    # Python types in one go, which also lets Dash's JSON encoder use its
+    # fast path. Missing values (NaN) are converted to None (null in JSON).
+    values = []
+    for field in fields:
+        column = columns[field] if row_mask is None else columns[field][row_mask]
+        if column.dtype.kind == 'f' and np.isnan(column).any():
+            column = np.where(np.isnan(column), None, column)
+        values.append(column.tolist())
+
+    return [dict(zip(fields, row, strict=True)) for row in zip(*values, strict=True)]
+
+
+def get_valid_rows_mask(columns, fields):
+    # Rows which have no missing values in any of the given fields (like dropna)
+    mask = np.ones(len(columns[fields[0]]), dtype=bool)
+    for field in fields:
+        mask &= ~pd.isna(columns[field])
+
+    return mask
+
+
+def get_excluded_rows_mask(num_rows, excluded_fighter_ids):
+    mask = np.zeros(num_rows, dtype=bool)
+    excluded_fighter_ids = [i for i in excluded_fighter_ids if 0 <= i < num_rows]
+    mask[excluded_fighter_ids] = True
+
+    return mask
+
+
+@lru_cache(maxsize=256)
+def get_fighter_columns(game, normalization='none', excluded_fighter_ids=()):
+    # The game's (read-only) params columns, including each fighter's image url.
+    # Normalized values are relative to the non-excluded fighters.
+    return get_columns(
+        game,
+        'params',
+        normalization=normalization,
+        excluded_fighter_ids=excluded_fighter_ids,
+    )
+
+
+@lru_cache(maxsize=512)
+def get_fighter_records_cached(game, fields, excluded_fighter_ids, normalization):
+    columns = get_fighter_columns(
+        game,
+        normalization,
+        # Raw values don't depend on which fighters are excluded
+        excluded_fighter_ids if normalization != 'none' else (),
+    )
+    num_rows = len(columns['fighter_number'])
+
+    row_mask = get_valid_rows_mask(columns, fields) & ~get_excluded_rows_mask(
+        num_rows, excluded_fighter_ids
+    )
+
+    return columns_to_records(columns, fields, row_mask)
+
+
+def get_fighter_records_by_id(game, fields, fighter_ids):
+    # Records (raw values) of the given fighters, equal to their records in
+    # get_fighter_records, e.g. for adding / removing single rows of a chart's data
+    columns = get_fighter_columns(game)
+    num_rows = len(columns['fighter_number'])
+    fields = [*dict.fromkeys(fields)]
+
+    row_mask = get_valid_rows_mask(columns, fields) & get_excluded_rows_mask(
+        num_rows, fighter_ids
+    )
+
+    return columns_to_records(columns, fields, row_mask)
+
+
+def get_fighter_records(
+    game='ultimate', fields=None, excluded_fighter_ids=None, normalization='none'
+):
+    # Records of the given fields for every (non-excluded) fighter
+    # with no missing values in those fields. The returned list is cached,
+    # so callers must not mutate it.
+    if fields is None:
+        fields = ['fighter', 'img_url']
+    if excluded_fighter_ids is None:
+        excluded_fighter_ids = []
+
+    return get_fighter_records_cached(
+        game,
+        tuple(dict.fromkeys(fields)),  # drop duplicates, keep order
+        tuple(sorted(set(excluded_fighter_ids))),
+        normalization,
+    )
+
+
+@lru_cache(maxsize=len(GAMES))
+def get_fighter_number_index(game):
+    # fighter_number -> row position in the game's tables
+    fighter_numbers = get_columns(game, 'params')['fighter_number']
+
+    return {fighter_number: i for i, fighter_number in enumerate(fighter_numbers)}
+
+
+def get_long_format_columns(
+    game, fighter_numbers, attributes, normalization='none', excluded_fighter_ids=None
+):
+    # Wide to long transform of the given fighters' attributes:
+    # one row per (fighter, attribute) pair, with both the (normalized) value and
+    # the raw value of the attribute. Fighters are kept in the given order, and
+    # fighters with a missing value for any of the attributes are dropped.
+    # Normalized values are relative to the non-excluded fighters.
+    if excluded_fighter_ids is None or normalization == 'none':
+        excluded_fighter_ids = []
+
+    columns = get_fighter_columns(
+        game, normalization, tuple(sorted(set(excluded_fighter_ids)))
+    )
+    raw_columns = get_fighter_columns(game, 'none')
+    fighter_number_index = get_fighter_number_index(game)
+
+    rows = np.array(
+        [
+            fighter_number_index[fighter_number]
+            for fighter_number in dict.fromkeys(fighter_numbers)  # drop duplicates
+            if fighter_number in fighter_number_index
+        ],
+        dtype=int,
+    )
+
+    values = np.column_stack([columns[attribute][rows] for attribute in attributes])
+    raw_values = np.column_stack(
+        [raw_columns[attribute][rows] for attribute in attributes],
+    )
+    values = values.astype(float)
+    raw_values = raw_values.astype(float)
+
+    complete_rows = ~(np.isnan(values).any(axis=1) | np.isnan(raw_values).any(axis=1))
+    rows = rows[complete_rows]
+    num_attributes = len(attributes)
+
+    return {
+        'fighter': np.repeat(columns['fighter'][rows], num_attributes),
+        'fighter_number': np.repeat(columns['fighter_number'][rows], num_attributes),
+        'img_url': np.repeat(columns['img_url'][rows], num_attributes),
+        'attribute': np.tile(attributes, len(rows)),
+        'attribute_display': np.tile(
+            [format_attribute_name(attribute) for attribute in attributes],
+            len(rows),
+        ),
+        'value': values[complete_rows].ravel(),  # row-major, i.e. fighter by fighter
+        'raw_value': raw_values[complete_rows].ravel(),
+    }
+
+
+@lru_cache(maxsize=len(GAMES))
+def get_fighter_selector_columns(game):
+    fighter_df = get_dataframe(game, 'fighter_lookup').drop(columns='fighter_slug')
+    fighter_df = append_row_col_for_fighter_selector(fighter_df)
+
+    return {column: fighter_df[column].to_numpy() for column in fighter_df.columns}
+
+
+def get_fighter_selector_records(game='ultimate', excluded_fighter_ids=None):
+    if excluded_fighter_ids is None:
+        excluded_fighter_ids = []
+
+    columns = get_fighter_selector_columns(game)
+    num_rows = len(columns['fighter_number'])
+    columns = {
+        **columns,
+        'excluded': get_excluded_rows_mask(num_rows, excluded_fighter_ids),
+    }
+
+    return columns_to_records(columns, [*columns])
+
+
+@lru_cache(maxsize=256)
+def get_correlation_records_cached(game, excluded_fighter_ids):
+    corr_df = get_correlations_df(game=game, excluded_fighter_ids=excluded_fighter_ids)
+    columns = {column: corr_df[column].to_numpy() for column in corr_df.columns}
+
+    return columns_to_records(columns, [*columns])
+
+
+def get_correlation_records(game='ultimate', excluded_fighter_ids=None):
+    if excluded_fighter_ids is None:
+        excluded_fighter_ids = []
+
+    return get_correlation_records_cached(game, tuple(sorted(set(excluded_fighter_ids))))
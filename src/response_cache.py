@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# Size bound (number of responses) and time to live (seconds) of each callback's
+# response cache. A TTL of 0 means responses never expire.
+CALLBACK_CACHE_SIZE = int(os.getenv('CALLBACK_CACHE_SIZE', '256'))
+CALLBACK_CACHE_TTL = float(os.getenv('CALLBACK_CACHE_TTL', '3600'))
+
+# Float params are rounded to this many decimals,
+# so that practically equal params share one cached response.
+FLOAT_PARAM_DECIMALS = 2
+
+# Every memoized callback, by name (for reporting cache statistics)
+RESPONSE_CACHES = {}
+
+
+def normalize_param(value):
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return round(value, FLOAT_PARAM_DECIMALS)
+
+    return value
+
+
+def get_params_key(params):
+    # Canonical (hashable) form of a params store,
+    # so that equivalent params dicts share one cached response.
+    # Sets of fighters are already canonical bitmasks (see fighter_index.py).
+    return json.dumps(
+        {key: normalize_param(value) for key, value in params.items()},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+
+
+def memoize_response(maxsize=CALLBACK_CACHE_SIZE, ttl=CALLBACK_CACHE_TTL):
+    # LRU (+ optional TTL) cache for callbacks whose only input is a params store.
+    # The cached response is shared between all sessions, so callers must not
+    # mutate it (Dash only serializes it).
+    if maxsize <= 0:
+        raise ValueError(f'Invalid cache size: {maxsize}. Must be positive.')
+
+    def decorator(function):
+        responses = OrderedDict()
+        stats = {'hits': 0, 'misses': 0}
+        lock = threading.Lock()
+
+        @wraps(function)
+        def wrapper(params):
+            key = get_params_key(params)
+            now = time.monotonic()
+
+            with lock:
+                if key in responses:
+                    created_at, response = responses[key]
+                    if not ttl or now - created_at < ttl:
+                        responses.move_to_end(key)
+                        stats['hits'] += 1
+                        return response
+                    del responses[key]
+                stats['misses'] += 1
+
+            # Build the response outside the lock, so that slow builds
+            # don't block requests for other (cached) params
+            response = function(params)
+
+            with lock:
+                responses[key] = (now, response)
+                responses.move_to_end(key)
+                while len(responses) > maxsize:
+                    responses.popitem(last=False)
+
+            return response
+
+        def cache_info():
+            with lock:
+                return {**stats, 'size': len(responses), 'maxsize': maxsize, 'ttl': ttl}
+
+        def cache_clear():
+            with lock:
+                responses.clear()
+                stats.update(hits=0, misses=0)
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        RESPONSE_CACHES[function.__name__] = wrapper
+
+        return wrapper
+
+    return decorator
+
+
+def get_response_cache_info():
+    return {name: wrapper.cache_info() for name, wrapper in RESPONSE_CACHES.items()}
@@ -0,0 +1,162 @@
+import json
+import math
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+# Single-file binary snapshot of the dataset store, so that a cold start maps
+# the data into memory instead of parsing every CSV.
+#
+# Layout:
+#     MAGIC | header length (uint64, little-endian) | JSON header | padding | data
+#
+# The JSON header holds the format version, the dataset version, the size and
+# modification time of each source CSV (used to detect a stale snapshot) and
+# the schema of every column. Numeric columns are stored as raw little-endian
+# arrays in the data section (aligned to ALIGNMENT bytes) and are mapped
+# zero-copy; string columns are small, so they're stored in the header.
+#
+# Build it (from the `src` directory) with:
+#     python -m snapshot
+
+SNAPSHOT_FILE = '../data/snapshot/datasets.snapshot'
+SNAPSHOT_FORMAT_VERSION = 1
+
+MAGIC = b'SMASHSNAP'
+ALIGNMENT = 64
+
+
+def get_source_stats(source_files):
+    # Cheap fingerprint of the source files (no need to read or hash them)
+    stats = {}
+    for file in source_files:
+        stat = os.stat(file)
+        stats[Path(file).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+
+    return stats
+
+
+def align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def encode_object_column(column):
+    # Missing values (NaN) are stored as null
+    return [
+        None if isinstance(value, float) and math.isnan(value) else value
+        for value in column.tolist()
+    ]
+
+
+def decode_object_column(values):
+    column = np.array(
+        [np.nan if value is None else value for value in values], dtype=object
+    )
+    column.flags.writeable = False
+
+    return column
+
+
+def write_snapshot(file, datasets, source_files, dataset_version):
+    # datasets: {game: {table: {column name: NumPy array}}}
+    schema = {}
+    buffers = []
+    offset = 0
+    for game, tables in datasets.items():
+        schema[game] = {}
+        for table, columns in tables.items():
+            schema[game][table] = {}
+            for column_name, column in columns.items():
+                if column.dtype.kind == 'O':
+                    schema[game][table][column_name] = {
+                        'dtype': 'object',
+                        'values': encode_object_column(column),
+                    }
+                    continue
+
+                data = np.ascontiguousarray(column, dtype=column.dtype.newbyteorder('<'))
+                offset = align(offset)
+                schema[game][table][column_name] = {
+                    'dtype': data.dtype.str,
+                    'offset': offset,
+                    'length': len(data),
+                }
+                buffers.append((offset, data.tobytes()))
+                offset += data.nbytes
+
+    header = json.dumps(
+        {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'dataset_version': dataset_version,
+            'sources': get_source_stats(source_files),
+            'schema': schema,
+        },
+        separators=(',', ':'),
+    ).encode()
+    data_start = align(len(MAGIC) + 8 + len(header))
+
+    Path(file).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = f'{file}.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for buffer_offset, buffer in buffers:
+            f.seek(data_start + buffer_offset)
+            f.write(buffer)
+    os.replace(tmp_file, file)  # never leave a half-written snapshot behind
+
+
+def read_snapshot(file, source_files):
+    # Returns (datasets, dataset_version), or None if there's no snapshot or it
+    # is stale (written by another format version or from other source files).
+    try:
+        with open(file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (header_length,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+    except (FileNotFoundError, struct.error, json.JSONDecodeError):
+        return None
+
+    is_stale = header['sources'] != get_source_stats(source_files)
+    if header['format_version'] != SNAPSHOT_FORMAT_VERSION or is_stale:
+        return None
+
+    data_start = align(len(MAGIC) + 8 + header_length)
+    data = np.memmap(file, dtype=np.uint8, mode='r')
+
+    datasets = {}
+    for game, tables in header['schema'].items():
+        datasets[game] = {}
+        for table, columns in tables.items():
+            datasets[game][table] = {}
+            for column_name, column_schema in columns.items():
+                if column_schema['dtype'] == 'object':
+                    column = decode_object_column(column_schema['values'])
+                else:
+                    dtype = np.dtype(column_schema['dtype'])
+                    start = data_start + column_schema['offset']
+                    end = start + column_schema['length'] * dtype.itemsize
+                    column = np.asarray(data[start:end]).view(dtype)
+                datasets[game][table][column_name] = column
+
+    return datasets, header['dataset_version']
+
+
+if __name__ == '__main__':
+    from data_store import (
+        GAMES,
+        compute_dataset_version,
+        get_source_files,
+        load_game_datasets,
+    )
+
+    write_snapshot(
+        SNAPSHOT_FILE,
+        {game: load_game_datasets(game) for game in GAMES},
+        get_source_files(),
+        compute_dataset_version(),
+    )
@@ -0,0 +1,26 @@
+from dash import Patch
+
+
+def get_spec_patch(patches, list_changes=None):
+    # A Dash Patch which sets the values at the given paths (tuples of dict keys /
+    # list indices) in `patches`: only the patched values are sent to the browser,
+    # which applies them to the spec it already has.
+    # `list_changes` maps paths of lists to (removed items, added items), e.g.
+    # to remove / add single rows of a chart's data.
+    spec_patch = Patch()
+    for path, value in patches.items():
+        node = spec_patch
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = value
+
+    for path, (removed_items, added_items) in (list_changes or {}).items():
+        node = spec_patch
+        for key in path:
+            node = node[key]
+        for item in removed_items:
+            node.remove(item)
+        if added_items:
+            node.extend(added_items)
+
+    return spec_patch
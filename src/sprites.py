@@ -0,0 +1,113 @@
+import base64
+import hashlib
+import math
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from flask import Response, abort, request
+
+from url_paths import get_request_path, get_route_path
+
+# Sprite sheet of every fighter head image of a game, so that a chart (or the
+# fighter selector) needs one image request instead of one per fighter.
+#
+# Vega-Lite's image mark can't crop a region out of a PNG sprite sheet, so the
+# sheet is an SVG with the PNGs embedded in a grid, plus a <view> per fighter.
+# The charts then reference each head as `<sheet url>#<view id>`, which the
+# browser resolves to that fighter's cell of the (cached) sheet.
+# Disable by setting the SPRITES environment variable to 0.
+USE_SPRITES = os.getenv('SPRITES', '1') != '0'
+
+HEADS_DIR = 'assets/img/heads'
+SPRITE_CELL_SIZE = 64  # px, the size of the head images
+
+# The sheet at a given URL never changes (the URL contains the sheet's version).
+# The version is a hash of the head images' contents, so it's the same on every
+# host, and each sheet is only built when it's first requested.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# A URL with an outdated version (e.g. from a page loaded before the images
+# changed) gets the current sheet, which the browser has to revalidate
+OUTDATED_CACHE_CONTROL = 'no-cache'
+
+
+def get_head_image_file(game, fighter_slug):
+    return f'{HEADS_DIR}/{game}/{fighter_slug}.png'
+
+
+def get_head_image_files(game):
+    return sorted(Path(f'{HEADS_DIR}/{game}').glob('*.png'))
+
+
+@lru_cache(maxsize=16)
+def get_sprite_sheet_version(game):
+    # Short content hash of the game's head images (their names and bytes)
+    hasher = hashlib.sha256()
+    for image_file in get_head_image_files(game):
+        hasher.update(image_file.name.encode())
+        hasher.update(image_file.read_bytes())
+
+    return hasher.hexdigest()[:12]
+
+
+@lru_cache(maxsize=16)
+def get_sprite_sheet(game):
+    # SVG document of the game's sprite sheet
+    image_files = get_head_image_files(game)
+    num_columns = max(math.ceil(math.sqrt(len(image_files))), 1)
+    num_rows = math.ceil(len(image_files) / num_columns)
+    size = SPRITE_CELL_SIZE
+
+    elements = []
+    for i, image_file in enumerate(image_files):
+        image_bytes = image_file.read_bytes()
+        x = (i % num_columns) * size
+        y = (i // num_columns) * size
+        encoded_image = base64.b64encode(image_bytes).decode()
+        elements.append(
+            f'<view id="{image_file.stem}" viewBox="{x} {y} {size} {size}"/>'
+            f'<image x="{x}" y="{y}" width="{size}" height="{size}" '
+            f'href="data:image/png;base64,{encoded_image}"/>'
+        )
+
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{num_columns * size}" height="{num_rows * size}">'
+        + ''.join(elements)
+        + '</svg>'
+    )
+
+
+def get_sprite_sheet_url(game):
+    return get_request_path(f'sprites/{get_sprite_sheet_version(game)}/{game}.svg')
+
+
+def get_head_image_url(game, fighter_slug):
+    if USE_SPRITES:
+        # Fighter's view in the game's sprite sheet
+        return f'{get_sprite_sheet_url(game)}#{fighter_slug}'
+
+    return get_head_image_file(game, fighter_slug)
+
+
+def register_sprite_routes(server, games):
+    @server.route(get_route_path('sprites/<version>/<game>.svg'))
+    def serve_sprite_sheet(version, game):
+        if game not in games:
+            abort(404)
+
+        sprite_version = get_sprite_sheet_version(game)
+        etag = f'"{sprite_version}-{game}"'
+        headers = {
+            'ETag': etag,
+            'Cache-Control': (
+                IMMUTABLE_CACHE_CONTROL
+                if version == sprite_version
+                else OUTDATED_CACHE_CONTROL
+            ),
+        }
+
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=304, headers=headers)
+
+        return Response(get_sprite_sheet(game), mimetype='image/svg+xml', headers=headers)
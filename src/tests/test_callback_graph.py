@@ -0,0 +1,113 @@
+# The app's callback graph (server and clientside callbacks), e.g. that the
+# game selection doesn't loop through the selected game store.
+#
+# Run from the `src` directory:
+#     python -m pytest tests
+
+import pytest
+
+from app import app
+from benchmarks.callbacks import get_initial_props, get_prop_ids, parse_outputs
+from benchmarks.round_trips import MAX_GAME_SWITCH_ROUND_TRIPS
+
+PAGE_PATHS = [
+    '/',
+    '/attribute-correlations',
+    '/attribute-distributions',
+    '/fighter-comparisons',
+]
+# The game selectors (in the settings drawer, and on the fighter comparisons page)
+GAME_SELECTORS = {
+    '/': 'game-selector-buttons',
+    '/fighter-comparisons': 'game-selector-buttons-comparison',
+}
+GAME_STORE = ('selected-game-store', 'data')
+
+
+@pytest.fixture(scope='module')
+def callbacks():
+    client = app.server.test_client()
+
+    return [
+        {
+            'name': callback['output'],
+            'inputs': get_prop_ids(callback['inputs']),
+            'outputs': get_prop_ids(parse_outputs(callback['output'])),
+            'is_clientside': callback.get('clientside_function') is not None,
+        }
+        for callback in client.get('/_dash-dependencies').get_json()
+    ]
+
+
+def get_dispatches(callbacks, props, changed):
+    # Callbacks (on the page) fired by a change of the given props, following
+    # their outputs until nothing changes anymore, assuming every output changes.
+    # The graph has no cycles, so each callback fires once.
+    component_ids = {component_id for component_id, _ in props}
+    dispatches = []
+    changed = set(changed)
+    while changed:
+        triggered = [
+            callback
+            for callback in callbacks
+            if callback['inputs'] & changed
+            and {component_id for component_id, _ in callback['inputs']} <= component_ids
+            and callback not in dispatches
+        ]
+        dispatches.extend(triggered)
+        changed = set().union(*(callback['outputs'] for callback in triggered))
+
+    return dispatches
+
+
+def test_no_callback_reads_its_own_output(callbacks):
+    for callback in callbacks:
+        assert not callback['inputs'] & callback['outputs'], callback['name']
+
+
+def test_callback_graph_has_no_cycles(callbacks):
+    # (id, prop) -> the (id, prop) pairs written by the callbacks it's an input of
+    edges = {}
+    for callback in callbacks:
+        for input_id in callback['inputs']:
+            edges.setdefault(input_id, set()).update(callback['outputs'])
+
+    visiting = set()
+    visited = set()
+
+    def visit(prop_id, path):
+        if prop_id in visiting:
+            raise AssertionError(f'Callback cycle: {" -> ".join(map(str, path))}')
+        if prop_id in visited:
+            return
+        visiting.add(prop_id)
+        for output_id in edges.get(prop_id, ()):
+            visit(output_id, [*path, output_id])
+        visiting.remove(prop_id)
+        visited.add(prop_id)
+
+    for prop_id in [*edges]:
+        visit(prop_id, [prop_id])
+
+
+@pytest.mark.parametrize('page_path', PAGE_PATHS)
+def test_game_switch_dispatches(callbacks, page_path):
+    props = get_initial_props(page_path)
+    selector = GAME_SELECTORS.get(page_path, 'game-selector-buttons')
+    dispatches = get_dispatches(callbacks, props, {(selector, 'value')})
+
+    # A click writes the store once, and no game selector is written back
+    store_writers = [d for d in dispatches if GAME_STORE in d['outputs']]
+    assert len(store_writers) == 1
+    assert not any(
+        (game_selector, 'value') in dispatch['outputs']
+        for dispatch in dispatches
+        for game_selector in GAME_SELECTORS.values()
+    )
+
+    # Only the callbacks which depend on the game hit the server, once each
+    server_dispatches = [
+        dispatch['name'] for dispatch in dispatches if not dispatch['is_clientside']
+    ]
+    assert len(server_dispatches) == len(set(server_dispatches))
+    assert len(server_dispatches) <= MAX_GAME_SWITCH_ROUND_TRIPS, server_dispatches
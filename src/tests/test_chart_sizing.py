@@ -0,0 +1,119 @@
+# Chart sizes on the server (plots.py) and in the browser (assets/chart_sizing.js).
+#
+# Run from the `src` directory:
+#     python -m pytest tests
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from plots import (
+    DEFAULT_SCATTER_PLOT_ATTRIBUTE_1,
+    DEFAULT_SCATTER_PLOT_ATTRIBUTE_2,
+    get_corr_matrix_plot,
+    get_scatter_plot,
+    get_scatter_plot_sizes,
+    is_horizontal_bar_chart,
+)
+
+# Screen widths just above a breakpoint (992px and 900px), and a sweep over all sizes
+SCREEN_WIDTHS = [995, 920, *range(380, 2200, 17)]
+SCREEN_HEIGHTS = [600, 1000]
+ATTRIBUTES = [DEFAULT_SCATTER_PLOT_ATTRIBUTE_1, DEFAULT_SCATTER_PLOT_ATTRIBUTE_2]
+
+
+def get_display_size_str(size):
+    # Same format as the display size divs (see app.py)
+    return f'Breakpoint name: <=2000px, width: {size}px'
+
+
+def run_chart_sizing(calls):
+    # Call the chart sizing functions of chart_sizing.js in node
+    script = """
+        var fs = require('fs');
+        var vm = require('vm');
+        global.window = {dash_clientside: {no_update: null}};
+        vm.runInThisContext(fs.readFileSync('assets/chart_sizing.js', 'utf8'));
+        var calls = JSON.parse(fs.readFileSync(0, 'utf8'));
+        var chartSizing = window.dash_clientside.chartSizing;
+        console.log(JSON.stringify(calls.map(function (call) {
+            return chartSizing[call.function].apply(null, call.args);
+        })));
+    """
+    result = subprocess.run(
+        ['node', '-e', script],
+        input=json.dumps(calls),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def to_json(spec):
+    return json.loads(json.dumps(spec))
+
+
+def test_lg_layout_above_992px():
+    # 995px is in the 992px bucket, so it gets the lg layout like the baseline did
+    lg_sizes = get_scatter_plot_sizes(992, 800, maintain_square_aspect=False)
+    md_sizes = get_scatter_plot_sizes(991, 800, maintain_square_aspect=False)
+
+    assert lg_sizes != md_sizes
+    assert get_scatter_plot_sizes(995, 800, maintain_square_aspect=False) == lg_sizes
+
+
+def test_horizontal_bar_chart_above_900px():
+    # 920px is in the 900px bucket
+    assert is_horizontal_bar_chart(920)
+    assert is_horizontal_bar_chart(900)
+    assert not is_horizontal_bar_chart(899)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_clientside_sizes_match_server_sizes():
+    scatter_plot = get_scatter_plot(
+        *ATTRIBUTES, 900, 600, excluded_fighter_ids=[], selected_game='ultimate'
+    )
+    corr_matrix_plot = get_corr_matrix_plot(*ATTRIBUTES, 900)
+
+    calls = []
+    expected_specs = []
+    for screen_width in SCREEN_WIDTHS:
+        for screen_height in SCREEN_HEIGHTS:
+            calls.append(
+                {
+                    'function': 'resizeScatterPlot',
+                    'args': [
+                        to_json(scatter_plot),
+                        get_display_size_str(screen_width),
+                        get_display_size_str(screen_height),
+                        None,
+                        True,
+                    ],
+                }
+            )
+            expected_specs.append(
+                get_scatter_plot(
+                    *ATTRIBUTES,
+                    screen_width,
+                    screen_height,
+                    excluded_fighter_ids=[],
+                    selected_game='ultimate',
+                )
+            )
+
+        calls.append(
+            {
+                'function': 'resizeCorrMatrixPlot',
+                'args': [to_json(corr_matrix_plot), get_display_size_str(screen_width)],
+            }
+        )
+        expected_specs.append(get_corr_matrix_plot(*ATTRIBUTES, screen_width))
+
+    for call, spec, expected_spec in zip(
+        calls, run_chart_sizing(calls), expected_specs, strict=True
+    ):
+        assert spec == to_json(expected_spec), (call['function'], call['args'][1:])
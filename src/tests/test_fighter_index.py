@@ -0,0 +1,51 @@
+# Bitmasks received from a client (see fighter_index.py).
+#
+# Run from the `src` directory:
+#     python -m pytest tests
+
+import pytest
+
+from fighter_index import (
+    EMPTY_BITMASK,
+    decode_bitmask,
+    encode_bitmask,
+    get_fighter_universe,
+    get_num_fighters,
+    toggle_bitmask,
+    universe_bitmask_to_fighter_ids,
+    update_universe_bitmask,
+)
+
+GAME = 'melee'
+INVALID_BITMASKS = [None, 3, '', 'zz', '0x3', 'F', ' 3', '1_0', 'f' * 1000]
+
+
+@pytest.mark.parametrize('bitmask', INVALID_BITMASKS)
+def test_invalid_bitmask_is_empty(bitmask):
+    num_fighters = get_num_fighters(GAME)
+
+    assert decode_bitmask(bitmask, num_fighters) == []
+    assert toggle_bitmask(bitmask, 1, num_fighters) == encode_bitmask([1])
+    assert universe_bitmask_to_fighter_ids(GAME, bitmask) == []
+    assert update_universe_bitmask(bitmask, GAME, []) == EMPTY_BITMASK
+
+
+def test_bitmask_is_masked_to_the_game():
+    num_fighters = get_num_fighters(GAME)
+    all_fighters = [*range(num_fighters)]
+    # Every bit set, including the ones past the game's last fighter
+    bitmask = 'f' * -(-num_fighters // 4)
+
+    assert decode_bitmask(bitmask, num_fighters) == all_fighters
+    assert toggle_bitmask(bitmask, num_fighters, num_fighters) == encode_bitmask(
+        all_fighters
+    )
+
+
+def test_universe_bitmask_is_masked_to_the_universe():
+    num_fighters = len(get_fighter_universe())
+    bitmask = 'f' * -(-num_fighters // 4)
+
+    assert update_universe_bitmask(bitmask, GAME, []) == update_universe_bitmask(
+        encode_bitmask(range(num_fighters)), GAME, []
+    )
@@ -0,0 +1,23 @@
+import os
+
+# URL prefixes of the app, e.g. when it's served under a path of a larger site.
+# They're set by the same environment variables as Dash's own prefixes
+# (the app doesn't set them in code), so that the URLs of the data and sprite
+# routes, which are built before the app is, match Dash's.
+URL_BASE_PATHNAME = os.getenv('DASH_URL_BASE_PATHNAME')
+ROUTES_PATHNAME_PREFIX = (
+    os.getenv('DASH_ROUTES_PATHNAME_PREFIX') or URL_BASE_PATHNAME or '/'
+)
+REQUESTS_PATHNAME_PREFIX = (
+    os.getenv('DASH_REQUESTS_PATHNAME_PREFIX') or ROUTES_PATHNAME_PREFIX
+)
+
+
+def get_route_path(path):
+    # Path of a server route, e.g. 'data/<version>/<dataset_name>.json'
+    return f'{ROUTES_PATHNAME_PREFIX}{path}'
+
+
+def get_request_path(path):
+    # Path the browser requests a route at
+    return f'{REQUESTS_PATHNAME_PREFIX}{path}'
@@ -1,15 +1,41 @@
 import math
 import re
+from functools import cache, wraps
 from itertools import product
 
 import dash_bootstrap_components as dbc
+import numpy as np
 import pandas as pd
 from dash import dcc, html
 from dash_iconify import DashIconify
 
+from correlations import get_correlation_matrix
+from data_store import GAMES, NORMALIZATIONS, get_columns, get_dataframe
+from fighter_index import (
+    EMPTY_BITMASK,
+    clean_bitmask,
+    decode_bitmask,
+    get_full_universe_bitmask,
+    get_num_fighters,
+    universe_bitmask_to_fighter_ids,
+    update_universe_bitmask,
+)
+
 IMG_DIR = 'assets/img'
 TXT_DIR = 'assets/txt'
-DATA_DIR = '../data/clean'
+
+
+def lazy_layout(build_layout):
+    # Page layout which is built on the first request for the page
+    # (instead of when the page module is imported) and then reused.
+    # Dash calls page layouts with the URL's query parameters, which are ignored.
+    build_layout = cache(build_layout)
+
+    @wraps(build_layout)
+    def layout(**_query_params):
+        return build_layout()
+
+    return layout
 
 
 def get_icon(icon, height=16):
@@ -128,19 +154,13 @@ def get_attribute_selector_dropdown(
     )
 
 
-def get_fighter_selector_dropdown(div_id, default_value, game='ultimate'):
-    fighter_lookup = get_fighter_lookup_table(game=game)
-
-    options = [
-        {'label': row['fighter'], 'value': row['fighter_number']}
-        for _, row in fighter_lookup.iterrows()
-    ]
-
+def get_fighter_selector_dropdown(div_id, default_value, game='ultimate', multi=False):
     return dcc.Dropdown(
         id=div_id,
-        options=options,
+        options=get_fighter_dropdown_options(game),
         value=default_value,
-        placeholder='Select fighter...',
+        multi=multi,
+        placeholder='Select fighters...' if multi else 'Select fighter...',
     )
 
 
@@ -211,8 +231,15 @@ def get_page_title(page_url):
     return html.H1(title_text, id='page_title')
 
 
+# Screen widths (px) above which the app title is on one line,
+# and above which its two lines get the large / medium font size
+APP_TITLE_BREAKPOINTS_PX = [1400, 750, 650]
+
+
 def get_app_title(screen_width):
-    if screen_width is None or screen_width > 1400:
+    one_line_width, large_font_width, medium_font_width = APP_TITLE_BREAKPOINTS_PX
+
+    if screen_width is None or screen_width > one_line_width:
         # App title is all on one line
         title_text = 'Explore Super Smash Bros Fighters with Interactive Visualizations!'
         app_title = html.H1(
@@ -224,9 +251,9 @@ def get_app_title(screen_width):
         # App title is split across two lines
         title_text_upper = 'Explore Super Smash Bros. Fighters'
         title_text_lower = 'with Interactive Visualizations!'
-        if screen_width > 750:
+        if screen_width > large_font_width:
             font_size = 24
-        elif screen_width > 650:
+        elif screen_width > medium_font_width:
             font_size = 22
         else:
             font_size = 19
@@ -247,6 +274,15 @@ def get_app_title(screen_width):
     return app_title
 
 
+def get_app_title_variants():
+    # [min screen width, app title] pairs, widest first: the first title whose
+    # width the screen is wider than is used (the last one for any width)
+    return [
+        *[[width, get_app_title(width + 1)] for width in APP_TITLE_BREAKPOINTS_PX],
+        [0, get_app_title(0)],
+    ]
+
+
 def get_screen_width(display_size_width_str):
     # display_size_width_str looks like "Breakpoint name: <=1500px, width: 1440px"
     try:
@@ -270,27 +306,31 @@ def get_screen_height(display_size_height_str):
 
 
 def get_fighter_attributes_df(
-    game='ultimate', excluded_fighter_ids=None, normalization=None, **kwargs
+    game='ultimate', excluded_fighter_ids=None, normalization=None
 ):
-    # Determine which CSV file to load based on normalization method
-    if normalization == 'none' or normalization is None:
-        file = f'{DATA_DIR}/{game}_fighter_params.csv'
-    elif normalization in ['minmax', 'zscore']:
-        file = f'{DATA_DIR}/normalized/{game}_fighter_params_{normalization}.csv'
-    else:
+    # Serve the data from the in-memory dataset store (no per-call CSV reads)
+    if normalization is None:
+        normalization = 'none'
+    if normalization not in NORMALIZATIONS:
         raise ValueError(
             f'Invalid normalization method: {normalization}. '
-            'Must be one of "none", "minmax", or "zscore".'
+            f'Must be one of {NORMALIZATIONS}.'
         )
 
-    fighter_attributes_df = pd.read_csv(file, dtype={'fighter_number': str}, **kwargs)
+    # Normalized values are relative to the non-excluded fighters
+    fighter_attributes_df = get_dataframe(
+        game,
+        'params',
+        normalization=normalization,
+        excluded_fighter_ids=excluded_fighter_ids,
+    )
 
     if excluded_fighter_ids is not None:
         fighter_attributes_df = fighter_attributes_df.loc[
             ~fighter_attributes_df.index.isin(excluded_fighter_ids)
         ]
 
-    return append_img_urls(fighter_attributes_df, game=game)
+    return fighter_attributes_df
 
 
 def append_row_col_for_fighter_selector(fighters_df):
@@ -308,50 +348,19 @@ def append_row_col_for_fighter_selector(fighters_df):
     return fighters_df
 
 
-def append_img_urls(fighters_df, game='ultimate'):
-    clean_fighter_names = (
-        fighters_df['fighter']
-        .str.lower()
-        .str.replace(' ', '_', regex=False)
-        .str.replace('&', 'and', regex=False)
-        .str.replace(r'\.|\(|\)', '', regex=True)
-    )
+def get_correlations_df(game='ultimate', excluded_fighter_ids=None):
+    attributes, correlations = get_correlation_matrix(game, excluded_fighter_ids)
+    attribute_names = [format_attribute_name(attribute) for attribute in attributes]
+    num_attributes = len(attribute_names)
 
-    fighters_df['img_url'] = (
-        IMG_DIR
-        + f'/heads/{game}/'
-        + fighters_df['fighter_number']
-        + '_'
-        + clean_fighter_names
-        + '.png'
-    )
-
-    return fighters_df
-
-
-def get_correlations_df():
-    fighter_attributes_df = get_fighter_attributes_df().drop(
-        columns=['row_number', 'col_number', 'number_of_jumps', 'jump_frames'],
-        errors='ignore',
-    )
-
-    column_names = fighter_attributes_df.columns.tolist()
-    formatted_names = [format_attribute_name(column_name) for column_name in column_names]
-    fighter_attributes_df = fighter_attributes_df.rename(
-        columns=dict(zip(column_names, formatted_names, strict=True)),
-    )
-
-    corr_df = fighter_attributes_df.corr(numeric_only=True, method='pearson')
-    corr_df = (
-        corr_df.reset_index()
-        .melt(id_vars='index')
-        .rename(
-            columns={
-                'index': 'Attribute 1',
-                'variable': 'Attribute 2',
-                'value': 'Correlation',
-            },
-        )
+    # Long format, in the same order as DataFrame.melt would give
+    # (i.e. all of 'Attribute 1' for each value of 'Attribute 2')
+    corr_df = pd.DataFrame(
+        {
+            'Attribute 1': np.tile(attribute_names, num_attributes),
+            'Attribute 2': np.repeat(attribute_names, num_attributes),
+            'Correlation': correlations.ravel(order='F'),
+        },
     )
 
     corr_df['Correlation'] = corr_df['Correlation'].round(4)
@@ -374,47 +383,91 @@ def get_dropdown_options(data_type, game):
     ]
 
 
+def get_fighter_dropdown_options(game):
+    fighter_lookup = get_columns(game, 'fighter_lookup')
+
+    return [
+        {'label': fighter, 'value': fighter_number}
+        for fighter, fighter_number in zip(
+            fighter_lookup['fighter'].tolist(),
+            fighter_lookup['fighter_number'].tolist(),
+            strict=True,
+        )
+    ]
+
+
+@cache
+def get_all_dropdown_options(data_type):
+    # Every game's attribute dropdown options, shipped to the browser once
+    # (see get_dropdown_options_store)
+    return {game: get_dropdown_options(data_type, game) for game in GAMES}
+
+
+@cache
+def get_all_fighter_dropdown_options():
+    return {game: get_fighter_dropdown_options(game) for game in GAMES}
+
+
+def get_dropdown_options_store(div_id, options_by_game, default_values):
+    # Options of every game and the default value of each dropdown, for
+    # switching the dropdowns' options in the browser when the game is changed
+    # (see switchDropdownOptions in assets/dropdown_options.js)
+    return dcc.Store(
+        id=div_id,
+        storage_type='memory',
+        data={'options': options_by_game, 'default_values': default_values},
+    )
+
+
 def get_valid_attributes(data_type, game):
-    attributes_df = pd.read_csv(f'{DATA_DIR}/{game}_attribute_lookup_table.csv')
+    attribute_lookup = get_columns(game, 'attribute_lookup')
+    attributes = attribute_lookup['attribute']
 
     if data_type == 'continuous':
-        attributes_df = attributes_df[attributes_df['type'] == 'C']
+        attributes = attributes[attribute_lookup['type'] == 'C']
     elif data_type == 'all':
         pass
     else:
         raise ValueError("data_type should be either 'continuous' or 'all'.")
 
-    return attributes_df['attribute'].tolist()
+    return attributes.tolist()
 
 
 def format_attribute_name(column_name):
     return column_name.replace('_', ' ').title()
 
 
-def get_excluded_fighter_ids(excluded_fighter_ids_mem):
+def get_excluded_fighter_ids(excluded_fighter_ids_mem, game):
     if excluded_fighter_ids_mem is None:
         return []
 
-    ids = excluded_fighter_ids_mem['ids']
-    return [] if ids is None else ids
+    return decode_bitmask(excluded_fighter_ids_mem, get_num_fighters(game))
 
 
-def get_fighter_lookup_table(game='ultimate'):
-    return pd.read_csv(
-        f'{DATA_DIR}/{game}_fighter_lookup_table.csv', dtype={'fighter_number': str}
+def get_excluded_fighters_bitmask(excluded_fighter_ids_mem, game):
+    if excluded_fighter_ids_mem is None:
+        return EMPTY_BITMASK
+
+    return clean_bitmask(excluded_fighter_ids_mem, get_num_fighters(game))
+
+
+def get_plot_kwargs(plot_params):
+    # Plot params as keyword arguments of the plot functions
+    # (the params stores hold the excluded fighters as a bitmask)
+    plot_kwargs = {**plot_params}
+    plot_kwargs['excluded_fighter_ids'] = get_excluded_fighter_ids(
+        plot_kwargs.pop('excluded_fighters'), plot_kwargs['selected_game']
     )
 
+    return plot_kwargs
 
-def convert_excluded_fighter_ids(excluded_fighter_numbers, selected_game):
-    excluded_fighter_numbers_df = pd.DataFrame(excluded_fighter_numbers)
-    fighter_df = get_fighter_lookup_table(game=selected_game)[['fighter_number']]
 
-    excluded_mask = excluded_fighter_numbers_df['excluded']
-    excluded_numbers = excluded_fighter_numbers_df.loc[excluded_mask, 'fighter_number']
+def get_fighter_lookup_table(game='ultimate'):
+    return get_dataframe(game, 'fighter_lookup')
 
-    fighter_df['excluded'] = fighter_df['fighter_number'].isin(excluded_numbers)
 
-    return fighter_df[fighter_df['excluded']].index.tolist()
+def convert_excluded_fighter_ids(excluded_fighter_numbers, selected_game):
+    return universe_bitmask_to_fighter_ids(selected_game, excluded_fighter_numbers)
 
 
 def update_excluded_fighter_numbers(
@@ -422,129 +475,19 @@ def update_excluded_fighter_numbers(
     excluded_fighter_ids,
     selected_game,
 ):
-    cur_excluded_fighters_df = pd.DataFrame(cur_excluded_fighter_numbers)
-    fighter_df = get_fighter_lookup_table(game=selected_game)[['fighter_number']]
-
-    fighter_df['excluded_in_selected'] = fighter_df.index.isin(excluded_fighter_ids)
-
-    excluded_fighters_df = pd.merge(
-        cur_excluded_fighters_df,
-        fighter_df,
-        how='left',
-        on='fighter_number',
+    # Update the selected game's fighters, and keep the other fighters as they were
+    return update_universe_bitmask(
+        cur_excluded_fighter_numbers, selected_game, excluded_fighter_ids
     )
-    excluded_fighters_df['excluded'] = excluded_fighters_df[
-        'excluded_in_selected'
-    ].fillna(excluded_fighters_df['excluded'])
-
-    return excluded_fighters_df[['fighter_number', 'excluded']].to_dict()
 
 
 def initialize_excluded_fighters(excluded=None):
-    df = pd.DataFrame(
-        {
-            'fighter_number': [
-                '01',
-                '02',
-                '03',
-                '04',
-                '04E',
-                '05',
-                '06',
-                '07',
-                '08',
-                '09',
-                '10',
-                '11',
-                '12',
-                '13',
-                '13E',
-                '14',
-                '15',
-                '15B',
-                '16',
-                '17',
-                '18',
-                '19',
-                '20',
-                '21',
-                '21E',
-                '22',
-                '23',
-                '24',
-                '25',
-                '25E',
-                '26',
-                '27',
-                '28',
-                '28E',
-                '29',
-                '30',
-                '31',
-                '32',
-                '33',
-                '34',
-                '35',
-                '36',
-                '37',
-                '38',
-                '39',
-                '40',
-                '41',
-                '42',
-                '43',
-                '44',
-                '45',
-                '46',
-                '47',
-                '48',
-                '49',
-                '50',
-                '51',
-                '52',
-                '53',
-                '54',
-                '55',
-                '56',
-                '57',
-                '58',
-                '59',
-                '60',
-                '60E',
-                '61',
-                '62',
-                '63',
-                '64',
-                '65',
-                '66',
-                '66E',
-                '67',
-                '68',
-                '69',
-                '70',
-                '71',
-                '72',
-                '73',
-                '74',
-                '75',
-                '76',
-                '77',
-                '78',
-                '79',
-                '80',
-                '81',
-                '82',
-            ],
-        },
-    )
     if excluded is None or excluded == '':
-        df['excluded'] = False
-    elif excluded == 'all':
-        df['excluded'] = True
-    else:
-        raise ValueError
+        return EMPTY_BITMASK
+    if excluded == 'all':
+        return get_full_universe_bitmask()
 
-    return df.to_dict()
+    raise ValueError
 
 
 def parse_vega_fighter_selection(selector_signal):
@@ -617,7 +560,7 @@ def get_normalization_tooltip():
             [
                 html.B('Min-Max (0-1): '),
                 'Scales all attributes to a 0-1 range, where 0 is the minimum ',
-                'value across all fighters, 0.5 is the midpoint, and 1 is the ',
+                'value across the fighters, 0.5 is the midpoint, and 1 is the ',
                 'maximum value.',
             ]
         ),
@@ -630,6 +573,24 @@ def get_normalization_tooltip():
                 'negative are below.',
             ]
         ),
+        html.Br(),
+        html.Div(
+            [
+                html.B('Robust (Median / IQR): '),
+                'Like the Z-Score, but uses the median and the interquartile ',
+                'range, so that a few extreme fighters have less influence.',
+            ]
+        ),
+        html.Br(),
+        html.Div(
+            [
+                html.B('Percentile: '),
+                'The fraction of fighters with a value less than or equal to ',
+                "the fighter's value.",
+            ]
+        ),
+        html.Br(),
+        html.Div('Excluded fighters are left out when normalizing.'),
     ]
 
     return dbc.Tooltip(